@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+여러 계정으로 나눠서 감시 (multi-account sharding)
+
+SRT 객체 하나는 계정 하나/브라우저 하나라서 모든 조회가 한 계정에 몰린다.
+AccountPool 은 계정마다 SRT(브라우저) + MultiWatcher(HTTP 조회)를 따로 두고
+- 조회 조건을 계정별 초당 조회 수(rate) 대비 부하가 가장 적은 계정에 나눠 주고 (replicas 개 계정이 번갈아 조회 가능)
+- 계정마다 TokenBucket 을 따로 둬서 한 계정의 조회 수 상한을 넘지 않으며
+- keepalive 간격마다 모든 계정의 로그인 세션을 확인해 쿠키를 다시 받고 (warm session)
+- 좌석이 보이면 어느 계정이 찾았든 그 승객을 가진 계정(Query.account)의 브라우저로 예약한다
+
+accounts.json
+    [
+        {"name": "me", "env": "SRT_A", "rate": 1},
+        {"name": "family", "login_id": "1234567890", "login_psw": "abc1234", "session_file": "~/.srt/family"}
+    ]
+env 를 주면 {env}_LOGIN_ID, {env}_LOGIN_PASSWORD, {env}_PHONE_NUMBER 환경 변수에서 읽는다.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scheduler import TokenBucket
+from watcher import MultiWatcher, wait_watchers
+
+
+class Account:
+    def __init__(self, name, login_id, login_psw, rate=None, session_file=None, phone_number=None):
+        """
+        :param name: 계정 이름. Query.account 로 예약할 계정을 지정할 때 쓴다
+        :param rate: 이 계정의 초당 최대 조회 수 (None 이면 scheduler 의 공유 TokenBucket 을 따름)
+        :param session_file: 이 계정의 로그인 세션을 저장할 파일 (계정마다 달라야 한다)
+        """
+        if not login_id or not login_psw:
+            raise ValueError(f"'{name}' 계정의 로그인 정보가 없습니다.")
+        self.name = name
+        self.login_id = login_id
+        self.login_psw = login_psw
+        self.rate = rate
+        self.session_file = session_file
+        self.phone_number = phone_number
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        env = data.pop('env', None)
+        if env:
+            data.setdefault('login_id', os.getenv(f'{env}_LOGIN_ID'))
+            data.setdefault('login_psw', os.getenv(f'{env}_LOGIN_PASSWORD'))
+            data.setdefault('phone_number', os.getenv(f'{env}_PHONE_NUMBER'))
+        return cls(**data)
+
+    def __repr__(self):
+        return f"Account({self.name}, rate={self.rate})"
+
+
+def load_accounts(path):
+    """
+    JSON 파일에서 계정 목록을 읽는다
+
+    파일 형식은 Account 인자 dict 의 리스트, 또는 {"accounts": [...]}
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('accounts', [])
+    accounts = [Account.from_dict(item) for item in data]
+    names = [account.name for account in accounts]
+    if len(set(names)) != len(names):
+        raise ValueError(f"계정 이름이 중복되었습니다: {names}")
+    return accounts
+
+
+class AccountPool:
+    def __init__(self, srt, accounts, replicas=1, keepalive=600, max_errors=5):
+        """
+        :param srt: 설정을 복사할 SRT 객체 (조회 조건, scheduler, metrics, 이력, 알림). 직접 로그인하지 않는다
+        :param accounts: Account 목록
+        :param replicas: 조건 하나를 번갈아 조회할 계정 수. 계정 수만큼 같은 조건의 조회 간격이 줄어든다
+        :param keepalive: 모든 계정의 로그인 세션을 확인하고 쿠키를 다시 받는 간격(초)
+        :param max_errors: MultiWatcher 의 연속 오류 한도
+        """
+        if not accounts:
+            raise ValueError("계정이 하나 이상 필요합니다.")
+        self.srt = srt
+        self.accounts = {account.name: account for account in accounts}
+        self.replicas = max(1, min(replicas, len(self.accounts)))
+        self.keepalive = keepalive
+
+        self.watchers = {}       # 계정 이름 -> MultiWatcher
+        self.load = {}           # 계정 이름 -> 맡은 조건 수
+        for account in accounts:
+            worker = srt.fork(account.login_id, account.login_psw, account.session_file)
+            if account.phone_number:
+                worker.set_phone_number(account.phone_number)
+            scheduler = srt.scheduler.copy()
+            if account.rate:
+                scheduler.bucket = TokenBucket(account.rate)
+            worker.scheduler = scheduler
+            self.watchers[account.name] = MultiWatcher(worker, [], max_errors=max_errors, scheduler=scheduler,
+                                                       booker=functools.partial(self.book, finder=account.name))
+            self.load[account.name] = 0
+
+        self.assignments = []    # (계정 이름, Query, 첫 조회 전 대기 시간)
+        self.booked = {}         # group -> 예약된 Query
+        self.booked_by = {}      # group -> 예약한 계정 이름
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def _weight(self, name):
+        return self.accounts[name].rate or 1.0
+
+    def assign(self, query):
+        """
+        조건을 조회할 계정을 정한다. 초당 조회 수 대비 맡은 조건이 적은 계정부터 replicas 개
+        :return: 조회할 계정 이름 목록
+        :raises ValueError: Query.account 가 등록되지 않은 계정
+        """
+        if query.account is not None and query.account not in self.watchers:
+            raise ValueError(f"등록되지 않은 계정입니다: {query.account} ({query})")
+        # 부하가 같으면 예약할 계정이 직접 조회하도록 앞에 둔다
+        names = sorted(self.watchers, key=lambda name: (self.load[name] / self._weight(name), name != query.account))
+        names = names[:self.replicas]
+
+        interval = self.srt.scheduler.min_interval
+        for i, name in enumerate(names):
+            self.watchers[name].add_query(query)
+            self.load[name] += 1
+            # 같은 조건을 여러 계정이 조회하면 시작 시각을 나눠서 번갈아 조회하게 한다
+            self.assignments.append((name, query, interval * i / len(names)))
+        owner = query.account or names[0]
+        self.watchers[owner].stop_events.setdefault(query.group, threading.Event())
+        return names
+
+    def _start_account(self, name):
+        watcher = self.watchers[name]
+        watcher.max_workers = max(1, len(watcher.queries))
+        watcher.start_session()
+
+    def start(self):
+        """모든 계정을 동시에 로그인한다. 로그인에 실패한 계정은 빼고 진행"""
+        with ThreadPoolExecutor(max_workers=len(self.watchers)) as executor:
+            futures = {name: executor.submit(self._start_account, name) for name in self.watchers}
+        failed = []
+        for name, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"'{name}' 계정 로그인 실패: {str(e)}")
+                self.srt.metrics.incr('errors', phase='login', kind='account')
+                failed.append(name)
+        if len(failed) == len(self.watchers):
+            raise RuntimeError("로그인에 성공한 계정이 없습니다.")
+        for name in failed:
+            self._drop(name)
+        threading.Thread(target=self._keepalive_loop, name='srt-accounts-keepalive', daemon=True).start()
+        print(f"계정 {len(self.watchers)}개 로그인 완료")
+
+    def _drop(self, name):
+        """로그인하지 못한 계정이 맡은 조건을 다른 계정으로 넘긴다"""
+        watcher = self.watchers.pop(name)
+        self.load.pop(name)
+        if watcher.srt.driver:
+            watcher.srt.quit_driver()
+        moved = [query for owner, query, _ in self.assignments if owner == name]
+        self.assignments = [assignment for assignment in self.assignments if assignment[0] != name]
+        self.replicas = min(self.replicas, len(self.watchers))
+        for query in moved:
+            if query.account == name:
+                print(f"'{name}' 계정으로 예약할 조건은 감시하지 않습니다: {query}")
+                continue
+            if any(query is assigned for _, assigned, _ in self.assignments):
+                continue  # 다른 계정이 이미 함께 조회 중
+            for other in self.assign(query):
+                self._start_account(other)
+
+    def _keepalive_loop(self):
+        while not self.stop_event.wait(self.keepalive):
+            for name, watcher in list(self.watchers.items()):
+                # 예약 중인 브라우저와 겹치지 않도록 book_lock 안에서 확인
+                with watcher.book_lock:
+                    try:
+                        watcher.start_session()
+                    except Exception as e:
+                        print(f"'{name}' 계정 세션 확인 실패: {str(e)}")
+                        self.srt.metrics.incr('errors', phase='keepalive', kind='account')
+
+    def book(self, query, finder):
+        """
+        finder 계정이 찾은 좌석을 query.account 계정(없으면 finder)의 브라우저로 예약한다
+        :return: 예약 성공 여부
+        """
+        owner = query.account or finder
+        if owner not in self.watchers:
+            # 로그인하지 못해 빠진 계정이면 찾은 계정으로 예약
+            print(f"'{owner}' 계정이 없어 '{finder}' 계정으로 예약합니다: {query}")
+            owner = finder
+        if owner != finder:
+            print(f"'{finder}' 계정이 찾은 좌석을 '{owner}' 계정으로 예약합니다: {query}")
+            self.srt.metrics.incr('routed_bookings', account=owner)
+        if not self.watchers[owner].book(query):
+            return False
+
+        with self.lock:
+            self.booked[query.group] = query
+            self.booked_by[query.group] = owner
+        for watcher in self.watchers.values():
+            if query.group in watcher.stop_events:
+                watcher.stop_group(query.group)
+        return True
+
+    def stop_all(self):
+        for watcher in list(self.watchers.values()):
+            watcher.stop_all()
+
+    def _watch(self, name, query, delay):
+        watcher = self.watchers[name]
+        if delay and watcher.stop_events[query.group].wait(delay):
+            return None
+        return watcher.watch_query(query)
+
+    def progress(self):
+        return ', '.join(f"{name} {watcher.cnt_refresh}회" for name, watcher in self.watchers.items())
+
+    def run(self, queries):
+        """
+        조건을 계정에 나눠 동시에 감시한다. 모든 그룹이 예약되면 종료
+        :return: {group: 예약된 Query}
+        """
+        for query in queries:
+            self.assign(query)
+        self.start()
+
+        print(f"{len(queries)}개 조건을 계정 {len(self.watchers)}개로 감시 시작 "
+              f"({', '.join(f'{name} {load}개' for name, load in self.load.items())})")
+        started = time.time()
+        executor = ThreadPoolExecutor(max_workers=len(self.assignments), thread_name_prefix='srt-account')
+        try:
+            futures = [executor.submit(self._watch, name, query, delay) for name, query, delay in self.assignments]
+            wait_watchers(futures, self.stop_all)
+        except KeyboardInterrupt:
+            self.stop_all()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            print(f"감시 종료: 새로고침 {self.progress()}, {time.time() - started:.1f}초")
+            for group, name in self.booked_by.items():
+                print(f"  {group}: '{name}' 계정으로 예약 {self.booked[group]}")
+            self.close()
+
+        return self.booked
+
+    def close(self):
+        self.stop_event.set()
+        for watcher in self.watchers.values():
+            if watcher.http_engine:
+                watcher.http_engine.close()
+            if watcher.srt.driver:
+                watcher.srt.quit_driver()
+                watcher.srt.driver = None
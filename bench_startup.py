@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+시작 속도 벤치마크
+
+- 모듈별 import 시간 (매번 새 인터프리터에서 측정)
+- chromedriver 경로 찾기 시간 (캐시 전/후)
+- 첫 드라이버 실행 시간 (run_driver ~ quit)
+
+python bench_startup.py [--repeat 5] [--no-driver] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT_TARGETS = ['validation', 'util', 'http_engine', 'main', 'selenium.webdriver']
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def measure_import(module, repeat):
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', IMPORT_SNIPPET.format(module=module)],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            return None
+        samples.append(float(out.stdout.strip()))
+    return statistics.median(samples)
+
+
+def measure_resolve():
+    """캐시 전/후 경로 찾기 시간. 사용자의 캐시(~/.cache/srt)는 건드리지 않도록 임시 디렉터리의 캐시로 잰다"""
+    import driver_resolver
+
+    saved = driver_resolver.CACHE_DIR, driver_resolver.CACHE_FILE
+    with tempfile.TemporaryDirectory(prefix='srt-bench-') as cache_dir:
+        driver_resolver.CACHE_DIR = cache_dir
+        driver_resolver.CACHE_FILE = os.path.join(cache_dir, 'chromedriver.json')
+        try:
+            t = time.perf_counter()
+            path = driver_resolver.resolve_chromedriver(allow_download=False)
+            first = time.perf_counter() - t
+
+            t = time.perf_counter()
+            driver_resolver.resolve_chromedriver(allow_download=False)
+            cached = time.perf_counter() - t
+        finally:
+            driver_resolver.CACHE_DIR, driver_resolver.CACHE_FILE = saved
+    return path, first, cached
+
+
+def measure_first_driver():
+    from main import SRT
+
+    srt = SRT("수서", "부산", time.strftime('%Y%m%d'), "08", 1, 0)
+    t = time.perf_counter()
+    srt.run_driver()
+    started = time.perf_counter() - t
+    srt.quit_driver()
+    return started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup benchmark')
+    parser.add_argument("--repeat", help="Runs per import measurement", type=int, default=5)
+    parser.add_argument("--no-driver", help="Skip launching Chrome", action="store_true")
+    parser.add_argument("--json", help="Print results as one JSON object", action="store_true")
+    args = parser.parse_args()
+
+    results = {'import': {}}
+    for module in IMPORT_TARGETS:
+        results['import'][module] = measure_import(module, args.repeat)
+
+    path, first, cached = measure_resolve()
+    results['chromedriver'] = {'path': path, 'resolve_first': first, 'resolve_cached': cached}
+
+    if not args.no_driver:
+        try:
+            results['first_driver'] = measure_first_driver()
+        except Exception as e:
+            results['first_driver'] = None
+            results['first_driver_error'] = str(e).splitlines()[0] if str(e) else type(e).__name__
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+        return
+
+    print("import 시간 (중앙값)")
+    for module, seconds in results['import'].items():
+        print(f"  {module:<20} {'실패' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+    print(f"chromedriver: {path or '찾지 못함'}")
+    print(f"  첫 탐색 {first * 1000:.1f} ms / 캐시 {cached * 1000:.1f} ms")
+    if 'first_driver' in results:
+        if results['first_driver'] is None:
+            print(f"첫 드라이버 실행 실패: {results['first_driver_error']}")
+        else:
+            print(f"첫 드라이버 실행: {results['first_driver']:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
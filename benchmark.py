@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 대역 서버(standin_server)를 상대로 한 오프라인 벤치마크
+
+실제 사이트에 접속하지 않고 SRT 클래스를 그대로 돌려서
+- HTTP 엔진 / 결과 테이블 파서 처리량
+- 브라우저 새로고침 처리량 (refreshes/sec)
+- 좌석이 풀린 뒤 예약 클릭까지 걸린 시간 (seat-to-click), 클릭 후 좌석이 잡힐 때까지 (click-to-hold)
+- 브라우저 1개의 메모리 사용량과, 탭 N개로 N개 조건을 감시할 때 조건당 메모리 (TabWatcher)
+- restart_browser 비용
+을 측정한다. 브라우저 항목은 로컬에 Chrome 과 chromedriver 가 있어야 하며, 네트워크는 필요 없다.
+
+python benchmark.py [--cycles 50] [--latency 0.02] [--tabs 4] [--no-browser] [--lean] [--prearm] [--json]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, timedelta
+
+from http_engine import HttpSearchEngine, build_search_form
+from metrics import Metrics
+from procstat import tree_usage, driver_pid
+from result_parser import parse_result_html
+from rules import BookingRules
+from scheduler import PollScheduler
+from standin_server import StandinServer, SESSION_COOKIE, render_search_page, AVAILABLE_ROW
+
+DPT_STN = "수서"
+ARR_STN = "부산"
+DPT_TM = "08"
+
+
+def _dpt_dt():
+    return (date.today() + timedelta(days=1)).strftime('%Y%m%d')
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else None
+
+
+def bench_parse(cycles, num_rows=10):
+    """파서와 예약 조건 판단만 반복 (네트워크/브라우저 없음)"""
+    page = render_search_page([dict(AVAILABLE_ROW, train_num=str(300 + i)) for i in range(num_rows)])
+    started = time.perf_counter()
+    for _ in range(cycles):
+        rows = parse_result_html(page, num_rows)
+    elapsed = time.perf_counter() - started
+
+    # 마지막 행만 조건에 맞도록 해서 모든 행을 판단하게 한다
+    rules = BookingRules(want_train=str(300 + num_rows - 1))
+    decide_started = time.perf_counter()
+    for _ in range(cycles):
+        rules.first(rows)
+    decide_elapsed = time.perf_counter() - decide_started
+    return {'parses_per_sec': _rate(cycles, elapsed), 'parse_ms': elapsed / cycles * 1000,
+            'decide_us': decide_elapsed / cycles * 1e6}
+
+
+def bench_http(server, cycles, num_rows=4):
+    """HttpSearchEngine 으로 조회 반복"""
+    engine = HttpSearchEngine(base_url=server.base_url)
+    engine.load_cookies([{'name': SESSION_COOKIE, 'value': 'bench'}])
+    form = build_search_form(DPT_STN, ARR_STN, _dpt_dt(), DPT_TM, 1, 0)
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(cycles):
+        t = time.perf_counter()
+        engine.fetch_rows(form, num_rows)
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    engine.close()
+    return {
+        'refreshes_per_sec': _rate(cycles, elapsed),
+        'refresh_p50_ms': statistics.median(samples) * 1000,
+        'refresh_max_ms': max(samples) * 1000,
+    }
+
+
+def bench_browser(server, cycles, browser_profile=None, chromedriver_path=None, prearm=False):
+    """실제 SRT 클래스로 로그인 → 조회 → 새로고침 → 예약 → 재시작"""
+    from main import SRT
+
+    metrics = Metrics()
+    srt = SRT(DPT_STN, ARR_STN, _dpt_dt(), DPT_TM, 1, 0, num_trains_to_check=4, base_url=server.base_url,
+              scheduler=PollScheduler(min_interval=0, max_interval=0), chromedriver_path=chromedriver_path,
+              browser_profile=browser_profile, metrics=metrics, prearm=prearm)
+    srt.set_log_info('bench', 'bench')
+    result = {'prearm': prearm}
+
+    try:
+        t = time.perf_counter()
+        srt.run_driver()
+        result['driver_start_s'] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        srt.login()
+        srt.go_search()
+        result['login_search_s'] = time.perf_counter() - t
+
+        server.sell_out()
+        started = time.perf_counter()
+        for _ in range(cycles):
+            srt.refresh_result()
+            srt.read_result_rows()
+        result['refreshes_per_sec'] = _rate(cycles, time.perf_counter() - started)
+
+        pid = driver_pid(srt.driver)
+        if pid:
+            rss, _, processes = tree_usage(pid)
+            result['memory_mb'] = rss / 1024 / 1024
+            result['processes'] = processes
+
+        # 몇 번 더 새로고침한 뒤 좌석을 풀고, check_result 가 예약을 누를 때까지 걸린 시간
+        server.flip_after = server.cnt_search + 3
+        srt.check_result()
+        result['seat_to_click_s'] = server.seat_to_click_latency()
+        timers = metrics.summary()['timers']
+        click = timers.get('click_to_confirmation{mode="armed"}' if prearm else 'click_to_confirmation')
+        result['click_to_hold_s'] = click['max'] if click else None
+        if result['seat_to_click_s'] is not None and click:
+            result['seat_to_hold_s'] = result['seat_to_click_s'] + click['max']
+        result['booked'] = srt.is_booked
+
+        t = time.perf_counter()
+        srt.restart_browser()
+        result['restart_s'] = time.perf_counter() - t
+    finally:
+        if srt.driver:
+            srt.quit_driver()
+
+    return result
+
+
+def bench_tabs(server, cycles, tabs, browser_profile=None, chromedriver_path=None):
+    """TabWatcher 로 브라우저 1개에 조건 tabs 개를 열고 한꺼번에 새로고침"""
+    from main import SRT
+    from tabs import TabWatcher
+    from watcher import Query
+
+    srt = SRT(DPT_STN, ARR_STN, _dpt_dt(), DPT_TM, 1, 0, num_trains_to_check=4, base_url=server.base_url,
+              scheduler=PollScheduler(min_interval=0, max_interval=0), chromedriver_path=chromedriver_path,
+              browser_profile=browser_profile, metrics=Metrics())
+    srt.set_log_info('bench', 'bench')
+    queries = [Query(DPT_STN, ARR_STN, _dpt_dt(), DPT_TM, group=f'bench{i}') for i in range(tabs)]
+    watcher = TabWatcher(srt, queries)
+    result = {'tabs': tabs}
+
+    try:
+        server.sell_out()
+        t = time.perf_counter()
+        watcher.open_tabs()
+        result['open_tabs_s'] = time.perf_counter() - t
+
+        started = time.perf_counter()
+        for _ in range(cycles):
+            watcher.poll_once()
+        result['refreshes_per_sec'] = _rate(watcher.cnt_refresh, time.perf_counter() - started)
+
+        pid = driver_pid(srt.driver)
+        if pid:
+            rss, _, processes = tree_usage(pid)
+            result['memory_mb'] = rss / 1024 / 1024
+            result['memory_per_query_mb'] = rss / 1024 / 1024 / tabs
+            result['processes'] = processes
+    finally:
+        if srt.driver:
+            srt.quit_driver()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark against a local SRT stand-in server')
+    parser.add_argument("--cycles", help="Refresh cycles per measurement", type=int, default=50)
+    parser.add_argument("--latency", help="Stand-in server response delay (seconds)", type=float, default=0.0)
+    parser.add_argument("--tabs", help="Queries to watch as tabs of one browser (0 to skip)", type=int, default=4)
+    parser.add_argument("--no-browser", help="Skip the Selenium measurements", action="store_true")
+    parser.add_argument("--lean", help="Use the lean browser profile", action="store_true")
+    parser.add_argument("--chromedriver", help="Path to chromedriver", type=str, default=None)
+    parser.add_argument("--prearm", help="Use pre-armed booking in the browser measurements", action="store_true")
+    parser.add_argument("--json", help="Print results as one JSON object", action="store_true")
+    args = parser.parse_args()
+
+    server = StandinServer(latency=args.latency)
+    server.start()
+    results = {'latency_s': args.latency}
+    try:
+        results['parse'] = bench_parse(args.cycles * 20)
+        results['http'] = bench_http(server, args.cycles)
+        if not args.no_browser:
+            profile = None
+            if args.lean:
+                from browser_profile import BrowserProfile
+                profile = BrowserProfile()
+            try:
+                results['browser'] = bench_browser(server, args.cycles, profile, args.chromedriver, args.prearm)
+            except Exception as e:
+                results['browser'] = {'error': str(e).splitlines()[0] if str(e) else type(e).__name__}
+            if args.tabs:
+                try:
+                    results['tabs'] = bench_tabs(server, args.cycles, args.tabs, profile, args.chromedriver)
+                except Exception as e:
+                    results['tabs'] = {'error': str(e).splitlines()[0] if str(e) else type(e).__name__}
+    finally:
+        server.stop()
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False))
+        return
+
+    for section in ('parse', 'http', 'browser', 'tabs'):
+        if section not in results:
+            continue
+        print(f"[{section}]")
+        for key, value in results[section].items():
+            print(f"  {key:<26} {value:.4f}" if isinstance(value, float) else f"  {key:<26} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+조회용 가벼운(lean) 브라우저 프로필
+
+새로고침마다 이미지/CSS/폰트와 분석 스크립트를 받지 않도록
+Chrome 옵션과 CDP Network.setBlockedURLs 로 요청을 막고, 필요 없는 Chrome 기능을 끈다.
+예약/결제 페이지에서 리소스가 필요하면 booking_assets=True 로 두고
+예약 직전에 unblock, 실패해서 조회로 돌아오면 다시 block 한다.
+"""
+
+BLOCK_PATTERNS = {
+    'images': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp'],
+    'stylesheets': ['*.css'],
+    'fonts': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.mp3'],
+    'trackers': [
+        '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googleadservices.com*',
+        '*facebook.net*', '*facebook.com/tr*', '*wcs.naver.net*', '*analytics.kakao.com*',
+        '*t1.daumcdn.net/kas*', '*criteo.*', '*hotjar.com*',
+    ],
+}
+
+# 조회에 필요 없는 Chrome 기능
+LEAN_ARGUMENTS = [
+    'disable-extensions',
+    'disable-background-networking',
+    'disable-component-update',
+    'disable-default-apps',
+    'disable-sync',
+    'disable-translate',
+    'disable-notifications',
+    'disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication',
+    'mute-audio',
+    'no-first-run',
+    'metrics-recording-only',
+    'disk-cache-size=1',
+]
+
+
+class BrowserProfile:
+    def __init__(self, block=('images', 'stylesheets', 'fonts', 'media', 'trackers'), booking_assets=False,
+                 eager=True):
+        """
+        :param block: 막을 리소스 종류 (BLOCK_PATTERNS 의 키)
+        :param booking_assets: 예약/결제 페이지에서는 리소스를 다시 허용할지 여부
+        :param eager: DOMContentLoaded 까지만 기다리는 page load strategy 사용 여부
+        """
+        unknown = set(block) - set(BLOCK_PATTERNS)
+        if unknown:
+            raise ValueError(f"알 수 없는 리소스 종류입니다: {', '.join(sorted(unknown))}")
+        self.block = tuple(block)
+        self.booking_assets = booking_assets
+        self.eager = eager
+
+    @property
+    def patterns(self):
+        return [pattern for kind in self.block for pattern in BLOCK_PATTERNS[kind]]
+
+    def apply(self, options):
+        """ChromeOptions 에 lean 설정을 적용"""
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        if self.eager:
+            options.page_load_strategy = 'eager'
+
+        # 예약 때 다시 허용할 필요가 없으면 이미지는 디코딩 단계부터 끈다
+        if 'images' in self.block and not self.booking_assets:
+            options.add_argument('blink-settings=imagesEnabled=false')
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        return options
+
+    def install(self, driver):
+        """드라이버 생성 직후 CDP 로 요청 차단을 켠다"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        self.block_resources(driver)
+
+    def block_resources(self, driver):
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.patterns})
+
+    def unblock_resources(self, driver):
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
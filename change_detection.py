@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+조회 결과 테이블 변경 감지
+
+- 새로고침 전에 현재 행에 표시(data-srt-seen)를 남겨 두고,
+  표시가 없는 행이 나타나는 순간을 새 응답이 그려진 시점으로 본다 (고정 sleep 없음)
+- 행마다 좌석/예약 대기 상태의 fingerprint 를 기억해 두었다가
+  상태가 바뀐 행만 예약 판단에 넘긴다
+"""
+import hashlib
+
+from result_parser import RESULT_FORM_SELECTOR
+
+SEEN_ATTR = 'data-srt-seen'
+FORM_SEEN_ATTR = 'data-srt-seen-form'  # 결과 행이 없을 때(열차 없음) 새 결과인지 구분하는 결과 폼 표시
+
+# 현재 결과 행과 결과 폼에 표시를 남긴다. arguments[0]: 행 selector
+MARK_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < rows.length; i++) {
+    rows[i].setAttribute('%s', '1');
+}
+var form = document.querySelector('%s');
+if (form !== null) {
+    form.setAttribute('%s', '1');
+}
+return rows.length;
+""" % (SEEN_ATTR, RESULT_FORM_SELECTOR, FORM_SEEN_ATTR)
+
+# 표시 없는 새 행이 그려졌으면 상위 N개 행의 셀 텍스트(셀 텍스트를 읽지 않으면 true)를, 아니면 null 을 반환
+# 표시 없는 새 결과 폼에 행이 하나도 없으면 (조회된 열차 없음) 빈 목록(셀 텍스트를 읽지 않으면 true)을 반환
+# arguments[0]: 행 selector, arguments[1]: 읽을 행 수, arguments[2]: 셀 텍스트를 읽을지 여부
+READY_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+if (document.querySelector('[%s]') !== null) {
+    return null;
+}
+if (rows.length === 0) {
+    var form = document.querySelector('%s');
+    if (form === null || form.hasAttribute('%s') || document.readyState !== 'complete') {
+        return null;
+    }
+    return arguments[2] ? [] : true;
+}
+if (!arguments[2]) {
+    return true;
+}
+var out = [];
+for (var i = 0; i < rows.length && i < arguments[1]; i++) {
+    var cells = rows[i].querySelectorAll('td');
+    var texts = [];
+    for (var j = 0; j < cells.length; j++) {
+        texts.push((cells[j].innerText || cells[j].textContent || '').trim());
+    }
+    out.push(texts);
+}
+return out;
+""" % (SEEN_ATTR, RESULT_FORM_SELECTOR, FORM_SEEN_ATTR)
+
+
+def ready(result):
+    """
+    READY_SCRIPT 결과를 WebDriverWait.until 이 기다릴 값으로 바꾼다
+    빈 결과([])도 새 결과가 그려진 것이므로 (결과,) 로 감싸고, 아직이면 None
+    """
+    return None if result is None else (result,)
+
+
+def row_fingerprint(row):
+    """행의 기차 번호와 좌석/예약 대기 상태로 fingerprint 를 만든다"""
+    key = '\x1f'.join((row.train_num, row.premium_seat, row.standard_seat, row.reservation))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+
+
+class TableTracker:
+    def __init__(self):
+        self.fingerprints = {}  # 행 번호 -> fingerprint
+        self.pending = {}       # commit 전인 fingerprint (commit=False 로 읽은 행)
+
+    def changed_rows(self, rows, commit=True):
+        """
+        직전에 본 상태와 다른 행만 반환 (처음 보는 행 포함)
+        :param commit: False 면 commit() 을 부를 때까지 본 상태로 기억하지 않는다
+                       (예약 판단 중 예외가 나도 그 행을 다음 조회에서 다시 판단하도록)
+        """
+        changed = []
+        pending = {}
+        for row in rows:
+            fingerprint = row_fingerprint(row)
+            if self.fingerprints.get(row.index) != fingerprint:
+                pending[row.index] = fingerprint
+                changed.append(row)
+        if commit:
+            self.fingerprints.update(pending)
+            self.pending = {}
+        else:
+            self.pending = pending
+        return changed
+
+    def commit(self):
+        """changed_rows(commit=False) 로 읽은 행 상태를 기억한다"""
+        self.fingerprints.update(self.pending)
+        self.pending = {}
+
+    def forget(self, index=None):
+        """
+        기억한 상태를 지운다. 예약 시도가 실패한 행은 다음 조회에서 다시 판단하도록 지운다
+        :param index: 지울 행 번호 (None 이면 전체)
+        """
+        if index is None:
+            self.fingerprints.clear()
+            self.pending = {}
+        else:
+            self.fingerprints.pop(index, None)
+            self.pending.pop(index, None)
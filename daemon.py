@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""
+상주(daemon) 모드
+
+브라우저를 한 번 띄워 로그인해 두고(warm session), 로컬 HTTP 또는 Unix socket API 로
+예약 작업(job)을 받아 정해진 수의 worker 스레드에서 감시한다.
+새 감시를 시작할 때 Chrome 실행과 로그인을 다시 하지 않으므로 바로 첫 조회를 시작한다.
+
+    python daemon.py --port 8787 [--workers 4] [--standby 1] [--session_file ~/.srt/session]
+    python daemon.py --socket /tmp/srt.sock
+
+API (JSON)
+    POST   /jobs        {"dpt_stn": "수서", "arr_stn": "부산", "dpt_dt": "20241027", "dpt_tm": "08", ...}  작업 추가
+    GET    /jobs        작업 목록
+    GET    /jobs/<id>   작업 상태
+    DELETE /jobs/<id>   작업 취소
+    GET    /status      세션/worker 상태
+    GET    /metrics     Prometheus text
+"""
+import itertools
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from exceptions import InvalidStationNameError, InvalidRouteError, InvalidDateFormatError, InvalidDateError, InvalidTimeFormatError
+from watcher import Query, MultiWatcher
+
+QUEUED = 'queued'
+WATCHING = 'watching'
+BOOKED = 'booked'
+STOPPED = 'stopped'      # 같은 그룹의 다른 작업이 예약되어 멈춤
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+# Query 인자로 받을 필드
+JOB_FIELDS = ('dpt_stn', 'arr_stn', 'dpt_dt', 'dpt_tm', 'adult_num', 'child_num', 'num_trains_to_check',
+              'want_reserve', 'want_train', 'group')
+
+
+class Job:
+    def __init__(self, job_id, query):
+        self.id = job_id
+        self.query = query
+        self.state = QUEUED
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+        self.stop_event = threading.Event()
+        self.future = None
+
+    def to_dict(self):
+        query = self.query
+        return {
+            'id': self.id,
+            'state': self.state,
+            'dpt_stn': query.dpt_stn,
+            'arr_stn': query.arr_stn,
+            'dpt_dt': query.dpt_dt,
+            'dpt_tm': query.dpt_tm,
+            'adult_num': query.adult_num,
+            'child_num': query.child_num,
+            'want_train': sorted(query.want_train) if isinstance(query.want_train, set) else query.want_train,
+            'group': query.group,
+            'refreshes': query.cnt_refresh,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error,
+        }
+
+
+def query_from_job(data, next_id):
+    """
+    POST /jobs 의 JSON 으로 Query 를 만든다. group 이 없으면 작업마다 따로 둔다
+    :raises ValueError: 모르는 필드 또는 잘못된 값
+    """
+    unknown = set(data) - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"알 수 없는 필드입니다: {', '.join(sorted(unknown))}")
+    data = dict(data)
+    data.setdefault('group', f'job-{next_id}')
+    if isinstance(data.get('want_train'), list):
+        data['want_train'] = set(data['want_train'])
+    return Query.from_dict(data)
+
+
+class SRTDaemon:
+    def __init__(self, srt, workers=4, keepalive=600, keep_finished=200):
+        """
+        :param srt: 로그인과 예약에 사용할 SRT 객체 (standby_drivers 가 있으면 예비 드라이버도 유지)
+        :param workers: 동시에 감시할 작업 수. 넘치는 작업은 queued 상태로 기다린다
+        :param keepalive: 로그인 세션을 확인하고 쿠키를 다시 받는 간격(초)
+        :param keep_finished: GET /jobs 에 남겨 둘 끝난 작업 수 (오래된 것부터 지운다)
+        """
+        self.srt = srt
+        self.workers = workers
+        self.keepalive = keepalive
+        self.keep_finished = keep_finished
+        self.watcher = MultiWatcher(srt, [], max_workers=workers)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='srt-job')
+        self.jobs = {}
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.started = None
+        self.server = None
+        self.logged_in = None   # 마지막으로 확인한 로그인 상태
+        self.login_checked = None
+
+    def start(self, login_id, login_psw, phone_number=None):
+        """브라우저 실행, 로그인, HTTP 엔진 준비까지 미리 해 둔다"""
+        self.srt.set_log_info(login_id, login_psw)
+        if phone_number:
+            self.srt.set_phone_number(phone_number)
+        self.watcher.start_session()
+        self.srt.start_driver_pool()
+        self.started = time.time()
+        threading.Thread(target=self._keepalive_loop, name='srt-keepalive', daemon=True).start()
+        print(f"세션 준비 완료, worker {self.workers}개")
+
+    def _keepalive_loop(self):
+        while not self.stop_event.wait(self.keepalive):
+            # 예약 중인 작업과 브라우저를 같이 쓰지 않도록 book_lock 안에서 확인
+            with self.watcher.book_lock:
+                try:
+                    self.watcher.start_session()
+                except Exception as e:
+                    print(f"세션 확인 실패: {str(e)}")
+                    self.srt.metrics.incr('errors', phase='keepalive')
+
+    def submit(self, data):
+        """작업을 추가하고 Job 을 반환한다"""
+        with self.lock:
+            job_id = next(self.ids)
+        job = Job(job_id, query_from_job(data, job_id))
+        self.watcher.add_query(job.query)
+        with self.lock:
+            self.jobs[job_id] = job
+            self._prune_jobs()
+        job.future = self.executor.submit(self._run_job, job)
+        self.srt.metrics.incr('jobs', state=QUEUED)
+        return job
+
+    def _run_job(self, job):
+        if job.cancelled:
+            return
+        job.state = WATCHING
+        job.started = time.time()
+        self.srt.metrics.observe('job_start', job.started - job.created)
+        try:
+            booked = self.watcher.watch_query(job.query, job.stop_event)
+            if booked:
+                job.state = BOOKED
+            else:
+                job.state = CANCELLED if job.cancelled else STOPPED
+        except Exception as e:
+            job.state = FAILED
+            job.error = str(e)
+            print(f"작업 {job.id} 실패: {str(e)}")
+        finally:
+            job.finished = time.time()
+            self.srt.metrics.incr('jobs', state=job.state)
+            self.watcher.remove_query(job.query)
+
+    def _prune_jobs(self):
+        """끝난 작업이 keep_finished 개를 넘으면 오래된 것부터 지운다 (self.lock 안에서 호출)"""
+        finished = sorted((job for job in self.jobs.values() if job.finished is not None), key=lambda job: job.finished)
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job.id]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.state in (QUEUED, WATCHING):
+            job.cancelled = True
+            job.stop_event.set()
+            if job.future is not None and job.future.cancel():
+                job.state = CANCELLED
+                job.finished = time.time()
+                self.watcher.remove_query(job.query)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def status(self):
+        with self.lock:
+            states = {}
+            for job in self.jobs.values():
+                states[job.state] = states.get(job.state, 0) + 1
+        return {
+            'uptime': time.time() - self.started if self.started else 0,
+            'logged_in': self.check_login(),
+            'login_checked': self.login_checked,
+            'standby_drivers': len(self.srt.driver_pool.standby) if self.srt.driver_pool else 0,
+            'workers': self.workers,
+            'jobs': states,
+            'refreshes': self.watcher.cnt_refresh,
+        }
+
+    def check_login(self, timeout=1):
+        """
+        서버에 실제로 요청해 로그인 세션이 살아 있는지 확인한다 (SRT.is_driver_healthy)
+        예약 중이라 브라우저를 timeout 초 안에 쓸 수 없으면 마지막으로 확인한 값을 반환한다
+        """
+        if self.srt.driver is None:
+            return False
+        if not self.watcher.book_lock.acquire(timeout=timeout):
+            return self.logged_in
+        try:
+            self.logged_in = self.srt.is_driver_healthy(self.srt.driver)
+            self.login_checked = time.time()
+        finally:
+            self.watcher.book_lock.release()
+        return self.logged_in
+
+    def serve(self, port=None, host='127.0.0.1', socket_path=None):
+        """HTTP(port) 또는 Unix socket(socket_path) 으로 API 를 연다. 서버 주소를 반환"""
+        handler = _make_handler(self)
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.server = _UnixHTTPServer(socket_path, handler)
+            os.chmod(socket_path, 0o600)
+        else:
+            self.server = ThreadingHTTPServer((host, port or 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name='srt-api', daemon=True).start()
+        return self.server.server_address
+
+    def shutdown(self):
+        self.stop_event.set()
+        for job in list(self.jobs.values()):
+            job.cancelled = True
+            job.stop_event.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            if isinstance(self.server, _UnixHTTPServer) and os.path.exists(self.server.server_address):
+                os.remove(self.server.server_address)
+        self.srt.close_driver_pool()
+        if self.watcher.http_engine:
+            self.watcher.http_engine.close()
+        if self.srt.driver:
+            self.srt.quit_driver()
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+def _make_handler(daemon):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _json(self, data, status=200):
+            body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _job_id(self):
+            try:
+                return int(self.path.split('?')[0].rstrip('/').rsplit('/', 1)[1])
+            except ValueError:
+                return None
+
+        def do_GET(self):
+            path = self.path.split('?')[0].rstrip('/')
+            if path == '/jobs':
+                return self._json(daemon.list_jobs())
+            if path.startswith('/jobs/'):
+                job = daemon.get(self._job_id())
+                return self._json(job.to_dict()) if job else self._json({'error': 'not found'}, 404)
+            if path == '/status':
+                return self._json(daemon.status())
+            if path == '/metrics':
+                body = daemon.srt.metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            self._json({'error': 'not found'}, 404)
+
+        def do_POST(self):
+            if self.path.split('?')[0].rstrip('/') != '/jobs':
+                return self._json({'error': 'not found'}, 404)
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                data = json.loads(self.rfile.read(length).decode('utf-8') or '{}')
+                if not isinstance(data, dict):
+                    raise ValueError("작업은 JSON object 여야 합니다")
+                job = daemon.submit(data)
+            except (ValueError, TypeError, InvalidStationNameError, InvalidRouteError, InvalidDateFormatError,
+                    InvalidDateError, InvalidTimeFormatError) as e:
+                return self._json({'error': str(e)}, 400)
+            self._json(job.to_dict(), 201)
+
+        def do_DELETE(self):
+            job = daemon.cancel(self._job_id())
+            if job is None:
+                return self._json({'error': 'not found'}, 404)
+            self._json(job.to_dict())
+
+    return Handler
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+
+    from main import SRT
+    from util import parse_cli_args, build_scheduler, build_browser_profile, build_metrics, build_history, build_notifier, build_governor
+
+    cli_args = parse_cli_args()
+    load_dotenv()
+    login_id = os.getenv('SRT_LOGIN_ID')
+    login_psw = os.getenv('SRT_LOGIN_PASSWORD')
+    phone_number = os.getenv('SRT_PHONE_NUMBER')
+
+    metrics = build_metrics(cli_args)
+    history = build_history(cli_args)
+    notifier = build_notifier(cli_args, phone_number, metrics)
+    # SRT 생성자는 조회 조건이 필요하므로 작업이 들어오기 전까지 쓸 기본 조건을 넣어 둔다
+    srt = SRT(cli_args.dpt or "수서", cli_args.arr or "부산", cli_args.dt or time.strftime('%Y%m%d'), cli_args.tm or "08",
+              cli_args.adult, cli_args.child, engine='http', base_url=cli_args.base_url,
+              standby_drivers=cli_args.standby, scheduler=build_scheduler(cli_args), session_file=cli_args.session_file,
+              chromedriver_path=cli_args.chromedriver, browser_profile=build_browser_profile(cli_args), metrics=metrics,
+              race=cli_args.race, race_width=cli_args.race_width, history=history, notifier=notifier, prearm=cli_args.prearm,
+              governor=build_governor(cli_args, metrics))
+
+    daemon = SRTDaemon(srt, workers=cli_args.workers or 4)
+    daemon.start(login_id, login_psw, phone_number)
+    address = daemon.serve(port=cli_args.port, socket_path=cli_args.socket)
+    print(f"API 대기 중: {address if cli_args.socket else f'http://{address[0]}:{address[1]}'}")
+    try:
+        daemon.stop_event.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+        notifier.close()
+        if history:
+            history.close()
+        metrics.close()
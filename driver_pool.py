@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+로그인까지 마친 예비(standby) 드라이버 풀
+
+restart_browser 가 드라이버를 새로 띄우고 로그인하는 동안(10~30초) 조회가 멈추는 것을 막기 위해,
+미리 로그인해서 조회 페이지에 세워 둔 드라이버를 준비해 두었다가 즉시 교체한다.
+교체로 빈 자리는 백그라운드 스레드가 다시 채우고, 주기적인 상태 확인으로
+세션이 만료된 예비 드라이버는 쓰이기 전에 새로 만든다.
+교체할 때는 서버에 요청하는 상태 확인을 다시 하지 않고 (백그라운드 확인을 통과한 드라이버를 바로 쓴다)
+chromedriver 프로세스가 살아 있는지만 확인한다.
+"""
+import threading
+import time
+from collections import deque
+
+
+class DriverPool:
+    def __init__(self, factory, size=1, health_check=None, health_interval=60, closer=None):
+        """
+        :param factory: 로그인 후 조회 페이지까지 이동한 새 드라이버를 반환하는 함수
+        :param size: 유지할 예비 드라이버 수
+        :param health_check: 드라이버를 받아 정상 여부(bool)를 반환하는 함수
+        :param health_interval: 예비 드라이버 상태 확인 주기(초)
+        :param closer: 드라이버를 닫는 함수 (기본: driver.quit, 브라우저 자리 등을 함께 돌려줄 때 사용)
+        """
+        self.factory = factory
+        self.size = size
+        self.health_check = health_check
+        self.health_interval = health_interval
+        self.closer = closer
+
+        self.standby = deque()
+        self.lock = threading.Lock()
+        self.checked = threading.Condition(self.lock)  # 예비 드라이버 하나의 상태 확인이 끝남
+        self.checking = None                            # 상태를 확인 중인 예비 드라이버
+        self.wake = threading.Event()
+        self.closed = threading.Event()
+        self.thread = None
+
+        self.cnt_built = 0
+        self.cnt_recycled = 0
+
+    def start(self):
+        """백그라운드에서 예비 드라이버를 채우고 상태를 확인하는 스레드를 시작"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._maintain, name='driver-pool', daemon=True)
+            self.thread.start()
+        self.wake.set()
+        return self
+
+    def _build(self):
+        try:
+            driver = self.factory()
+        except Exception as e:
+            print(f"예비 드라이버 생성 실패: {str(e)}")
+            return None
+        self.cnt_built += 1
+        return driver
+
+    def _is_healthy(self, driver):
+        if self.health_check is None:
+            return True
+        try:
+            return bool(self.health_check(driver))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _is_alive(driver):
+        """chromedriver 프로세스에 연결되는지만 확인한다 (로컬 포트 확인, 서버 요청 없음)"""
+        service = getattr(driver, 'service', None)
+        if service is None:
+            return True
+        try:
+            return service.is_connectable()
+        except Exception:
+            return False
+
+    def _quit(self, driver):
+        try:
+            if self.closer is not None:
+                self.closer(driver)
+            else:
+                driver.quit()
+        except Exception as e:
+            print(f"Error closing browser: {str(e)}")
+
+    def discard(self, driver):
+        """실패한 드라이버를 백그라운드에서 종료 (호출한 쪽은 기다리지 않음)"""
+        if driver is not None:
+            threading.Thread(target=self._quit, args=(driver,), daemon=True).start()
+
+    def check_standby(self):
+        """
+        예비 드라이버 상태를 하나씩 확인하고, 비정상인 드라이버는 버린다
+        확인하는 동안에도 드라이버를 standby 에 둔 채로 확인해서, 그 사이 acquire 가 새로 만들지 않게 한다
+        """
+        with self.lock:
+            drivers = list(self.standby)
+
+        for driver in drivers:
+            with self.lock:
+                if driver not in self.standby:
+                    continue  # 이미 꺼내 간 드라이버
+                self.checking = driver
+            healthy = self._is_healthy(driver)
+            with self.lock:
+                self.checking = None
+                if not healthy and driver in self.standby:
+                    self.standby.remove(driver)
+                else:
+                    healthy = True  # close() 가 이미 치운 드라이버는 건드리지 않는다
+                self.checked.notify_all()
+            if not healthy:
+                print("세션이 만료된 예비 드라이버를 교체합니다")
+                self.cnt_recycled += 1
+                self._quit(driver)
+
+    def _take(self):
+        """
+        standby 에서 드라이버 하나를 꺼낸다 (없으면 None)
+        상태를 확인 중인 드라이버만 남아 있으면 확인이 끝날 때까지 기다린다 (새로 만드는 것보다 빠르다)
+        """
+        with self.lock:
+            while True:
+                for driver in self.standby:
+                    if driver is not self.checking:
+                        self.standby.remove(driver)
+                        return driver
+                if self.checking is None or self.checking not in self.standby:
+                    return None
+                self.checked.wait()
+
+    def _fill(self):
+        while not self.closed.is_set():
+            with self.lock:
+                if len(self.standby) >= self.size:
+                    return
+            driver = self._build()
+            if driver is None:
+                return
+            with self.lock:
+                if self.closed.is_set():
+                    self._quit(driver)
+                    return
+                self.standby.append(driver)
+            print(f"예비 드라이버 준비 완료 ({len(self.standby)}/{self.size})")
+
+    def _maintain(self):
+        next_check = time.time() + self.health_interval
+        while not self.closed.is_set():
+            self._fill()
+            self.wake.wait(max(0, next_check - time.time()))
+            self.wake.clear()
+            if time.time() >= next_check:
+                self.check_standby()
+                next_check = time.time() + self.health_interval
+
+    def acquire(self):
+        """
+        백그라운드 상태 확인을 통과한 예비 드라이버를 즉시 꺼내서 반환
+        (세션 확인은 check_standby 에 맡기고, 여기서는 chromedriver 가 살아 있는지만 본다)
+        예비 드라이버가 없으면 그 자리에서 새로 만든다
+        """
+        while True:
+            driver = self._take()
+            if driver is None:
+                break
+            if self._is_alive(driver):
+                self.wake.set()
+                return driver
+            self.cnt_recycled += 1
+            self.discard(driver)
+
+        self.wake.set()
+        print("준비된 예비 드라이버가 없어 새로 만듭니다")
+        return self.factory()
+
+    def close(self):
+        """풀을 닫고 남은 예비 드라이버를 모두 종료"""
+        self.closed.set()
+        self.wake.set()
+        with self.lock:
+            drivers = list(self.standby)
+            self.standby.clear()
+        for driver in drivers:
+            self._quit(driver)
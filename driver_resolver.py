@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+chromedriver 경로 찾기
+
+재시작할 때마다 ChromeDriverManager().install() 로 최신 버전을 확인하지 않도록,
+한 번 찾은 경로를 머신별 캐시 파일에 기록해 두고 다음부터는 바로 사용한다.
+
+찾는 순서
+1. 인자로 받은 경로
+2. CHROMEDRIVER_PATH 환경 변수
+3. 캐시 파일에 기록된 경로 (파일이 아직 있을 때만)
+4. PATH 에 있는 chromedriver (Linux 패키지 등, 오프라인 동작)
+5. webdriver_manager 로 다운로드 (네트워크 필요)
+모두 실패하면 None 을 반환하고, Selenium Manager 가 찾도록 맡긴다.
+
+Chrome 이 자동 업데이트되어 찾아 둔 chromedriver 로 세션을 만들 수 없으면 (SessionNotCreatedException)
+SRT.run_driver 가 캐시를 지우고 그 경로를 빼고(exclude) 한 번 다시 찾는다.
+"""
+import json
+import os
+import shutil
+
+CACHE_DIR = os.getenv('SRT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'srt'))
+CACHE_FILE = os.path.join(CACHE_DIR, 'chromedriver.json')
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def read_cache():
+    try:
+        with open(CACHE_FILE, encoding='utf-8') as f:
+            return json.load(f).get('path')
+    except (OSError, ValueError):
+        return None
+
+
+def write_cache(path):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'path': path}, f)
+    except OSError as e:
+        print(f"chromedriver 경로 캐시 저장 실패: {str(e)}")
+
+
+def clear_cache():
+    try:
+        os.remove(CACHE_FILE)
+    except FileNotFoundError:
+        pass
+
+
+def resolve_chromedriver(path=None, allow_download=True, exclude=None):
+    """
+    :param path: 직접 지정한 chromedriver 경로
+    :param allow_download: 찾지 못했을 때 webdriver_manager 로 다운로드할지 여부
+    :param exclude: 설치된 Chrome 과 버전이 맞지 않아 쓰지 않을 chromedriver 경로
+    :return: chromedriver 경로 또는 None
+    """
+    for candidate in (path, os.getenv('CHROMEDRIVER_PATH')):
+        if candidate and candidate != exclude:
+            if _is_executable(candidate):
+                return candidate
+            print(f"chromedriver 를 찾을 수 없습니다: {candidate}")
+
+    cached = read_cache()
+    if cached != exclude and _is_executable(cached):
+        return cached
+
+    found = shutil.which('chromedriver')
+    if found and found != exclude:
+        write_cache(found)
+        return found
+
+    if allow_download:
+        try:
+            # webdriver_manager 는 import 비용이 커서 실제로 다운로드할 때만 불러온다
+            from webdriver_manager.chrome import ChromeDriverManager
+
+            found = ChromeDriverManager().install()
+        except Exception as e:
+            print(f"chromedriver 다운로드 실패: {str(e)}")
+            found = None
+        if found != exclude and _is_executable(found):
+            write_cache(found)
+            return found
+
+    return None
@@ -10,3 +10,16 @@ class InvalidDateError(Exception):
 class InvalidTimeFormatError(Exception):
     pass
 
+class SessionExpiredError(Exception):
+    pass
+
+class RateLimitedError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class InvalidRouteError(Exception):
+    pass
+
+class PopupBlockedError(Exception):
+    pass
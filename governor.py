@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+장시간 감시용 브라우저 자원 관리 (resource governor)
+
+몇 시간씩 켜 두는 headless Chrome 은 렌더러 메모리가 조금씩 늘다가 결국 죽고 나서야 restart_browser 로 교체된다.
+ResourceGovernor 는
+- 조회 사이(예약 중이 아닐 때)에 드라이버 프로세스 트리의 RSS/CPU 를 재서 (procstat)
+  예산에 가까워지면(headroom) 죽기 전에 미리 교체하고, 너무 오래 켜 둔 드라이버도 교체하며
+- 한 호스트에서 동시에 띄우는 브라우저 수를 HostSlots 로 제한한다 (자리가 없으면 차례대로 대기)
+여러 감시 프로세스를 한 서버에 올려도 브라우저 수와 브라우저당 메모리가 예산 안에 머문다.
+
+HostSlots 는 lock_dir 의 slot 파일에 flock 을 걸어서 같은 호스트의 다른 프로세스와도 자리를 나눈다.
+fcntl 이 없는 환경(Windows)에서는 이 프로세스 안에서만 제한한다.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+from procstat import tree_usage, driver_pid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 교체 사유 (metrics 라벨)
+RSS = 'rss'
+CPU = 'cpu'
+AGE = 'age'
+
+
+class HostSlots:
+    def __init__(self, limit, lock_dir=None, poll_interval=0.5):
+        """
+        :param limit: 호스트 전체에서 동시에 띄울 최대 브라우저 수
+        :param lock_dir: slot 파일을 둘 디렉터리 (같은 호스트의 프로세스끼리 같은 디렉터리를 써야 한다)
+        :param poll_interval: 자리가 나기를 기다릴 때 다시 확인하는 간격(초)
+        """
+        if limit < 1:
+            raise ValueError("브라우저 수 제한은 1 이상이어야 합니다.")
+        self.limit = limit
+        self.lock_dir = lock_dir or os.path.join(tempfile.gettempdir(), 'srt-browsers')
+        self.poll_interval = poll_interval
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self.queue = deque()   # 자리를 기다리는 순서 (이 프로세스 안)
+        self.held = {}         # slot 번호 -> 잠근 파일 (fcntl 이 없으면 None)
+
+    def _try_acquire(self):
+        for slot in range(self.limit):
+            if slot in self.held:
+                continue
+            if fcntl is None:
+                self.held[slot] = None
+                return slot
+            f = open(os.path.join(self.lock_dir, f'slot-{slot}.lock'), 'a+')
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()  # 다른 프로세스가 쓰는 자리
+                continue
+            self.held[slot] = f
+            return slot
+        return None
+
+    def acquire(self, timeout=None):
+        """
+        빈 자리를 얻을 때까지 먼저 기다린 순서대로 대기
+        :return: slot 번호 (release 에 넘긴다)
+        :raises TimeoutError: timeout 초 안에 자리가 나지 않음
+        """
+        ticket = object()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        waited = False
+        with self.lock:
+            self.queue.append(ticket)
+        try:
+            while True:
+                with self.lock:
+                    if self.queue[0] is ticket:
+                        slot = self._try_acquire()
+                        if slot is not None:
+                            self.queue.popleft()
+                            if waited:
+                                print(f"브라우저 자리 {slot + 1}/{self.limit} 를 얻었습니다")
+                            return slot
+                    position = self.queue.index(ticket) + 1
+                if not waited:
+                    print(f"호스트의 브라우저 {self.limit}개가 모두 사용 중입니다. 대기 중 ({position}번째)")
+                    waited = True
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"{timeout}초 동안 브라우저 자리가 나지 않았습니다")
+                time.sleep(self.poll_interval)
+        except BaseException:
+            with self.lock:
+                if ticket in self.queue:
+                    self.queue.remove(ticket)
+            raise
+
+    def release(self, slot):
+        with self.lock:
+            f = self.held.pop(slot, None)
+        if f is not None:
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    def in_use(self):
+        """이 프로세스가 쓰고 있는 자리 수"""
+        with self.lock:
+            return len(self.held)
+
+
+class ResourceGovernor:
+    def __init__(self, max_rss_mb=None, max_cpu_percent=None, max_age=None, max_browsers=None, lock_dir=None,
+                 slot_timeout=60, sample_interval=30, headroom=0.9, cpu_strikes=3, metrics=None):
+        """
+        :param max_rss_mb: 드라이버 하나(chromedriver + Chrome 프로세스 전체)의 메모리 예산(MB)
+        :param max_cpu_percent: 드라이버 하나의 CPU 예산(%), cpu_strikes 번 연달아 넘으면 교체
+        :param max_age: 드라이버를 켜 둘 최대 시간(초), 넘으면 메모리와 상관없이 교체
+        :param max_browsers: 호스트 전체에서 동시에 띄울 최대 브라우저 수 (None 이면 제한 없음)
+        :param lock_dir: HostSlots 의 slot 파일 디렉터리
+        :param slot_timeout: 브라우저 자리를 기다릴 최대 시간(초), None 이면 자리가 날 때까지 기다린다
+        :param sample_interval: 드라이버마다 사용량을 재는 최소 간격(초)
+        :param headroom: 예산의 이 비율에 닿으면 넘기 전에 교체한다
+        :param metrics: 사용량과 교체 횟수를 기록할 Metrics
+        """
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.max_cpu_percent = max_cpu_percent
+        self.max_age = max_age
+        self.slots = HostSlots(max_browsers, lock_dir) if max_browsers else None
+        self.slot_timeout = slot_timeout
+        self.sample_interval = sample_interval
+        self.headroom = headroom
+        self.cpu_strikes = cpu_strikes
+        self.metrics = metrics
+
+        self.lock = threading.Lock()
+        self.drivers = {}   # id(driver) -> {pid, slot, started, sampled, cpu, strikes}
+
+    @property
+    def max_browsers(self):
+        return self.slots.limit if self.slots is not None else None
+
+    def acquire_slot(self):
+        """
+        브라우저를 띄우기 전에 호스트 자리를 얻는다 (제한이 없으면 None)
+        :raises TimeoutError: slot_timeout 안에 자리가 나지 않음
+        """
+        if self.slots is None:
+            return None
+        return self.slots.acquire(self.slot_timeout)
+
+    def release_slot(self, slot):
+        if self.slots is not None and slot is not None:
+            self.slots.release(slot)
+
+    def attach(self, driver, slot=None):
+        """새 드라이버를 등록한다. 드라이버를 닫을 때 detach 로 자리를 돌려준다"""
+        with self.lock:
+            self.drivers[id(driver)] = {'pid': driver_pid(driver), 'slot': slot, 'started': time.monotonic(),
+                                        'sampled': None, 'cpu': None, 'strikes': 0}
+
+    def detach(self, driver):
+        """닫은 드라이버의 기록을 지우고 자리를 돌려준다 (여러 번 불려도 한 번만 돌려준다)"""
+        with self.lock:
+            state = self.drivers.pop(id(driver), None)
+        if state is None:
+            return
+        self.release_slot(state['slot'])
+        if self.metrics is not None and state['pid']:
+            self.metrics.remove_gauge('driver_rss_mb', driver=str(state['pid']))
+            self.metrics.remove_gauge('driver_cpu_percent', driver=str(state['pid']))
+
+    def due(self, driver):
+        """
+        드라이버를 교체해야 하면 사유(RSS / CPU / AGE), 아니면 None
+        sample_interval 이 지나지 않았으면 재지 않고 None
+        """
+        now = time.monotonic()
+        with self.lock:
+            state = self.drivers.get(id(driver))
+            if state is None or not state['pid']:
+                return None
+            pid = state['pid']
+            if state['sampled'] is not None and now - state['sampled'] < self.sample_interval:
+                return None
+            last_sampled, last_cpu = state['sampled'], state['cpu']
+            state['sampled'] = now
+
+        rss, cpu, _ = tree_usage(pid)
+        cpu_percent = None
+        if last_sampled is not None and now > last_sampled:
+            cpu_percent = (cpu - last_cpu) / (now - last_sampled) * 100
+        with self.lock:
+            state['cpu'] = cpu
+            if cpu_percent is not None and self.max_cpu_percent and cpu_percent >= self.max_cpu_percent:
+                state['strikes'] += 1
+            else:
+                state['strikes'] = 0
+            strikes = state['strikes']
+            age = now - state['started']
+
+        if self.metrics is not None:
+            self.metrics.set_gauge('driver_rss_mb', rss / 1024 / 1024, driver=str(pid))
+            if cpu_percent is not None:
+                self.metrics.set_gauge('driver_cpu_percent', cpu_percent, driver=str(pid))
+
+        if self.max_rss and rss >= self.max_rss * self.headroom:
+            return RSS
+        if strikes >= self.cpu_strikes:
+            return CPU
+        if self.max_age and age >= self.max_age:
+            return AGE
+        return None
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+좌석 상태 이력 저장소 (SQLite)
+
+조회할 때마다 버려지던 행 상태(특실/일반실/예약 대기)를 시각과 함께 쌓아 두고,
+"이 노선의 이 기차는 보통 언제 좌석이 풀리는가"를 답하는 조회 API 를 제공한다.
+
+- 기록은 append-only. record() 는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 한 트랜잭션으로 쓴다
+  (조회 루프에 디스크 I/O 지연이 생기지 않음)
+- 매진 → 예약 가능으로 바뀐 시점(release)을 window 함수로 뽑아 시간대별/출발 전 시간별로 집계
+- burst_hint() 는 PollScheduler.burst_hint 에, window_priority() 는 Sweeper.priority 에 바로 넣을 수 있다
+
+python history.py srt_history.db --dpt 수서 --arr 부산 [--train 301] [--days 30]
+"""
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from result_parser import UNKNOWN_TRAIN
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    ts REAL NOT NULL,
+    dpt_stn TEXT NOT NULL,
+    arr_stn TEXT NOT NULL,
+    dpt_dt TEXT NOT NULL,
+    train_num TEXT NOT NULL,
+    departure TEXT NOT NULL,
+    premium_seat TEXT NOT NULL,
+    standard_seat TEXT NOT NULL,
+    reservation TEXT NOT NULL,
+    available INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS observations_route ON observations (dpt_stn, arr_stn, dpt_dt, train_num, ts);
+"""
+
+# 매진이었다가 예약 가능해진 관측만 뽑는다
+RELEASES_SQL = """
+SELECT ts, dpt_dt, train_num, departure FROM (
+    SELECT ts, dpt_dt, train_num, departure, available,
+           LAG(available) OVER (PARTITION BY dpt_dt, train_num ORDER BY ts) AS previous
+    FROM observations
+    WHERE dpt_stn = ? AND arr_stn = ? AND ts >= ? {train_filter}
+)
+WHERE available = 1 AND previous = 0
+ORDER BY ts
+"""
+
+_STOP = object()
+
+
+def _lead_minutes(ts, dpt_dt, departure):
+    """관측 시각부터 열차 출발까지 남은 시간(분), 출발 시각을 모르면 None"""
+    if not departure:
+        return None
+    departs = datetime.strptime(f"{dpt_dt} {departure}", '%Y%m%d %H:%M')
+    return int((departs.timestamp() - ts) // 60)
+
+
+class HistoryStore:
+    def __init__(self, path, batch_size=500, flush_interval=1.0):
+        """
+        :param path: SQLite 파일 경로
+        :param batch_size: 이만큼 모이면 바로 쓴다
+        :param flush_interval: 덜 모였어도 이 시간(초)이 지나면 쓴다
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.cnt_written = 0
+
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+        self.writer = threading.Thread(target=self._write_loop, name='history-writer', daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record(self, dpt_stn, arr_stn, dpt_dt, rows, ts=None):
+        """조회 한 번의 행 레코드를 기록 큐에 넣는다 (바로 반환)"""
+        ts = ts or time.time()
+        records = [(ts, dpt_stn, arr_stn, str(dpt_dt), row.train_num, row.departure,
+                    row.premium_seat, row.standard_seat, row.reservation, int(row.available))
+                   for row in rows if row.train_num != UNKNOWN_TRAIN]
+        if records:
+            self.queue.put(records)
+
+    def _write_loop(self):
+        conn = self._connect()
+        batch = []
+        waiters = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.extend(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (stopping or waiters or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    with conn:
+                        conn.executemany('INSERT INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', batch)
+                    self.cnt_written += len(batch)
+                except sqlite3.Error as e:
+                    print(f"이력 기록 실패 ({len(batch)}건): {str(e)}")
+                batch = []
+                deadline = None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+        conn.close()
+
+    def flush(self, timeout=10):
+        """지금까지 record 한 내용이 쓰일 때까지 기다린다"""
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        self.queue.put(_STOP)
+        self.writer.join(timeout=10)
+
+    def releases(self, dpt_stn, arr_stn, train_num=None, days=30):
+        """
+        좌석이 풀린(매진 → 예약 가능) 관측 목록
+
+        :param train_num: 기차 번호 (None 이면 노선 전체)
+        :param days: 최근 며칠치 이력을 볼지
+        :return: [dict(ts, dpt_dt, train_num, departure, lead_minutes), ...]
+        """
+        params = [dpt_stn, arr_stn, time.time() - days * 86400]
+        train_filter = ''
+        if train_num:
+            train_filter = 'AND train_num = ?'
+            params.append(train_num)
+        with self._connect() as conn:
+            rows = conn.execute(RELEASES_SQL.format(train_filter=train_filter), params).fetchall()
+        return [{'ts': ts, 'dpt_dt': dpt_dt, 'train_num': train, 'departure': departure,
+                 'lead_minutes': _lead_minutes(ts, dpt_dt, departure)}
+                for ts, dpt_dt, train, departure in rows]
+
+    def release_profile(self, dpt_stn, arr_stn, train_num=None, days=30, bucket_minutes=10):
+        """
+        좌석이 풀린 시각(하루 중 몇 시 몇 분)별 횟수
+
+        :return: {구간 시작 분(0~1439): 횟수}
+        """
+        profile = {}
+        for release in self.releases(dpt_stn, arr_stn, train_num, days):
+            moment = datetime.fromtimestamp(release['ts'])
+            bucket = (moment.hour * 60 + moment.minute) // bucket_minutes * bucket_minutes
+            profile[bucket] = profile.get(bucket, 0) + 1
+        return profile
+
+    def lead_profile(self, dpt_stn, arr_stn, train_num=None, days=30):
+        """
+        좌석이 풀린 시점이 출발 몇 시간 전이었는지별 횟수
+
+        :return: {출발 전 시간(h): 횟수}
+        """
+        profile = {}
+        for release in self.releases(dpt_stn, arr_stn, train_num, days):
+            if release['lead_minutes'] is not None and release['lead_minutes'] >= 0:
+                hours = release['lead_minutes'] // 60
+                profile[hours] = profile.get(hours, 0) + 1
+        return profile
+
+    def burst_hint(self, dpt_stn, arr_stn, train_num=None, days=30, bucket_minutes=10, min_count=2, margin=5,
+                   refresh=300):
+        """
+        PollScheduler.burst_hint 용 함수. 지금이 좌석이 자주 풀리던 시간대(앞뒤 margin 분 포함)면 True
+
+        :param min_count: 이 횟수 이상 풀린 구간만 본다
+        :param refresh: 집계를 다시 읽는 간격(초). 조회 루프에서 매번 DB 를 읽지 않는다
+        """
+        cache = {'at': None, 'buckets': ()}
+        if not isinstance(train_num, str) or train_num == 'none':
+            train_num = None  # 기차 번호 집합이면 노선 전체 이력을 본다
+
+        def hint(now):
+            if cache['at'] is None or time.monotonic() - cache['at'] > refresh:
+                profile = self.release_profile(dpt_stn, arr_stn, train_num, days, bucket_minutes)
+                cache['buckets'] = [bucket for bucket, count in profile.items() if count >= min_count]
+                cache['at'] = time.monotonic()
+            minute = now.hour * 60 + now.minute
+            return any((minute - bucket + margin) % 1440 < bucket_minutes + 2 * margin for bucket in cache['buckets'])
+
+        return hint
+
+    def window_priority(self, dpt_stn, arr_stn, days=30, refresh=300):
+        """
+        Sweeper.priority 용 함수. (dpt_dt, dpt_tm) -> 그 조회 창에 출발하는 열차의 좌석이 풀린 횟수
+        """
+        cache = {'at': None, 'counts': {}}
+
+        def priority(dpt_dt, dpt_tm):
+            if cache['at'] is None or time.monotonic() - cache['at'] > refresh:
+                counts = {}
+                for release in self.releases(dpt_stn, arr_stn, days=days):
+                    if release['departure']:
+                        window = f"{int(release['departure'][:2]) // 2 * 2:02d}"
+                        counts[window] = counts.get(window, 0) + 1
+                cache['counts'] = counts
+                cache['at'] = time.monotonic()
+            return cache['counts'].get(dpt_tm, 0)
+
+        return priority
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='When do seats free up on a route')
+    parser.add_argument("path", help="History database file")
+    parser.add_argument("--dpt", help="Departure Station", type=str, required=True)
+    parser.add_argument("--arr", help="Arrival Station", type=str, required=True)
+    parser.add_argument("--train", help="Train number", type=str, default=None)
+    parser.add_argument("--days", help="Look back this many days", type=int, default=30)
+    args = parser.parse_args()
+
+    store = HistoryStore(args.path)
+    releases = store.releases(args.dpt, args.arr, args.train, args.days)
+    print(f"{args.dpt} → {args.arr} {args.train or '전체'}: 최근 {args.days}일 좌석 풀림 {len(releases)}회")
+    print("[시간대]")
+    for bucket, count in sorted(store.release_profile(args.dpt, args.arr, args.train, args.days).items(),
+                                key=lambda item: -item[1])[:10]:
+        print(f"  {bucket // 60:02d}:{bucket % 60:02d}  {count}회")
+    print("[출발 전]")
+    for hours, count in sorted(store.lead_profile(args.dpt, args.arr, args.train, args.days).items()):
+        print(f"  {hours}시간 전  {count}회")
+    store.close()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Selenium 없이 requests.Session 으로 조회(selectScheduleList.do)를 반복하는 엔진
+
+브라우저에서 로그인한 쿠키를 그대로 옮겨 받아 조회 폼을 직접 POST 하고,
+응답 HTML 을 result_parser 로 파싱한다. 예약 가능한 행이 보이면
+브라우저(또는 직접 예약 요청)로 제어를 넘기는 것은 호출하는 쪽(SRT)의 몫이다.
+"""
+from exceptions import SessionExpiredError, RateLimitedError
+from result_parser import parse_result_html
+from stations import get_stations
+from util import LazyImport
+
+# requests 는 HTTP 엔진을 실제로 만들 때 불러온다
+requests = LazyImport('requests')
+HTTPAdapter = LazyImport('requests.adapters', 'HTTPAdapter')
+
+SRT_BASE_URL = 'https://etk.srail.kr'
+SRT_LOGIN_URL = 'https://etk.srail.co.kr/cmc/01/selectLoginForm.do'
+SEARCH_PATH = '/hpg/hra/01/selectScheduleList.do'
+LOGIN_PATH = '/cmc/01/selectLoginForm.do'
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/61.0.3163.100 Safari/537.36"
+
+
+def build_search_form(dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num):
+    """
+    조회 페이지의 검색 폼과 같은 필드를 가진 POST 데이터를 만든다 (역 이름과 역 코드를 함께 보낸다)
+
+    :param dpt_tm: 출발 시간 hh 형태 ex) 08
+    """
+    return {
+        **get_stations().search_fields(dpt_stn, arr_stn),
+        'dptDt': str(dpt_dt),
+        'dptTm': f"{str(dpt_tm).zfill(2)}0000",
+        'psgInfoPerPrnb1': str(int(adult_num)),
+        'psgInfoPerPrnb5': str(int(child_num)),
+        'stlbTrnClsfCd': '17',  # SRT
+        'trnGpCd': '300',
+        'chtnDvCd': '1',
+        'arriveTime': 'N',
+        'isRequest': 'Y',
+    }
+
+
+class HttpSearchEngine:
+    def __init__(self, base_url=SRT_BASE_URL, pool_size=4, timeout=5, session=None, recorder=None):
+        """
+        :param base_url: 조회 서버 주소 (테스트용 대역 서버 주소로 바꿀 수 있음)
+        :param pool_size: 커넥션 풀 크기
+        :param timeout: 요청 타임아웃(초)
+        :param session: 이미 만들어 둔 requests.Session (없으면 새로 생성, 재생할 때는 replay.ReplaySession)
+        :param recorder: 조회 응답을 남길 replay.Recorder
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.recorder = recorder
+
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': USER_AGENT,
+            'Accept-Language': 'ko-KR,ko;q=0.9',
+            'Referer': self.search_url,
+        })
+
+        self.cnt_search = 0
+
+    @property
+    def search_url(self):
+        return self.base_url + SEARCH_PATH
+
+    def load_cookies(self, cookies):
+        """
+        Selenium driver.get_cookies() 형태의 쿠키 목록을 세션에 넣는다
+        로그인(etk.srail.co.kr)과 조회(etk.srail.kr) 도메인이 달라 도메인은 지정하지 않는다
+        """
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], path=cookie.get('path', '/'))
+
+    def load_cookies_from_driver(self, driver):
+        self.load_cookies(driver.get_cookies())
+
+    def search(self, form):
+        """
+        조회 폼을 POST 하고 응답 HTML 을 반환
+
+        :param form: build_search_form 으로 만든 POST 데이터
+        :raises RateLimitedError: 요청 제한 응답(429, 503)
+        :raises requests.RequestException: 네트워크 오류 또는 그 밖의 4xx/5xx 응답
+        """
+        response = self.session.post(self.search_url, data=form, timeout=self.timeout)
+        retry_after = response.headers.get('Retry-After')
+        if self.recorder is not None:
+            self.recorder.record_html('http', response.text, status=response.status_code, retry_after=retry_after)
+        if response.status_code in (429, 503):
+            raise RateLimitedError(f"요청 제한 응답: {response.status_code}",
+                                   retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+        response.raise_for_status()
+        self.cnt_search += 1
+        return response.text
+
+    def fetch_rows(self, form, num_rows):
+        """
+        조회 후 상위 num_rows 개 행 레코드를 반환
+
+        :raises SessionExpiredError: 결과 테이블 대신 로그인 페이지 등이 돌아온 경우
+        """
+        page = self.search(form)
+        if 'result-form' not in page:
+            raise SessionExpiredError("조회 결과가 없습니다. 로그인 세션이 만료되었을 수 있습니다.")
+        return parse_result_html(page, num_rows)
+
+    def close(self):
+        self.session.close()
@@ -1,23 +1,51 @@
 # -*- coding: utf-8 -*-
 import os
 import time
-from random import randint
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.select import Select
-from selenium.common.exceptions import ElementClickInterceptedException, StaleElementReferenceException, WebDriverException, TimeoutException, UnexpectedAlertPresentException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from exceptions import InvalidStationNameError, InvalidDateError, InvalidDateFormatError, InvalidTimeFormatError
-from validation import station_list
-
-chromedriver_path = r'C:\workspace\chromedriver.exe'
+from selenium.common.exceptions import JavascriptException, NoSuchElementException, SessionNotCreatedException, StaleElementReferenceException, WebDriverException, TimeoutException, UnexpectedAlertPresentException
 
+from util import LazyImport
+
+# selenium.webdriver 는 import 에 100ms 이상 걸려서 드라이버를 실제로 쓸 때 불러온다
+webdriver = LazyImport('selenium.webdriver')
+Service = LazyImport('selenium.webdriver.chrome.service', 'Service')
+By = LazyImport('selenium.webdriver.common.by', 'By')
+Select = LazyImport('selenium.webdriver.support.select', 'Select')
+WebDriverWait = LazyImport('selenium.webdriver.support.ui', 'WebDriverWait')
+EC = LazyImport('selenium.webdriver.support.expected_conditions')
+requests = LazyImport('requests')
+
+from exceptions import SessionExpiredError, RateLimitedError, PopupBlockedError
+from validation import check_input
+from http_engine import HttpSearchEngine, build_search_form, SRT_BASE_URL, SRT_LOGIN_URL, SEARCH_PATH, LOGIN_PATH
+from driver_pool import DriverPool
+from driver_resolver import clear_cache, resolve_chromedriver
+from browser_profile import BrowserProfile
+from session_store import SessionStore
+from change_detection import MARK_SCRIPT, READY_SCRIPT, TableTracker, ready
+from scheduler import PollScheduler
+from metrics import Metrics, timed
+from race import resolve_links, race_tabs
+from notifier import Notifier, IMessageBackend, send_imessage
+from prearm import ArmedBooking, ARMED_SCRIPT, wait_for_confirmation
+from recovery import Recovery, REPLACE_DRIVER
+from replay import RESULT_FORM_SCRIPT
+from result_parser import RESULT_ROWS_SELECTOR, SNAPSHOT_SCRIPT, cell_locator, link_locator, row_from_cells, rows_from_snapshot, parse_result_html
+from rules import BookingRules, BOOK, RESERVE
+from stations import FILL_SCRIPT, get_stations
+
+# 브라우저 쿠키로 url 을 요청해 {url: 최종 주소, status, welcome: header 에 로그인 문구가 있는지} 를 반환 (실패하면 null)
+# 페이지를 옮기지 않고 서버 세션만 확인한다. arguments[0]: 요청할 주소, arguments[1]: 응답을 기다릴 최대 시간(ms)
+LOGIN_CHECK_SCRIPT = """
+var done = arguments[arguments.length - 1];
+setTimeout(function () { done(null); }, arguments[1]);
+fetch(arguments[0], {credentials: 'include'}).then(function (response) {
+    return response.text().then(function (text) {
+        done({url: response.url, status: response.status, welcome: text.indexOf('환영합니다') >= 0});
+    });
+}).catch(function () { done(null); });
+"""
+
+import copy
 import subprocess
 import platform
 import dotenv
@@ -25,7 +53,7 @@ import dotenv
 dotenv.load_dotenv()
 
 class SRT:
-    def __init__(self, dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check=4, want_reserve=False, want_train='none'):
+    def __init__(self, dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check=4, want_reserve=False, want_train='none', snapshot=True, engine='selenium', base_url=None, standby_drivers=0, scheduler=None, session_file=None, chromedriver_path=None, browser_profile=None, metrics=None, race=False, race_width=3, history=None, notifier=None, recorder=None, prearm=False, governor=None):
         """
         :param dpt_stn: SRT 출발역
         :param arr_stn: SRT 도착역
@@ -36,6 +64,22 @@ class SRT:
         :param num_trains_to_check: 검색 결과 중 예약 가능 여부 확인할 기차의 수 ex) 2일 경우 상위 2개 확인
         :param want_reserve: 예약 대기가 가능할 경우 선택 여부
         :param want_train: 예약 대기 기차 선택 여부
+        :param snapshot: 결과 테이블을 execute_script 한 번으로 읽을지 여부 (False 면 셀마다 find_element)
+        :param engine: 새로고침 엔진. 'selenium' 은 브라우저로, 'http' 는 requests 로 조회 반복 후 예약만 브라우저로 진행
+        :param base_url: SRT 서버 주소. 테스트용 대역 서버를 쓸 때 지정 ex) http://127.0.0.1:8000
+        :param standby_drivers: 장애 시 즉시 교체할 수 있도록 미리 로그인해 둘 예비 드라이버 수
+        :param scheduler: 새로고침 간격을 정하는 PollScheduler (기본: 2~4초 무작위)
+        :param session_file: 로그인 세션을 암호화해서 저장/복원할 파일 경로 (None 이면 사용 안 함)
+        :param chromedriver_path: chromedriver 경로 (None 이면 환경 변수/캐시/PATH/다운로드 순으로 찾음)
+        :param browser_profile: 이미지/CSS/폰트/분석 스크립트를 막는 BrowserProfile (None 이면 일반 브라우저)
+        :param metrics: 구간별 시간과 횟수를 기록할 Metrics
+        :param race: 예약 가능한 행이 여러 개면 새 탭에서 동시에 예약을 시도하고 먼저 확인된 한 건만 남길지 여부
+        :param race_width: 동시에 예약을 시도할 최대 행 수
+        :param history: 조회한 행 상태를 쌓아 둘 HistoryStore (None 이면 기록 안 함)
+        :param notifier: 예약 성공 등을 알릴 Notifier (None 이면 전화번호가 있을 때 iMessage 로 알림)
+        :param recorder: 조회 응답과 예약 결과를 남길 replay.Recorder (None 이면 기록 안 함)
+        :param prearm: 예약 조건을 미리 준비해 두고, 새 결과가 그려지는 순간 조건에 맞는 좌석을 같은 스크립트에서 바로 누를지 여부
+        :param governor: 드라이버 메모리/CPU 예산과 호스트의 브라우저 수를 관리할 ResourceGovernor (None 이면 관리 안 함)
         """
         self.login_id = None
         self.login_psw = None
@@ -50,31 +94,80 @@ class SRT:
         self.num_trains_to_check = num_trains_to_check
         self.want_reserve = want_reserve
         self.want_train = want_train
+        self.rules = BookingRules(want_train, want_reserve)
+        self.prearm = prearm
+        self.armed = None
+        self.arm()
+        self.snapshot = snapshot
+
+        if engine not in ('selenium', 'http'):
+            raise ValueError(f"지원하지 않는 엔진입니다: {engine}")
+        self.engine = engine
+        self.base_url = base_url
+        self.login_url = base_url.rstrip('/') + LOGIN_PATH if base_url else SRT_LOGIN_URL
+        self.search_url = (base_url or SRT_BASE_URL).rstrip('/') + SEARCH_PATH
+        self.http_engine = None
+
+        self.standby_drivers = standby_drivers
+        self.scheduler = scheduler or PollScheduler()
+        self.session_store = SessionStore(session_file) if session_file else None
+        self.chromedriver_path = chromedriver_path
+        self.browser_profile = browser_profile
+        self.metrics = metrics or Metrics()
+        self.race = race
+        self.race_width = race_width
+        self.history = history
+        self.notifier = notifier
+        self.recorder = recorder
+        self.governor = governor
+        self.started = time.time()
+        self.driver_pool = None
         
         self.driver = None
 
         self.is_booked = False  # 예약 완료 되었는지 확인용
         self.cnt_refresh = 0  # 새로고침 회수 기록
 
+        self.table_tracker = TableTracker()  # 행별 좌석 상태 fingerprint
+        self.fresh_rows = None  # 새로고침을 기다리며 읽어 둔 행 (read_result_rows 에서 한 번 사용)
+        self.recovery = Recovery(self)  # 오류 종류별 복구
+
         self.check_input()
+        self.record_query()
 
         self.phone_number = os.getenv('SRT_PHONE_NUMBER')  # Add this line to store the user's phone number
 
     def check_input(self):
-        if self.dpt_stn not in station_list:
-            raise InvalidStationNameError(f"출발역 오류. '{self.dpt_stn}' 은/는 목록에 없습니다.")
-        if self.arr_stn not in station_list:
-            raise InvalidStationNameError(f"도착역 오류. '{self.arr_stn}' 은/는 목록에 없습니다.")
-        if not str(self.dpt_dt).isnumeric():
-            raise InvalidDateFormatError("날짜는 숫자로만 이루어져야 합니다.")
-        try:
-            datetime.strptime(str(self.dpt_dt), '%Y%m%d')
-        except ValueError:
-            raise InvalidDateError("날짜가 잘못 되었습니다. YYYYMMDD 형식으로 입력해주세요.")
+        check_input(self.dpt_stn, self.arr_stn, self.dpt_dt)
+
+    def apply_query(self, query):
+        """
+        watcher.Query 의 조회 조건으로 바꾼다 (하나의 로그인 세션으로 여러 조건을 예약할 때 사용)
+        """
+        self.dpt_stn = query.dpt_stn
+        self.arr_stn = query.arr_stn
+        self.dpt_dt = query.dpt_dt
+        self.dpt_tm = query.dpt_tm
+        self.adult_num = query.adult_num
+        self.child_num = query.child_num
+        self.num_trains_to_check = query.num_trains_to_check
+        self.want_reserve = query.want_reserve
+        self.want_train = query.want_train
+        self.rules = BookingRules(query.want_train, query.want_reserve)
+        self.arm()
+        self.check_input()
+        self.record_query()
+
+    def arm(self):
+        """prearm 이면 현재 예약 조건과 인원 수로 ArmedBooking 을 다시 만든다"""
+        if self.prearm:
+            self.armed = ArmedBooking(self.rules, self.adult_num, self.child_num)
 
     def set_log_info(self, login_id, login_psw):
         self.login_id = login_id
         self.login_psw = login_psw
+        if self.session_store:
+            self.session_store.set_secret(login_psw)
 
     def run_driver(self):
         options = webdriver.ChromeOptions()
@@ -83,14 +176,43 @@ class SRT:
         options.add_argument("disable-gpu")
         options.add_argument("user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_12_6) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/61.0.3163.100 Safari/537.36")
         options.add_argument("lang=ko_KR")
+        if self.browser_profile:
+            self.browser_profile.apply(options)
 
-        # Use webdriver_manager to automatically download and manage ChromeDriver
-        if platform.system() == "Darwin":  # macOS
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-        else:
-            # For other operating systems, you might want to keep the original implementation
-            self.driver = webdriver.Chrome('C:\\workspace\\chromedriver.exe', options=options)
+        # 한 번 찾은 chromedriver 경로를 기억해 두고 재시작 때 다시 찾지 않는다
+        if self.chromedriver_path is None:
+            self.chromedriver_path = resolve_chromedriver()
+        # 호스트의 브라우저 수 제한이 있으면 자리가 날 때까지 기다린다
+        slot = self.governor.acquire_slot() if self.governor else None
+        try:
+            try:
+                self.driver = self.start_chrome(options)
+            except SessionNotCreatedException as e:
+                if not self.chromedriver_path:
+                    raise
+                # Chrome 이 자동 업데이트되면 찾아 둔 chromedriver 와 버전이 맞지 않는다. 캐시를 지우고 한 번만 다시 찾는다
+                message = (e.msg or '').strip().split('\n')[0]
+                print(f"chromedriver 로 브라우저를 시작하지 못해 다시 찾습니다: {message}")
+                clear_cache()
+                self.chromedriver_path = resolve_chromedriver(allow_download=True, exclude=self.chromedriver_path)
+                self.driver = self.start_chrome(options)
+        except Exception:
+            if self.governor:
+                self.governor.release_slot(slot)
+            raise
+        if self.governor:
+            self.governor.attach(self.driver, slot)
 
+        if self.browser_profile:
+            self.browser_profile.install(self.driver)
+
+    def start_chrome(self, options):
+        if self.chromedriver_path:
+            return webdriver.Chrome(service=Service(self.chromedriver_path), options=options)
+        # 찾지 못하면 Selenium Manager 에 맡긴다
+        return webdriver.Chrome(options=options)
+
+    @timed('login')
     def login(self):
         max_login_attempts = 3
         attempt = 0
@@ -98,9 +220,10 @@ class SRT:
         while attempt < max_login_attempts:
             try:
                 print(f"Attempting login ({attempt+1}/{max_login_attempts})...")
+                self.metrics.incr('login_attempts')
                 
                 # Navigate to login page
-                self.driver.get('https://etk.srail.co.kr/cmc/01/selectLoginForm.do')
+                self.driver.get(self.login_url)
                 
                 # Wait for login form to load
                 WebDriverWait(self.driver, 15).until(
@@ -128,6 +251,7 @@ class SRT:
                 # Check if login was successful
                 if self.check_login():
                     print("Login successful")
+                    self.save_session()
                     return self.driver
                 else:
                     # Try to capture any error messages on the page
@@ -151,6 +275,68 @@ class SRT:
         print("Failed to login after multiple attempts")
         raise Exception("Login failed after multiple attempts")
 
+    def save_session(self):
+        """로그인된 쿠키와 localStorage 를 세션 파일에 저장"""
+        if not self.session_store:
+            return
+        try:
+            local_storage = self.driver.execute_script(
+                "var out = {}; for (var i = 0; i < localStorage.length; i++) {"
+                " var k = localStorage.key(i); out[k] = localStorage.getItem(k); } return out;")
+            self.session_store.save(self.driver.get_cookies(), local_storage)
+        except Exception as e:
+            print(f"세션 저장 실패: {str(e)}")
+
+    def restore_session(self):
+        """
+        저장된 세션을 드라이버에 넣고 조회 페이지에서 로그인 상태를 확인
+        :return: 복원에 성공하면 True, 세션이 없거나 거부되면 False
+        """
+        if not self.session_store:
+            return False
+        try:
+            session = self.session_store.load()
+        except Exception as e:
+            print(f"세션 복원 실패: {str(e)}")
+            return False
+        if not session:
+            return False
+
+        try:
+            cookies = []
+            for cookie in session['cookies']:
+                cdp_cookie = {key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly') if key in cookie}
+                if 'expiry' in cookie:
+                    cdp_cookie['expires'] = cookie['expiry']
+                cookies.append(cdp_cookie)
+            # CDP 로 넣으면 도메인마다 페이지를 열지 않아도 된다
+            self.driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+            self.driver.get(self.search_url)
+            if session.get('local_storage'):
+                self.driver.execute_script(
+                    "var items = arguments[0]; for (var k in items) { localStorage.setItem(k, items[k]); }",
+                    session['local_storage'])
+        except WebDriverException as e:
+            print(f"세션 복원 실패: {str(e)}")
+            return False
+
+        if self.check_login_status():
+            print("저장된 세션으로 로그인했습니다")
+            return True
+
+        print("저장된 세션이 거부되었습니다. 다시 로그인합니다.")
+        self.session_store.clear()
+        return False
+
+    def ensure_login(self):
+        """이미 로그인되어 있으면 그대로, 아니면 저장된 세션 복원, 그래도 안되면 로그인"""
+        if self.check_login_status():
+            return
+        if self.restore_session():
+            return
+        self.login()
+
     def check_login(self):
         try:
             menu_text = self.driver.find_element(By.CSS_SELECTOR, "#wrap > div.header.header-e > div.global.clear > div").text
@@ -169,6 +355,7 @@ class SRT:
             print(f"Error checking login status: {str(e)}")
             return False
 
+    @timed('search')
     def go_search(self):
         max_search_attempts = 3
         attempt = 0
@@ -176,7 +363,7 @@ class SRT:
         while attempt < max_search_attempts:
             try:
                 # 기차 조회 페이지로 이동
-                self.driver.get('https://etk.srail.kr/hpg/hra/01/selectScheduleList.do')
+                self.driver.get(self.search_url)
                 self.driver.implicitly_wait(5)
                 
                 # Wait for page to load
@@ -184,15 +371,8 @@ class SRT:
                     EC.presence_of_element_located((By.ID, 'dptRsStnCdNm'))
                 )
 
-                # 출발지 입력
-                elm_dpt_stn = self.driver.find_element(By.ID, 'dptRsStnCdNm')
-                elm_dpt_stn.clear()
-                elm_dpt_stn.send_keys(self.dpt_stn)
-
-                # 도착지 입력
-                elm_arr_stn = self.driver.find_element(By.ID, 'arvRsStnCdNm')
-                elm_arr_stn.clear()
-                elm_arr_stn.send_keys(self.arr_stn)
+                # 출발지, 도착지 입력 (역 이름과 역 코드를 한 번에 채운다)
+                self.driver.execute_script(FILL_SCRIPT, get_stations().search_fields(self.dpt_stn, self.arr_stn))
 
                 # 출발 날짜 입력
                 elm_dpt_dt = self.driver.find_element(By.ID, "dptDt")
@@ -227,72 +407,222 @@ class SRT:
                 search_button = WebDriverWait(self.driver, 10).until(
                     EC.element_to_be_clickable((By.XPATH, "//input[@value='조회하기']"))
                 )
-                self.driver.execute_script("arguments[0].click();", search_button)
-                
-                # Wait for search results to load
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#result-form fieldset table tbody tr"))
-                )
-                
+                self.table_tracker.forget()
+                if self.click_search(search_button) is None:
+                    self.record_page('search')
+
                 self.driver.implicitly_wait(5)
-                time.sleep(1)
                 
                 # If we reach this point, the search was successful
                 return
                 
-            except (TimeoutException, WebDriverException, StaleElementReferenceException) as e:
+            except WebDriverException as e:
                 attempt += 1
                 print(f"Error during search attempt {attempt}: {str(e)}")
-                
+                # 조회 페이지는 이 루프가 다시 열므로 reload 복구는 건너뛴다
+                if self.recovery.handle(e, 'search', reload=False) == REPLACE_DRIVER:
+                    return  # 교체한 드라이버는 조회 페이지까지 이동해 있다
+
                 if attempt >= max_search_attempts:
                     print("Maximum search attempts reached. Restarting browser...")
                     self.restart_browser()
                     return
                 else:
                     print(f"Retrying search... Attempt {attempt+1} of {max_search_attempts}")
-                    time.sleep(3)  # Wait before retrying
 
-    def book_ticket(self, standard_seat, i):
-        if "예약하기" in standard_seat:
+    def book_ticket(self, action, clicked=None):
+        """
+        :param action: rules.BookingRules 가 고른 BOOK Action (누를 행과 좌석 칸)
+        :param clicked: ARMED_SCRIPT 가 이미 링크를 누른 시각 (None 이면 여기서 누른다)
+        """
+        if action.kind == BOOK:
             print("예약 가능 클릭")
+            self.set_booking_assets(True)
+            labels = {} if clicked is None else {'mode': 'armed'}
 
             try:
                 # Try to click the reservation button
-                self.driver.find_element(By.CSS_SELECTOR,
-                                         f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(7) > a").click()
-                
-                # Wait for and handle any alert that might appear
-                try:
-                    WebDriverWait(self.driver, 3).until(EC.alert_is_present())
-                    alert = self.driver.switch_to.alert
-                    print(f"Alert message: {alert.text}")
-                    alert.accept()
-                except TimeoutException:
-                    print("No alert appeared.")
-
-                # Check if the reservation was successful
-                WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.ID, 'isFalseGotoMain')))
-                
-                self.is_booked = True
-                print("예약 성공")
-                # Send SMS
-                if self.phone_number:
-                    message = f"SRT ticket booked successfully!\nFrom: {self.dpt_stn}\nTo: {self.arr_stn}\nDate: {self.dpt_dt}\nTime: {self.dpt_tm}"
-                    self.send_sms(self.phone_number, message)
-                return self.driver
+                if clicked is None:
+                    clicked = time.perf_counter()
+                    self.driver.find_element(*link_locator(action.row.index, action.column)).click()
+
+                # alert 는 닫으면서, 예약 확인 페이지가 뜨거나 결과 화면으로 돌아오는 순간까지만 기다린다
+                confirmed, alerts = wait_for_confirmation(self.driver)
+                alert_text = '\n'.join(alerts) or None
+                if confirmed:
+                    self.metrics.observe('click_to_confirmation', time.perf_counter() - clicked, **labels)
+                    self.metrics.incr('bookings')
+
+                    self.is_booked = True
+                    print("예약 성공")
+                    self.record_booking(action, 'booked', clicked, alert_text)
+                    self.notify_booked()
+                    return self.driver
+
+                # 결과 화면에 그대로 있으므로 뒤로 가지 않는다
+                print("예약 실패: 좌석을 잡지 못했습니다")
+                self.metrics.incr('booking_failures', reason='alert')
+                self.record_booking(action, 'alert', clicked, alert_text)
 
             except UnexpectedAlertPresentException as e:
                 print(f"Unexpected alert appeared: {e.alert_text}")
+                self.metrics.incr('booking_failures', reason='alert')
+                self.record_booking(action, 'alert', clicked, e.alert_text)
                 self.driver.switch_to.alert.accept()
                 self.driver.back()
                 self.driver.implicitly_wait(5)
             except Exception as e:
                 print(f"예약 실패: {str(e)}")
+                self.metrics.incr('booking_failures', reason='error')
+                self.record_booking(action, 'error', clicked)
                 self.driver.back()
                 self.driver.implicitly_wait(5)
+            self.table_tracker.forget(action.row.index)  # 다음 조회에서 다시 판단
+            self.set_booking_assets(False)
+
+        return None
+
+    def record_query(self):
+        if self.recorder is not None:
+            self.recorder.record('query', dpt_stn=self.dpt_stn, arr_stn=self.arr_stn, dpt_dt=self.dpt_dt,
+                                 dpt_tm=self.dpt_tm, adult_num=self.adult_num, child_num=self.child_num,
+                                 num_trains_to_check=self.num_trains_to_check, want_reserve=self.want_reserve,
+                                 want_train=self.want_train, engine=self.engine)
+
+    def record_page(self, phase):
+        """조회 후 브라우저의 결과 폼 HTML 을 기록 (recorder 가 있을 때만 읽는다)"""
+        if self.recorder is not None:
+            self.recorder.record_html('page', self.driver.execute_script(RESULT_FORM_SCRIPT), phase=phase)
+
+    def record_booking(self, action, outcome, clicked, alert_text=None):
+        if self.recorder is not None:
+            self.recorder.record('book', train_num=action.row.train_num, seat=action.seat, outcome=outcome,
+                                 alert=alert_text, seconds=round(time.perf_counter() - clicked, 4))
+
+    def race_book(self, candidates):
+        """
+        BookingRules.candidates 로 고른 여러 행의 예약 링크를 새 탭에서 동시에 열고, 먼저 확인된 한 건만 남긴다
+        링크를 탭으로 열 수 없으면 순서대로 한 행씩 book_ticket 을 시도한다
+        """
+        print(f"예약 가능 {len(candidates)}건 동시 예약 시도: {', '.join(action.row.train_num for action in candidates)}")
+        try:
+            hrefs = resolve_links(self.driver, candidates)
+        except WebDriverException as e:
+            print(f"예약 링크 읽기 실패: {str(e)}")
+            hrefs = []
+        entries = [(candidate, href) for candidate, href in zip(candidates, hrefs) if href]
+
+        if len(entries) < 2:
+            return self.book_in_order(candidates)
+
+        self.set_booking_assets(True)
+        self.metrics.incr('race_attempts', len(entries))
+        clicked = time.perf_counter()
+        try:
+            position = race_tabs(self.driver, [href for _, href in entries])
+        except PopupBlockedError as e:
+            print(f"{str(e)}, 한 행씩 예약합니다")
+            self.metrics.incr('booking_failures', reason='popup_blocked')
+            self.set_booking_assets(False)
+            return self.book_in_order(candidates)
+
+        if position is None:
+            print("동시 예약 실패")
+            self.metrics.incr('booking_failures', reason='race_lost')
+            for action, _ in entries:
+                self.record_booking(action, 'race_lost', clicked)
+                self.table_tracker.forget(action.row.index)  # 다음 조회에서 다시 판단
+            self.set_booking_assets(False)
+            return True
+
+        action = entries[position][0]
+        self.metrics.observe('click_to_confirmation', time.perf_counter() - clicked, mode='race')
+        self.metrics.incr('bookings')
+        self.is_booked = True
+        print(f"예약 성공: {action.row.train_num}")
+        self.record_booking(action, 'booked', clicked)
+        self.notify_booked()
+        return True
+
+    def book_in_order(self, candidates):
+        """탭으로 동시에 열 수 없으면 순서대로 한 행씩 book_ticket 을 시도한다"""
+        for action in candidates:
+            self.book_ticket(action)
+            if self.is_booked:
+                break
+        return True
+
+    def notify_booked(self):
+        """예약 성공 알림을 큐에 넣는다 (전송을 기다리지 않음)"""
+        if self.notifier is None:
+            if not self.phone_number:
+                return
+            self.notifier = Notifier([IMessageBackend(self.phone_number)], metrics=self.metrics)
+        message = f"SRT ticket booked successfully!\nFrom: {self.dpt_stn}\nTo: {self.arr_stn}\nDate: {self.dpt_dt}\nTime: {self.dpt_tm}"
+        self.notifier.notify('booked', "SRT 예약 성공", message)
 
+    def progress(self):
+        """heartbeat 알림용 진행 상황"""
+        counters = self.metrics.summary()['counters']
+        refreshes = sum(value for name, value in counters.items() if name.startswith('refreshes'))
+        elapsed = int(time.time() - self.started)
+        return (f"{self.dpt_stn} → {self.arr_stn} {self.dpt_dt} {self.dpt_tm}시 감시 중: "
+                f"조회 {refreshes}회, {elapsed // 3600}시간 {elapsed % 3600 // 60}분 경과")
+
+    def set_booking_assets(self, enabled):
+        """lean 프로필에서 예약/결제 페이지용 리소스를 허용(True)하거나 다시 막는다(False)"""
+        if not (self.browser_profile and self.browser_profile.booking_assets):
+            return
+        try:
+            if enabled:
+                self.browser_profile.unblock_resources(self.driver)
+            else:
+                self.browser_profile.block_resources(self.driver)
+        except WebDriverException as e:
+            print(f"리소스 차단 설정 실패: {str(e)}")
+
+    def click_search(self, button, timeout=10):
+        """
+        현재 결과 행에 표시를 남기고 조회 버튼을 누른 뒤, 표시 없는 새 결과가 그려질 때까지만 기다린다
+        snapshot 모드에서는 기다리면서 읽은 행을 fresh_rows 에 남겨 read_result_rows 가 다시 읽지 않게 한다
+        prearm 이면 새 결과를 읽는 스크립트가 조건에 맞는 좌석을 그 자리에서 누르고 예약 확인까지 진행한다
+        :return: 바로 누른 Action (누르지 않았으면 None)
+        """
+        self.fresh_rows = None
+        armed = self.armed
+        if armed is not None:
+            # 예약 링크가 다른 인원으로 만들어지지 않도록 조회 폼의 인원을 채운 뒤에만 바로 누른다
+            fields = armed.fields()
+            if (self.driver.execute_script(FILL_SCRIPT, fields) or 0) < len(fields):
+                print("조회 폼에 인원 필드가 없어 이번 조회는 미리 누르지 않습니다")
+                armed = None
+        self.driver.execute_script(MARK_SCRIPT, RESULT_ROWS_SELECTOR)
+        # Click using JavaScript for more reliable clicks
+        self.driver.execute_script("arguments[0].click();", button)
+
+        wait = WebDriverWait(self.driver, timeout, poll_frequency=0.05, ignored_exceptions=(JavascriptException,))
+        if armed is not None:
+            args = armed.args(self.num_trains_to_check)
+            result = wait.until(lambda driver: driver.execute_script(ARMED_SCRIPT, *args))
+            clicked = time.perf_counter()
+            rows = rows_from_snapshot(result['cells'], self.num_trains_to_check)
+            if not result['clicked']:
+                self.fresh_rows = rows
+                return None
+            action = armed.action(rows, result['clicked'])
+            print(f"좌석이 보이자마자 예약을 눌렀습니다: {action.row.describe()}")
+            self.book_ticket(action, clicked)
+            return action
+
+        cells, = wait.until(
+            lambda driver: ready(driver.execute_script(READY_SCRIPT, RESULT_ROWS_SELECTOR, self.num_trains_to_check,
+                                                       self.snapshot))
+        )
+        if self.snapshot:
+            self.fresh_rows = rows_from_snapshot(cells, self.num_trains_to_check)
         return None
 
+    @timed('refresh')
     def refresh_result(self):
         try:
             # Find the search button with a more robust wait
@@ -300,108 +630,219 @@ class SRT:
                 EC.element_to_be_clickable((By.XPATH, "//input[@value='조회하기']"))
             )
             
-            # Click using JavaScript for more reliable clicks
-            self.driver.execute_script("arguments[0].click();", submit)
-            
-            # Wait for results to update
+            # Click and wait until the new results replace the old ones
+            attempted = None
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "#result-form fieldset table tbody tr"))
-                )
+                attempted = self.click_search(submit)
             except TimeoutException:
                 print("Search results not appearing, may need to retry...")
+            if attempted is None:
+                self.record_page('refresh')
                 
             self.cnt_refresh += 1
+            self.metrics.incr('refreshes', engine='selenium')
             print(f"새로고침 {self.cnt_refresh}회")
             self.driver.implicitly_wait(10)
-            time.sleep(0.5)
             
             return True
             
-        except (TimeoutException, WebDriverException, StaleElementReferenceException) as e:
+        except WebDriverException as e:
             print(f"Error during refresh: {str(e)}")
-            # If refresh fails, try to recover
+            self.recovery.handle(e, 'refresh')
+            return False
+
+    def reserve_ticket(self, action):
+        """
+        :param action: rules.BookingRules 가 고른 RESERVE Action
+        """
+        if action.kind == RESERVE:
             try:
-                # Check if we're still on the search page
-                if "selectScheduleList" not in self.driver.current_url:
-                    print("Not on search page, navigating back...")
-                    self.go_search()
-                return False
-            except Exception as inner_e:
-                print(f"Error recovering from refresh failure: {str(inner_e)}")
+                self.driver.find_element(*link_locator(action.row.index, action.column)).click()
+            except WebDriverException as e:
+                print(f"예약 대기 실패: {str(e)}")
+                self.metrics.incr('booking_failures', reason='error')
+                self.table_tracker.forget(action.row.index)  # 다음 조회에서 다시 판단
                 return False
-
-    def reserve_ticket(self, reservation, i):
-        if "신청하기" in reservation:
             print("예약 대기 완료")
-            self.driver.find_element(By.CSS_SELECTOR,
-                                     f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(8) > a").click()
             self.is_booked = True
             return self.is_booked
 
-    def check_result(self):
-        max_retries = 5
-        retry_count = 0
+    @timed('parse')
+    def read_result_rows(self):
+        """
+        결과 테이블 상위 num_trains_to_check 개 행을 읽어 행 레코드 목록으로 반환
+        snapshot 모드에서는 execute_script 한 번, 실패 시 page_source 한 번으로 읽는다
+        """
+        if self.fresh_rows is not None:
+            rows, self.fresh_rows = self.fresh_rows, None
+            return rows
 
-        while True:
+        if self.snapshot:
             try:
-                for i in range(1, self.num_trains_to_check+1):
-                    try:
-                        train_num = self.driver.find_element(By.CSS_SELECTOR, f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(3)").text.strip()
-                        premium_seat = self.driver.find_element(By.CSS_SELECTOR, f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(6)").text.strip()
-                        standard_seat = self.driver.find_element(By.CSS_SELECTOR, f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(7)").text.strip()
-                        reservation = self.driver.find_element(By.CSS_SELECTOR, f"#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr:nth-child({i}) > td:nth-child(8)").text.strip()
-                    except (StaleElementReferenceException, Exception):
-                        train_num = "알 수 없음"
-                        premium_seat = "매진"
-                        standard_seat = "매진"
-                        reservation = "매진"
-
-                    print(f"기차번호: {train_num} / 프리미엄석: {premium_seat} / 일반석: {standard_seat} / 예약 대기: {reservation}")
-                    # want_train이 있고 예약 대기 기차와 같을 경우 예약 진행
-                    if self.want_train and self.want_train != 'none' and self.want_train.strip() == train_num:
-                        print(f"지정 기차 발견: {train_num}")
-                        if "매진" not in premium_seat:
-                            self.book_ticket(premium_seat, i)
-                            return self.driver
-                        elif "매진" not in standard_seat:
-                            self.book_ticket(standard_seat, i)
-                            return self.driver
-                        elif "매진" not in reservation and self.want_reserve:
-                            self.reserve_ticket(reservation, i)
-                            return self.driver
-                    elif not self.want_train or self.want_train == 'none':
-                        if "매진" not in premium_seat:
-                            print("예약 클릭")
-                            self.book_ticket(premium_seat, i)
-                            return self.driver
-                        elif "매진" not in standard_seat:
-                            print("예약 클릭")
-                            self.book_ticket(standard_seat, i)
+                cells = self.driver.execute_script(SNAPSHOT_SCRIPT, RESULT_ROWS_SELECTOR, self.num_trains_to_check)
+                return rows_from_snapshot(cells, self.num_trains_to_check)
+            except WebDriverException as e:
+                print(f"스냅샷 실패, page_source 로 재시도: {str(e)}")
+                return parse_result_html(self.driver.page_source, self.num_trains_to_check)
+
+        rows = []
+        for i in range(1, self.num_trains_to_check+1):
+            try:
+                cells = [""] * 8
+                for k in (3, 6, 7, 8):
+                    cells[k-1] = self.driver.find_element(*cell_locator(i, k)).text.strip()
+                rows.append(row_from_cells(i, cells))
+            except NoSuchElementException:
+                # 결과가 num_trains_to_check 개보다 적은 경우만 빈 행으로 둔다
+                # (stale DOM 등 다른 오류는 매진으로 바꾸지 않고 check_result 의 복구로 넘긴다)
+                rows.append(row_from_cells(i, []))
+        return rows
+
+    def has_candidate(self, rows):
+        return self.rules.matches(rows)
+
+    def decide_and_book(self, rows):
+        """
+        읽어온 행 레코드에 대해 예약 조건을 확인하고, 조건에 맞는 첫 행을 예약한다
+        :return: 예약(또는 예약 대기)을 시도했으면 True
+        """
+        if self.race:
+            candidates = self.rules.candidates(rows, self.race_width)
+            if len(candidates) > 1:
+                for row in rows:
+                    print(row.describe())
+                return self.race_book(candidates)
+
+        for row in rows:
+            print(row.describe())
+
+            action = self.rules.decide(row)
+            if action:
+                # want_train이 있고 예약 대기 기차와 같을 경우 예약 진행
+                if self.rules.trains is not None:
+                    print(f"지정 기차 발견: {row.train_num}")
+                else:
+                    print("예약 클릭")
+
+                if action.kind == BOOK:
+                    self.book_ticket(action)
+                else:
+                    self.reserve_ticket(action)
+                return True
+
+        return False
+
+    def start_http_engine(self):
+        """브라우저 로그인 쿠키로 HTTP 조회 엔진을 준비"""
+        if self.http_engine is None:
+            self.http_engine = HttpSearchEngine(base_url=self.base_url or SRT_BASE_URL, recorder=self.recorder)
+        self.http_engine.load_cookies_from_driver(self.driver)
+
+    def http_refresh(self):
+        """HTTP 엔진으로 한 번 조회하고 행 레코드 목록을 반환"""
+        form = build_search_form(self.dpt_stn, self.arr_stn, self.dpt_dt, self.dpt_tm, self.adult_num, self.child_num)
+        with self.metrics.timer('http_refresh'):
+            rows = self.http_engine.fetch_rows(form, self.num_trains_to_check)
+        self.cnt_refresh += 1
+        self.metrics.incr('refreshes', engine='http')
+        print(f"새로고침 {self.cnt_refresh}회 (http)")
+        return rows
+
+    def record_history(self, rows):
+        if self.history is not None:
+            self.history.record(self.dpt_stn, self.arr_stn, self.dpt_dt, rows)
+
+    def check_result(self):
+        while not self.is_booked:
+            try:
+                if self.engine == 'http':
+                    if self.http_engine is None:
+                        self.start_http_engine()
+                    rows = self.http_refresh()
+                    self.record_history(rows)
+                    # 예약 판단이 끝난 뒤에 commit (중간에 예외가 나면 다음 조회에서 다시 판단)
+                    rows = self.table_tracker.changed_rows(rows, commit=False)
+                    self.scheduler.record_success()
+                    self.recovery.succeeded()
+                    if not rows:
+                        print("좌석 상태 변경 없음")
+                    elif self.has_candidate(rows):
+                        # 예약 가능한 행이 보이면 브라우저에서 다시 조회해 예약 진행
+                        print("예약 가능 좌석 발견, 브라우저로 예약을 진행합니다")
+                        attempted = self.book_from_browser(rows)
+                        self.table_tracker.commit()
+                        if attempted:
                             return self.driver
-                        elif "매진" not in reservation and self.want_reserve:
-                            print("예약 클릭")
-                            self.reserve_ticket(reservation, i)
+                    else:
+                        for row in rows:
+                            print(row.describe())
+                        self.table_tracker.commit()
+                else:
+                    # 상태가 바뀐 행만 예약 판단
+                    rows = self.read_result_rows()
+                    self.record_history(rows)
+                    rows = self.table_tracker.changed_rows(rows, commit=False)
+                    self.recovery.succeeded()
+                    if not rows:
+                        print("좌석 상태 변경 없음")
+                    else:
+                        attempted = self.decide_and_book(rows)
+                        self.table_tracker.commit()
+                        if attempted:
                             return self.driver
 
-                    if self.is_booked:
-                        return self.driver
+                # 조회 사이 (예약 중이 아닐 때) 예산을 넘은 드라이버를 교체
+                self.recycle_if_due()
+                self.scheduler.wait()
+                if self.engine != 'http':
+                    if self.refresh_result():
+                        self.scheduler.record_success()
+                    else:
+                        self.scheduler.record_error()
 
-                time.sleep(randint(2, 4))
-                self.refresh_result()
-                    
-            except (WebDriverException, TimeoutException, ElementClickInterceptedException) as e:
-                retry_count += 1
-                print(f"Error occurred: {str(e)}")
-                print(f"Retry attempt {retry_count} of {max_retries}")
-                
-                if retry_count >= max_retries:
-                    print("Maximum retries reached. Restarting the driver...")
-                    self.restart_browser()
-                    retry_count = 0
-                else:
-                    time.sleep(5)  # Wait before retrying
-                    self.refresh_result()
+            except (RateLimitedError, SessionExpiredError, requests.RequestException, WebDriverException) as e:
+                # 요청 제한은 backoff, stale DOM 은 다시 읽기, 세션 만료는 다시 로그인처럼
+                # 오류 종류별로 가장 싼 복구부터 하고, 반복되면 드라이버 교체까지 올라간다
+                self.metrics.incr('retries')
+                self.recovery.handle(e, 'check')
+
+        return self.driver
+
+    def book_from_browser(self, rows):
+        """
+        HTTP 조회에서 예약 가능한 행이 보이면 브라우저에서 다시 조회해 예약한다
+        브라우저에서 예약하지 못하면 (새로고침 timeout, 그 사이 매진 등) HTTP 로 본 후보 행의 상태를 지워서
+        다음 HTTP 조회에서 다시 판단한다
+        :return: 예약(또는 예약 대기)을 시도했으면 True
+        """
+        candidates = [row for row in rows if self.rules.decide(row)]
+        try:
+            self.refresh_result()
+            if self.is_booked:
+                return True  # prearm 으로 새로고침하면서 바로 예약됨
+            return self.decide_and_book(self.read_result_rows())
+        finally:
+            if not self.is_booked:
+                for row in candidates:
+                    self.table_tracker.forget(row.index)
+
+    def recycle_if_due(self):
+        """
+        governor 가 정한 메모리/CPU/사용 시간 예산을 넘기 전에 드라이버를 교체한다
+        예약 중에는 부르지 않고, 조회와 조회 사이에만 부른다
+        :return: 교체했으면 True
+        """
+        if self.governor is None or self.driver is None or self.is_booked:
+            return False
+        reason = self.governor.due(self.driver)
+        if reason is None:
+            return False
+        print(f"드라이버가 자원 예산({reason})에 닿아 조회 사이에 교체합니다")
+        self.metrics.incr('driver_recycles', reason=reason)
+        self.restart_browser()
+        if self.http_engine and self.driver:
+            self.http_engine.load_cookies_from_driver(self.driver)
+        return True
 
     def set_phone_number(self, phone_number):
         self.phone_number = phone_number
@@ -414,43 +855,123 @@ class SRT:
         :param message: The message to send
         """
         if platform.system() == 'Darwin':  # Darwin is the system name for macOS
-            apple_script = f'''
-            tell application "Messages"
-                set targetService to 1st service whose service type = iMessage
-                set targetBuddy to buddy "{phone_number}" of targetService
-                send "{message}" to targetBuddy
-            end tell
-            '''
-            
             try:
-                subprocess.run(['osascript', '-e', apple_script], check=True)
+                send_imessage(phone_number, message)
                 print(f"SMS sent successfully to {phone_number}")
             except subprocess.CalledProcessError as e:
                 print(f"Failed to send SMS: {e}")
         else:
             print(f"SMS sending is only supported on macOS. Message content: {message}")
             
+    def fork(self, login_id=None, login_psw=None, session_file=None):
+        """
+        같은 설정(조회 조건, scheduler, metrics, 이력, 알림)을 쓰고 브라우저/세션 상태만 따로 가지는 SRT 를 반환
+        login_id 를 주면 다른 계정으로 로그인할 SRT 가 된다 (session_file 도 그 계정 것을 써야 한다)
+        """
+        worker = copy.copy(self)
+        worker.driver = None
+        worker.driver_pool = None
+        worker.http_engine = None
+        worker.is_booked = False
+        worker.cnt_refresh = 0
+        worker.table_tracker = TableTracker()
+        worker.fresh_rows = None
+        worker.recovery = Recovery(worker)
+        if login_id is not None:
+            worker.session_store = SessionStore(session_file) if session_file else None
+            worker.set_log_info(login_id, login_psw)
+        return worker
+
+    def spawn_driver(self):
+        """
+        현재 조회 조건으로 새 드라이버를 띄워 로그인 후 조회 페이지까지 이동시킨 뒤 반환
+        self.driver 는 건드리지 않으므로 백그라운드에서 예비 드라이버를 만들 때 사용한다
+        """
+        worker = self.fork()
+        worker.run_driver()
+        try:
+            worker.ensure_login()
+            worker.go_search()
+        except Exception:
+            worker.quit_driver()
+            raise
+        return worker.driver
+
+    def is_driver_healthy(self, driver):
+        """
+        드라이버가 응답하고 서버 세션이 살아 있는지 확인
+        이미 그려진 화면의 header 만 보면 서버에서 조용히 만료된 세션을 놓치므로, 브라우저 쿠키로 조회 페이지를
+        한 번 요청해 로그인 페이지로 넘어가지 않았는지와 header 의 로그인 문구를 본다 (현재 화면은 그대로 둔다)
+        """
+        try:
+            result = driver.execute_async_script(LOGIN_CHECK_SCRIPT, self.search_url, 5000)
+        except Exception:
+            return False
+        if not result or result.get('status', 500) >= 400:
+            return False
+        return LOGIN_PATH not in (result.get('url') or '') and bool(result.get('welcome'))
+
+    def start_driver_pool(self):
+        size = self.standby_drivers
+        if self.governor and self.governor.max_browsers:
+            # 예비 드라이버도 호스트의 브라우저 수에 들어가므로, 지금 쓰는 드라이버 자리는 남겨 둔다
+            size = min(size, self.governor.max_browsers - 1)
+            if size < self.standby_drivers:
+                print(f"브라우저 수 제한({self.governor.max_browsers}개) 때문에 예비 드라이버는 {size}개만 둡니다")
+        if size > 0 and self.driver_pool is None:
+            self.driver_pool = DriverPool(self.spawn_driver, size=size, health_check=self.is_driver_healthy,
+                                          closer=self.quit_driver).start()
+
+    def quit_driver(self, driver=None):
+        """드라이버를 닫고 governor 의 브라우저 자리를 돌려준다 (driver 가 None 이면 self.driver)"""
+        driver = driver or self.driver
+        if driver is None:
+            return
+        try:
+            driver.quit()
+        finally:
+            if self.governor:
+                self.governor.detach(driver)
+
+    def close_driver_pool(self):
+        if self.driver_pool:
+            self.driver_pool.close()
+            self.driver_pool = None
+
+    @timed('restart')
     def restart_browser(self):
         """
         Restart the browser session if it crashes or becomes unresponsive
         """
         print("Restarting browser session...")
+        self.table_tracker.forget()
+        self.fresh_rows = None
+        if self.driver_pool:
+            # 예비 드라이버로 즉시 교체하고, 실패한 드라이버 종료와 빈 자리 채우기는 백그라운드에서 진행
+            self.driver_pool.discard(self.driver)
+            try:
+                self.driver = self.driver_pool.acquire()
+                if self.http_engine:
+                    self.http_engine.load_cookies_from_driver(self.driver)
+                print("Browser switched to standby driver")
+                return
+            except Exception as e:
+                print(f"Failed to switch to standby driver: {str(e)}")
+                self.driver = None
+
         try:
             # Close the current driver if it exists
             if self.driver:
                 try:
-                    self.driver.quit()
+                    self.quit_driver()
                 except Exception as e:
                     print(f"Error closing browser: {str(e)}")
             
-            # Wait a moment before starting a new session
-            time.sleep(3)
-            
             # Start a new driver session
             self.run_driver()
             
             # Log back in and return to the search page
-            self.login()
+            self.ensure_login()
             
             # Return to the search page
             self.go_search()
@@ -477,11 +998,11 @@ class SRT:
                 self.set_log_info(login_id, login_psw)
                 self.set_phone_number(phone_number)
                 
-                # Check if we're already logged in, if not, log in
-                if not self.check_login_status():
-                    self.login()
-                    
+                # Check if we're already logged in, if not, restore the saved session or log in
+                self.ensure_login()
+
                 self.go_search()
+                self.start_driver_pool()
                 self.check_result()
                 
                 # If we reach here without booking, increment attempt counter
@@ -489,21 +1010,24 @@ class SRT:
                     attempt += 1
                     print(f"Booking attempt {attempt} unsuccessful")
                     
-            except (WebDriverException, TimeoutException) as e:
+            except WebDriverException as e:
                 print(f"Critical error in run process: {str(e)}")
                 attempt += 1
-                
+
                 if attempt < max_run_attempts:
                     print(f"Restarting the entire process. Attempt {attempt+1} of {max_run_attempts}")
+                    # 오류 종류에 맞는 복구만 하고 (죽은 드라이버면 교체), 로그인/조회는 다시 도는 루프가 한다
                     try:
-                        if self.driver:
-                            self.driver.quit()
-                    except Exception:
-                        pass
-                    
-                    self.driver = None
-                    time.sleep(10)  # Wait before restarting
-            
+                        self.recovery.handle(e, 'run', reload=False)
+                    except WebDriverException as inner_e:
+                        print(f"Recovery failed: {str(inner_e)}")
+                        self.driver = None
+
+        self.close_driver_pool()
+        self.print_metrics()
+        if self.notifier:
+            self.notifier.flush()
+
         if self.is_booked:
             print("Ticket successfully booked!")
         else:
@@ -511,6 +1035,16 @@ class SRT:
             
         return self.driver
         
+    def print_metrics(self):
+        """구간별 시간 요약 출력"""
+        summary = self.metrics.summary()
+        for name, stats in sorted(summary['timers'].items()):
+            print(f"{name}: {stats['count']}회, p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s, 최대 {stats['max']:.3f}s")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"{name}: {value}")
+        for name, value in sorted(summary['gauges'].items()):
+            print(f"{name}: {value:.1f}")
+
     def check_login_status(self):
         """Check if we're logged in without attempting a new login"""
         try:
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+구간별 지연 시간/횟수 측정
+
+로그인, 조회, 새로고침, 파싱, 예약 클릭~확인, 브라우저 재시작 등 구간마다
+timer(histogram) 를, 새로고침/오류/재시도 횟수는 counter 로, 메모리/CPU 같은 현재 값은 gauge 로 기록한다.
+- JSON lines: 측정할 때마다 한 줄씩 파일에 기록
+- Prometheus text format: 파일로 주기적으로 쓰거나 HTTP endpoint 로 제공
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 초 단위 histogram 구간
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(key, extra=None):
+    items = list(key) + (list(extra) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in items) + '}'
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS, reservoir=1024):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        self.recent = deque(maxlen=reservoir)  # 분위수 계산용 최근 값
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def quantile(self, q):
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(q * len(values)))]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+        }
+
+
+class Metrics:
+    def __init__(self, jsonl_path=None, prefix='srt'):
+        """
+        :param jsonl_path: 측정값을 한 줄씩 기록할 JSON lines 파일 (None 이면 기록 안 함)
+        :param prefix: Prometheus 지표 이름 앞에 붙일 문자열
+        """
+        self.prefix = prefix
+        self.timers = {}    # (name, labels) -> Histogram
+        self.counters = {}  # (name, labels) -> int
+        self.gauges = {}    # (name, labels) -> 마지막 값 (이름에 단위를 붙인다 ex. driver_rss_mb)
+        self.lock = threading.Lock()
+
+        self.jsonl = open(jsonl_path, 'a', encoding='utf-8', buffering=1) if jsonl_path else None
+        self.httpd = None
+        self.export_stop = None
+
+    def _emit(self, kind, name, value, labels):
+        if self.jsonl is None:
+            return
+        event = {'ts': round(time.time(), 6), 'type': kind, 'name': name, 'value': value}
+        if labels:
+            event['labels'] = labels
+        self.jsonl.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            histogram = self.timers.get(key)
+            if histogram is None:
+                histogram = self.timers[key] = Histogram()
+            histogram.observe(seconds)
+            self._emit('timer', name, round(seconds, 6), labels)
+
+    def incr(self, name, n=1, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+            self._emit('counter', name, n, labels)
+
+    def set_gauge(self, name, value, **labels):
+        """현재 값을 기록 (같은 이름/라벨의 이전 값은 덮어쓴다)"""
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.gauges[key] = value
+            self._emit('gauge', name, round(value, 6), labels)
+
+    def remove_gauge(self, name, **labels):
+        """더 이상 없는 대상(닫은 드라이버 등)의 gauge 를 지운다"""
+        with self.lock:
+            self.gauges.pop((name, _label_key(labels)), None)
+
+    def timer(self, name, **labels):
+        """with metrics.timer('refresh'): ... 형태로 구간 시간을 측정"""
+        return _Timer(self, name, labels)
+
+    def summary(self):
+        """{'timers': {이름: 요약}, 'counters': {이름: 값}, 'gauges': {이름: 값}}"""
+        with self.lock:
+            timers = {name + _format_labels(key): h.summary() for (name, key), h in self.timers.items()}
+            counters = {name + _format_labels(key): value for (name, key), value in self.counters.items()}
+            gauges = {name + _format_labels(key): value for (name, key), value in self.gauges.items()}
+        return {'timers': timers, 'counters': counters, 'gauges': gauges}
+
+    def render_prometheus(self):
+        lines = []
+        typed = set()  # TYPE 주석은 지표 이름마다 한 번만
+        with self.lock:
+            for (name, key), value in sorted(self.counters.items()):
+                metric = f'{self.prefix}_{name}_total'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} counter')
+                lines.append(f'{metric}{_format_labels(key)} {value}')
+            for (name, key), value in sorted(self.gauges.items()):
+                metric = f'{self.prefix}_{name}'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} gauge')
+                lines.append(f'{metric}{_format_labels(key)} {value}')
+            for (name, key), h in sorted(self.timers.items()):
+                metric = f'{self.prefix}_{name}_seconds'
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f'# TYPE {metric} histogram')
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.bucket_counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{_format_labels(key, [("le", bound)])} {cumulative}')
+                lines.append(f'{metric}_bucket{_format_labels(key, [("le", "+Inf")])} {h.count}')
+                lines.append(f'{metric}_sum{_format_labels(key)} {h.sum}')
+                lines.append(f'{metric}_count{_format_labels(key)} {h.count}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp_path, path)
+
+    def start_file_export(self, path, interval=10):
+        """interval 초마다 Prometheus text 파일(node_exporter textfile 등)을 갱신"""
+        self.export_stop = threading.Event()
+
+        def loop():
+            while not self.export_stop.wait(interval):
+                self.write_prometheus(path)
+            self.write_prometheus(path)
+
+        threading.Thread(target=loop, name='metrics-export', daemon=True).start()
+
+    def serve(self, port, host='127.0.0.1'):
+        """GET /metrics 로 Prometheus text 를 제공하는 HTTP 서버를 시작"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, name='metrics-http', daemon=True).start()
+        return self.httpd.server_address[1]
+
+    def close(self):
+        if self.export_stop:
+            self.export_stop.set()
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+        if self.jsonl:
+            self.jsonl.close()
+            self.jsonl = None
+
+
+class _Timer:
+    def __init__(self, metrics, name, labels):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.started = None
+        self.elapsed = None
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.metrics.observe(self.name, self.elapsed, status='error', **self.labels)
+        else:
+            self.metrics.observe(self.name, self.elapsed, **self.labels)
+        return False
+
+
+def timed(name):
+    """self.metrics 로 메서드 실행 시간을 기록하는 데코레이터"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
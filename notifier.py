@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+비동기 알림
+
+예약 성공 직후 osascript(iMessage) 같은 느린 알림을 그 자리에서 기다리지 않도록
+notify() 는 큐에 넣기만 하고, 백그라운드 스레드가 등록된 backend 마다 보낸다.
+- backend: webhook(JSON POST), 메일(SMTP), 데스크톱 알림, 파일(JSON lines), iMessage, 콘솔
+- backend 별로 실패하면 간격을 두 배씩 늘리며 재시도, 한 backend 의 실패가 다른 backend 를 막지 않는다
+- 같은 key 의 알림은 dedup_window 초 동안 한 번만 보낸다
+- 오래 감시할 때 살아 있는지 알 수 있도록 heartbeat 알림을 주기적으로 보낼 수 있다
+"""
+import json
+import platform
+import queue
+import shutil
+import smtplib
+import subprocess
+import threading
+import time
+import urllib.request
+from email.message import EmailMessage
+
+# AppleScript 에 전화번호/메시지를 인자로 넘겨 따옴표가 섞여도 깨지지 않게 한다
+IMESSAGE_SCRIPT = '''
+on run argv
+    tell application "Messages"
+        set targetService to 1st service whose service type = iMessage
+        set targetBuddy to buddy (item 1 of argv) of targetService
+        send (item 2 of argv) to targetBuddy
+    end tell
+end run
+'''
+
+_STOP = object()
+
+
+class Notification:
+    def __init__(self, kind, title, message, key=None):
+        """
+        :param kind: 알림 종류 ex) 'booked', 'heartbeat', 'error'
+        :param key: 중복 판단 기준 (None 이면 종류+제목+내용)
+        """
+        self.kind = kind
+        self.title = title
+        self.message = message
+        self.key = key or f"{kind}\x1f{title}\x1f{message}"
+        self.created = time.time()
+
+    def to_dict(self):
+        return {'ts': round(self.created, 3), 'kind': self.kind, 'title': self.title, 'message': self.message}
+
+
+def send_imessage(phone_number, message):
+    """
+    macOS 메시지 앱으로 iMessage 전송
+    :raises subprocess.CalledProcessError: osascript 실패
+    """
+    subprocess.run(['osascript', '-e', IMESSAGE_SCRIPT, phone_number, message], check=True, timeout=30)
+
+
+class ConsoleBackend:
+    name = 'console'
+
+    def send(self, notification):
+        print(f"[{notification.kind}] {notification.title}: {notification.message}")
+
+
+class FileBackend:
+    name = 'file'
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, notification):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(notification.to_dict(), ensure_ascii=False) + '\n')
+
+
+class WebhookBackend:
+    name = 'webhook'
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, notification):
+        body = json.dumps(notification.to_dict(), ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class SmtpBackend:
+    name = 'smtp'
+
+    def __init__(self, recipients, host='127.0.0.1', port=25, sender='srt@localhost', username=None, password=None,
+                 starttls=False, timeout=10):
+        """
+        :param recipients: 받는 사람 주소 목록 (문자열 하나도 가능)
+        """
+        self.recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, notification):
+        mail = EmailMessage()
+        mail['Subject'] = notification.title
+        mail['From'] = self.sender
+        mail['To'] = ', '.join(self.recipients)
+        mail.set_content(notification.message)
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(mail)
+
+
+class DesktopBackend:
+    name = 'desktop'
+
+    def send(self, notification):
+        system = platform.system()
+        if system == 'Darwin':
+            subprocess.run(['osascript', '-e', 'on run argv\ndisplay notification (item 2 of argv) with title (item 1 of argv)\nend run',
+                            notification.title, notification.message], check=True, timeout=10)
+        elif shutil.which('notify-send'):
+            subprocess.run(['notify-send', notification.title, notification.message], check=True, timeout=10)
+        else:
+            raise RuntimeError(f"{system} 에서 사용할 수 있는 데스크톱 알림이 없습니다")
+
+
+class IMessageBackend:
+    name = 'imessage'
+
+    def __init__(self, phone_number):
+        self.phone_number = phone_number
+
+    def send(self, notification):
+        if platform.system() != 'Darwin':
+            print(f"SMS sending is only supported on macOS. Message content: {notification.message}")
+            return
+        send_imessage(self.phone_number, notification.message)
+
+
+class Notifier:
+    def __init__(self, backends, max_retries=3, retry_delay=2.0, dedup_window=600, metrics=None):
+        """
+        :param backends: send(notification) 메서드를 가진 backend 목록
+        :param max_retries: backend 별 최대 재시도 횟수
+        :param retry_delay: 첫 재시도 전 대기 시간(초), 재시도마다 두 배
+        :param dedup_window: 같은 key 의 알림을 다시 보내지 않을 시간(초)
+        :param metrics: 전송/실패 횟수를 기록할 Metrics
+        """
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.dedup_window = dedup_window
+        self.metrics = metrics
+
+        self.sent_keys = {}  # key -> 마지막으로 큐에 넣은 시각
+        self.lock = threading.Lock()
+        self.heartbeat_stop = None
+
+        # backend 마다 큐와 스레드를 따로 둬서 느리거나 재시도 중인 backend 가 다른 backend 를 막지 않게 한다
+        self.backends = []
+        self.queues = []
+        self.workers = []
+        for backend in backends:
+            self.add_backend(backend)
+
+    def add_backend(self, backend):
+        backend_queue = queue.Queue()
+        worker = threading.Thread(target=self._loop, args=(backend, backend_queue), name=f'notifier-{backend.name}',
+                                  daemon=True)
+        self.backends.append(backend)
+        self.queues.append(backend_queue)
+        self.workers.append(worker)
+        worker.start()
+
+    def notify(self, kind, title, message, key=None):
+        """
+        알림을 큐에 넣고 바로 반환한다
+        :return: 큐에 넣었으면 True, dedup_window 안에 같은 알림이 있어 건너뛰면 False
+        """
+        notification = Notification(kind, title, message, key)
+        now = time.monotonic()
+        with self.lock:
+            last = self.sent_keys.get(notification.key)
+            if last is not None and now - last < self.dedup_window:
+                return False
+            if len(self.sent_keys) > 1024:
+                self.sent_keys = {key: at for key, at in self.sent_keys.items() if now - at < self.dedup_window}
+            self.sent_keys[notification.key] = now
+        for backend_queue in self.queues:
+            backend_queue.put(notification)
+        return True
+
+    def _send(self, backend, notification):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries + 1):
+            try:
+                backend.send(notification)
+                if self.metrics:
+                    self.metrics.incr('notifications', backend=backend.name, kind=notification.kind)
+                return True
+            except Exception as e:
+                print(f"알림 전송 실패 ({backend.name}, {attempt + 1}/{self.max_retries + 1}): {str(e)}")
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+                    delay *= 2
+        if self.metrics:
+            self.metrics.incr('notification_failures', backend=backend.name, kind=notification.kind)
+        return False
+
+    def _loop(self, backend, backend_queue):
+        while True:
+            item = backend_queue.get()
+            if item is _STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            self._send(backend, item)
+
+    def flush(self, timeout=30):
+        """큐에 쌓인 알림을 모두 보낼 때까지 기다린다"""
+        deadline = time.monotonic() + timeout
+        events = []
+        for backend_queue in self.queues:
+            done = threading.Event()
+            backend_queue.put(done)
+            events.append(done)
+        return all(done.wait(max(0.0, deadline - time.monotonic())) for done in events)
+
+    def start_heartbeat(self, status, interval=1800, title="SRT 감시 중"):
+        """
+        interval 초마다 status() 가 돌려준 문자열로 heartbeat 알림을 보낸다
+        """
+        self.heartbeat_stop = threading.Event()
+
+        def loop():
+            while not self.heartbeat_stop.wait(interval):
+                try:
+                    message = status()
+                except Exception as e:
+                    message = f"상태를 읽지 못했습니다: {str(e)}"
+                self.notify('heartbeat', title, message, key=f"heartbeat\x1f{time.time()}")
+
+        threading.Thread(target=loop, name='notifier-heartbeat', daemon=True).start()
+
+    def close(self, timeout=30):
+        if self.heartbeat_stop:
+            self.heartbeat_stop.set()
+        self.flush(timeout)
+        for backend_queue in self.queues:
+            backend_queue.put(_STOP)
+        for worker in self.workers:
+            worker.join(timeout)
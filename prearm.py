@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+예약 사전 준비 (pre-armed booking)와 이벤트 기반 예약 확인
+
+좌석이 풀린 것을 본 뒤 예약하기까지
+    결과 읽기 → 파이썬에서 판단 → find_element 로 링크 찾기 → click → alert 를 최대 3초 기다림 → 확인 페이지를 최대 10초 기다림
+을 차례로 하던 것을 줄인다.
+
+- ArmedBooking: 예약 조건(지정 기차, 좌석 우선순위)과 인원 수를 조회할 때마다 쓸 스크립트 인자로 미리 만들어 둔다.
+  예약 링크는 조회 폼에 선택된 인원으로 만들어지므로, 조회 버튼을 누르기 전에 인원 필드를 한 번에 채운다 (FILL_SCRIPT).
+  ARMED_SCRIPT 는 새 결과가 그려지는 순간 셀을 읽으면서 조건에 맞는 첫 예약하기 링크를 그 자리에서 누른다
+  (결과 확인과 클릭이 execute_script 한 번).
+- wait_for_confirmation: alert, 예약 확인 페이지(#isFalseGotoMain), 매진/오류 alert 뒤 결과 화면으로 되돌아옴(실패) 중
+  먼저 일어난 것을 바로 알아챈다 (고정 대기 없음).
+"""
+import time
+
+from selenium.common.exceptions import TimeoutException
+
+from change_detection import SEEN_ATTR, FORM_SEEN_ATTR
+from result_parser import RESULT_FORM_SELECTOR, RESULT_ROWS_SELECTOR, COL_TRAIN_NUM, SEAT_COLUMNS, BOOKABLE
+from rules import Action, BOOK
+from util import LazyImport
+
+By = LazyImport('selenium.webdriver.common.by', 'By')
+EC = LazyImport('selenium.webdriver.support.expected_conditions')
+WebDriverWait = LazyImport('selenium.webdriver.support.ui', 'WebDriverWait')
+
+CONFIRMATION_ID = 'isFalseGotoMain'
+
+# 조회 폼의 인원 필드
+ADULT_FIELD = 'psgInfoPerPrnb1'
+CHILD_FIELD = 'psgInfoPerPrnb5'
+
+# 좌석을 잡지 못했을 때 뜨는 alert 문구 (매진, 좌석 부족, 오류 등)
+REJECTION_MARKERS = ('잔여석', '매진', '부족', '없습니다', '불가', '실패', '오류', '초과')
+
+# 표시 없는 새 행이 그려졌으면 {cells: 상위 N개 행의 셀 텍스트, clicked: 누른 [행 번호, 열 번호] 또는 null}, 아니면 null
+# (READY_SCRIPT 와 같이 조회된 열차가 없는 새 결과면 {cells: [], clicked: null})
+# arguments[0]: 행 selector, arguments[1]: 읽을 행 수, arguments[2]: 지정 기차 번호 목록 (null 이면 모든 기차),
+# arguments[3]: 누를 좌석 열 번호 (우선순위 순)
+# 링크는 setTimeout 으로 눌러서 예약 페이지의 alert 가 이 스크립트의 반환을 막지 않게 한다
+ARMED_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+if (document.querySelector('[%s]') !== null) {
+    return null;
+}
+if (rows.length === 0) {
+    var form = document.querySelector('%s');
+    if (form === null || form.hasAttribute('%s') || document.readyState !== 'complete') {
+        return null;
+    }
+    return {cells: [], clicked: null};
+}
+var out = [];
+var clicked = null;
+for (var i = 0; i < rows.length && i < arguments[1]; i++) {
+    var cells = rows[i].querySelectorAll('td');
+    var texts = [];
+    for (var j = 0; j < cells.length; j++) {
+        texts.push((cells[j].innerText || cells[j].textContent || '').trim());
+    }
+    out.push(texts);
+    if (clicked !== null || texts.length < %d) continue;
+    if (arguments[2] !== null && arguments[2].indexOf(texts[%d].split(/\\s+/).join(' ')) < 0) continue;
+    for (var k = 0; k < arguments[3].length; k++) {
+        var col = arguments[3][k];
+        var link = cells[col - 1] ? cells[col - 1].querySelector('a') : null;
+        if (link && texts[col - 1].indexOf('%s') >= 0) {
+            clicked = [i + 1, col];
+            setTimeout(function () { link.click(); }, 0);
+            break;
+        }
+    }
+}
+return {cells: out, clicked: clicked};
+""" % (SEEN_ATTR, RESULT_FORM_SELECTOR, FORM_SEEN_ATTR, COL_TRAIN_NUM, COL_TRAIN_NUM - 1, BOOKABLE)
+
+# 좌석 열 번호 -> 좌석 속성 이름
+SEATS_BY_COLUMN = {col: seat for seat, col in SEAT_COLUMNS.items()}
+
+
+class ArmedBooking:
+    def __init__(self, rules, adult_num, child_num):
+        """
+        :param rules: 예약 조건 BookingRules (예약 대기는 누르지 않고 기존 흐름에 맡긴다)
+        :param adult_num: 성인 인원 수 (조회 폼에 선택한 인원으로 예약 링크가 만들어진다)
+        :param child_num: 어린이 인원 수
+        """
+        self.trains = sorted(rules.trains) if rules.trains is not None else None
+        self.columns = [SEAT_COLUMNS[seat] for seat, _ in rules.seats]
+        self.passengers = (int(adult_num), int(child_num))
+
+    def fields(self):
+        """조회 버튼을 누르기 전에 FILL_SCRIPT 로 채울 인원 필드"""
+        adult_num, child_num = self.passengers
+        return {ADULT_FIELD: str(adult_num), CHILD_FIELD: str(child_num)}
+
+    def args(self, num_rows):
+        """ARMED_SCRIPT 인자"""
+        return RESULT_ROWS_SELECTOR, num_rows, self.trains, self.columns
+
+    def action(self, rows, clicked):
+        """ARMED_SCRIPT 가 누른 [행 번호, 열 번호] 를 Action 으로"""
+        index, col = clicked
+        return Action(BOOK, rows[index - 1], SEATS_BY_COLUMN[col])
+
+    def __repr__(self):
+        trains = ', '.join(self.trains) if self.trains else '모든 기차'
+        return f"ArmedBooking({trains}, 좌석 열 {self.columns}, 성인 {self.passengers[0]} 어린이 {self.passengers[1]})"
+
+
+def is_rejection(text):
+    """좌석을 잡지 못했다는 alert 문구인지 (안내/확인 alert 는 False)"""
+    return any(marker in (text or '') for marker in REJECTION_MARKERS)
+
+
+def _rejected_on_results(rejected):
+    """거절 alert 를 닫은 뒤 결과 화면으로 돌아왔으면 예약이 거절된 것으로 본다"""
+    def condition(driver):
+        if not rejected[0]:
+            return False
+        return bool(driver.find_elements(By.CSS_SELECTOR, RESULT_ROWS_SELECTOR))
+    return condition
+
+
+def wait_for_confirmation(driver, timeout=10, poll_frequency=0.05):
+    """
+    예약 링크를 누른 뒤 예약 확인 페이지가 뜰 때까지 기다린다. 그 사이 뜨는 alert 는 닫으면서 문구를 모은다
+    안내/확인 alert 뒤에는 예약 페이지가 늦게 떠도 timeout 까지 기다리고,
+    매진/오류 alert 를 닫은 뒤 결과 화면으로 돌아왔을 때만 실패로 본다
+
+    :return: (확인 페이지가 떴는지, alert 문구 목록)
+    :raises TimeoutException: timeout 안에 확인 페이지도, 실패도 확인되지 않음
+    """
+    deadline = time.perf_counter() + timeout
+    alerts = []
+    rejected = [False]  # 거절 alert 를 닫았는지
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise TimeoutException("예약 확인 페이지가 뜨지 않았습니다")
+        found = WebDriverWait(driver, remaining, poll_frequency=poll_frequency).until(EC.any_of(
+            EC.alert_is_present(),
+            EC.presence_of_element_located((By.ID, CONFIRMATION_ID)),
+            _rejected_on_results(rejected),
+        ))
+        if hasattr(found, 'accept'):
+            alerts.append(found.text)
+            print(f"Alert message: {found.text}")
+            if is_rejection(found.text):
+                rejected[0] = True
+            found.accept()
+            continue
+        if found is True:
+            return False, alerts
+        return True, alerts
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+프로세스 트리의 메모리/CPU 사용량 (Linux /proc)
+
+chromedriver 프로세스와 그 아래의 Chrome 브라우저/렌더러 프로세스를 모두 합쳐서 본다.
+psutil 이 설치되어 있으면 psutil 을 쓰고, 없으면 /proc 을 직접 읽는다.
+"""
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_CLOCK_TICKS = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _children(pid):
+    children = []
+    task_dir = f'/proc/{pid}/task'
+    try:
+        tids = os.listdir(task_dir)
+    except OSError:
+        return children
+    for tid in tids:
+        try:
+            with open(f'{task_dir}/{tid}/children') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            pass
+    return children
+
+
+def process_tree(pid):
+    """pid 와 모든 자손 프로세스의 pid 목록"""
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            return [pid] + [child.pid for child in parent.children(recursive=True)]
+        except psutil.Error:
+            return []
+
+    pids = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        if not os.path.exists(f'/proc/{current}'):
+            continue
+        pids.append(current)
+        stack.extend(_children(current))
+    return pids
+
+
+def _rss(pid):
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+
+def _cpu_seconds(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # 두 번째 필드(comm)에 공백이 있을 수 있어 마지막 ')' 뒤부터 자른다
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS  # utime + stime
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def tree_usage(pid):
+    """
+    :return: (RSS 합계 bytes, CPU 시간 합계 seconds, 프로세스 수)
+    """
+    pids = process_tree(pid)
+    if psutil is not None:
+        rss = 0
+        cpu = 0.0
+        for p in pids:
+            try:
+                proc = psutil.Process(p)
+                rss += proc.memory_info().rss
+                times = proc.cpu_times()
+                cpu += times.user + times.system
+            except psutil.Error:
+                pass
+        return rss, cpu, len(pids)
+    return sum(_rss(p) for p in pids), sum(_cpu_seconds(p) for p in pids), len(pids)
+
+
+def driver_pid(driver):
+    """Selenium 드라이버의 chromedriver 프로세스 pid, 알 수 없으면 None"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
@@ -2,7 +2,11 @@
 
 # imports
 from main import SRT
-from util import parse_cli_args
+from util import parse_cli_args, build_scheduler, build_browser_profile, build_metrics, build_history, build_notifier, build_recorder, build_governor
+from watcher import Query, MultiWatcher, load_queries
+from accounts import AccountPool, load_accounts
+from tabs import TabWatcher
+from sweep import Sweeper, date_range, hour_range
 from dotenv import load_dotenv
 import os
 
@@ -22,6 +26,19 @@ if __name__ == "__main__":
     want_reserve = cli_args.reserve
 
     want_train = cli_args.want_train
+    if want_train and ',' in want_train:
+        want_train = {train.strip() for train in want_train.split(',') if train.strip()}
+    engine = cli_args.engine
+    base_url = cli_args.base_url
+    scheduler = build_scheduler(cli_args)
+    browser_profile = build_browser_profile(cli_args)
+    metrics = build_metrics(cli_args)
+    history = build_history(cli_args)
+    recorder = build_recorder(cli_args)
+    governor = build_governor(cli_args, metrics)
+    if history and dpt_stn and arr_stn:
+        # 좌석이 자주 풀리던 시간대에는 burst 간격으로 조회
+        scheduler.burst_hint = history.burst_hint(dpt_stn, arr_stn, want_train)
 
     # Load environment variables from .env file
     load_dotenv()
@@ -33,6 +50,60 @@ if __name__ == "__main__":
     # Get phone number from environment variable or set a default value
     phone_number = os.getenv('SRT_PHONE_NUMBER', 'YOUR_DEFAULT_PHONE_NUMBER')
 
-    srt = SRT(dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check, want_reserve, want_train)
-    # Run the SRT script with the provided credentials
-    srt.run(login_id, login_psw, phone_number)
+    notifier = build_notifier(cli_args, phone_number, metrics)
+    if cli_args.heartbeat:
+        # 아래에서 만드는 srt 의 진행 상황을 주기적으로 알림
+        notifier.start_heartbeat(lambda: srt.progress(), cli_args.heartbeat)
+
+    if cli_args.dt_end or cli_args.tm_end:
+        # 날짜/시간 범위의 모든 조회 창을 주기마다 훑기
+        srt = SRT(dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check, want_reserve, want_train,
+                  engine='http', base_url=base_url, scheduler=scheduler,
+                  session_file=cli_args.session_file, chromedriver_path=cli_args.chromedriver,
+                  browser_profile=browser_profile, metrics=metrics, race=cli_args.race, race_width=cli_args.race_width, history=history,
+                  notifier=notifier, recorder=recorder, prearm=cli_args.prearm, governor=governor)
+        want_trains = want_train if isinstance(want_train, set) else ({want_train} if want_train else None)
+        Sweeper(srt, date_range(dpt_dt, cli_args.dt_end or dpt_dt), hour_range(dpt_tm, cli_args.tm_end or dpt_tm),
+                want_trains=want_trains, workers=cli_args.workers,
+                priority=history.window_priority(dpt_stn, arr_stn) if history else None).run(login_id, login_psw, phone_number)
+    elif cli_args.query or cli_args.config or cli_args.accounts:
+        # 여러 조건을 하나의 로그인 세션(--accounts 면 계정마다 세션 하나, --tabs 면 브라우저 하나의 탭)으로 동시에 감시
+        queries = []
+        if dpt_stn and arr_stn and dpt_dt and dpt_tm:
+            queries.append(Query(dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check, want_reserve, want_train))
+        for text in cli_args.query or []:
+            queries.append(Query.from_string(text, adult_num=adult_num, child_num=child_num,
+                                             num_trains_to_check=num_trains_to_check, want_reserve=want_reserve, want_train=want_train))
+        if cli_args.config:
+            queries.extend(load_queries(cli_args.config))
+
+        if not queries:
+            raise SystemExit("감시할 조회 조건이 없습니다.")
+        first = queries[0]
+        srt = SRT(first.dpt_stn, first.arr_stn, first.dpt_dt, first.dpt_tm, first.adult_num, first.child_num,
+                  first.num_trains_to_check, first.want_reserve, first.want_train, engine='selenium' if cli_args.tabs else 'http',
+                  base_url=base_url, scheduler=scheduler,
+                  session_file=cli_args.session_file, chromedriver_path=cli_args.chromedriver,
+                  browser_profile=browser_profile, metrics=metrics, race=cli_args.race, race_width=cli_args.race_width, history=history,
+                  notifier=notifier, recorder=recorder, prearm=cli_args.prearm, governor=governor)
+        if cli_args.accounts:
+            AccountPool(srt, load_accounts(cli_args.accounts), replicas=cli_args.replicas).run(queries)
+        elif cli_args.tabs:
+            TabWatcher(srt, queries, mode=cli_args.tabs).run(login_id, login_psw, phone_number)
+        else:
+            MultiWatcher(srt, queries, max_workers=cli_args.workers).run(login_id, login_psw, phone_number)
+    else:
+        srt = SRT(dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num, child_num, num_trains_to_check, want_reserve, want_train,
+                  engine=engine, base_url=base_url, standby_drivers=cli_args.standby, scheduler=scheduler,
+                  session_file=cli_args.session_file, chromedriver_path=cli_args.chromedriver,
+                  browser_profile=browser_profile, metrics=metrics, race=cli_args.race, race_width=cli_args.race_width, history=history,
+                  notifier=notifier, recorder=recorder, prearm=cli_args.prearm, governor=governor)
+        # Run the SRT script with the provided credentials
+        srt.run(login_id, login_psw, phone_number)
+
+    notifier.close()
+    if history:
+        history.close()
+    if recorder:
+        recorder.close()
+    metrics.close()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+여러 행 동시 예약 (race booking)
+
+예약 가능한 행이 여러 개 보이면 첫 행 하나만 누르고 실패 시 다음 새로고침까지 기다리는 대신,
+조건에 맞는 행들의 예약 링크를 같은 브라우저의 새 탭에서 한꺼번에 열고
+가장 먼저 예약 확인 페이지(#isFalseGotoMain)가 뜬 탭을 남긴 뒤 나머지 탭은 닫는다.
+탭은 같은 쿠키(로그인 세션)를 쓰므로 별도 로그인이 필요 없다.
+
+예약 링크가 href 가 아니라 onclick 스크립트로만 되어 있으면 탭을 열 수 없으므로
+호출하는 쪽(SRT)이 순서대로 한 행씩 예약을 시도한다.
+"""
+import time
+
+from selenium.common.exceptions import NoAlertPresentException, UnexpectedAlertPresentException, WebDriverException
+
+from exceptions import PopupBlockedError
+from result_parser import RESULT_ROWS_SELECTOR, LINKS_SCRIPT
+
+WINDOW_PREFIX = 'srt-race-'
+
+# arguments[0]: 열 주소 목록. 탭 이름으로 어느 행의 탭인지 구분한다
+OPEN_TABS_SCRIPT = """
+for (var i = 0; i < arguments[0].length; i++) {
+    window.open(arguments[0][i], '%s' + i);
+}
+""" % WINDOW_PREFIX
+
+# 탭 상태: ['won' (예약 확인 페이지) | 'lost' (로드가 끝났는데 확인 표시 없음) | null (로딩 중), 탭 이름]
+TAB_STATE_SCRIPT = """
+var state = 'lost';
+if (document.getElementById('isFalseGotoMain')) state = 'won';
+else if (location.href === 'about:blank' || document.readyState !== 'complete') state = null;
+return [state, window.name];
+"""
+
+
+def is_openable(href):
+    return bool(href) and href.split(':', 1)[0].lower() in ('http', 'https')
+
+
+def resolve_links(driver, candidates):
+    """
+    후보 행의 예약 링크(href)를 execute_script 한 번으로 읽어온다
+
+    :param candidates: BookingRules.candidates 가 고른 Action 목록
+    :return: 후보와 같은 순서의 href 목록 (탭으로 열 수 없는 링크는 None)
+    """
+    cells = [[action.row.index, action.column] for action in candidates]
+    hrefs = driver.execute_script(LINKS_SCRIPT, RESULT_ROWS_SELECTOR, cells) or []
+    return [href if is_openable(href) else None for href in hrefs]
+
+
+def _accept_alert(driver):
+    try:
+        alert = driver.switch_to.alert
+        text = alert.text
+        alert.accept()
+        return text
+    except NoAlertPresentException:
+        return None
+
+
+def _tab_state(driver, handle):
+    driver.switch_to.window(handle)
+    try:
+        return driver.execute_script(TAB_STATE_SCRIPT)
+    except UnexpectedAlertPresentException:
+        # 매진/오류 alert 또는 예약 완료 안내 alert. 닫은 뒤 다음 확인에서 판정한다
+        text = _accept_alert(driver)
+        if text:
+            print(f"Alert message: {text}")
+        return [None, None]
+
+
+def _close_tabs(driver, handles):
+    for handle in handles:
+        try:
+            driver.switch_to.window(handle)
+            _accept_alert(driver)
+            driver.close()
+        except WebDriverException:
+            pass
+
+
+def race_tabs(driver, hrefs, timeout=10, poll_interval=0.05):
+    """
+    hrefs 를 새 탭에서 동시에 열고 가장 먼저 예약 확인 페이지가 뜬 탭을 남긴다
+
+    :return: 이긴 href 의 위치 (없으면 None). 이기면 그 탭으로, 지면 원래 탭으로 전환된 상태로 돌아온다
+    :raises PopupBlockedError: 브라우저가 새 탭을 하나도 열지 않음 (팝업 차단)
+    """
+    origin = driver.current_window_handle
+    before = set(driver.window_handles)
+    driver.execute_script(OPEN_TABS_SCRIPT, hrefs)
+
+    # window.open 은 탭을 바로 만든다. 여기서 보이지 않는 탭은 차단된 것이므로 기다리지 않는다
+    tabs = [handle for handle in driver.window_handles if handle not in before]
+    if not tabs:
+        raise PopupBlockedError("브라우저가 예약 탭을 열지 않았습니다 (팝업 차단)")
+    if len(tabs) < len(hrefs):
+        print(f"예약 탭 {len(hrefs)}개 중 {len(tabs)}개만 열렸습니다")
+
+    deadline = time.monotonic() + timeout
+    lost = set()
+    winner = None
+    position = None
+    while winner is None and time.monotonic() < deadline:
+        for handle in tabs:
+            if handle in lost:
+                continue
+            state, name = _tab_state(driver, handle)
+            if state == 'won':
+                winner = handle
+                if name and name.startswith(WINDOW_PREFIX):
+                    position = int(name[len(WINDOW_PREFIX):])
+                break
+            if state == 'lost':
+                lost.add(handle)
+        if len(lost) == len(tabs):
+            break
+        if winner is None:
+            time.sleep(poll_interval)
+
+    # 진 탭은 닫는다. 다른 탭에서도 좌석이 잡혔다면 결제하지 않은 예약은 시간이 지나면 자동 취소된다
+    _close_tabs(driver, [handle for handle in tabs if handle != winner])
+    driver.switch_to.window(winner or origin)
+    if winner is not None and position is None:
+        position = 0  # 탭 이름을 읽지 못한 경우 우선순위가 가장 높은 행으로 본다
+    return position
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+오류 분류와 단계별 복구
+
+WebDriverException/TimeoutException 을 한꺼번에 잡아 몇 초 쉬고 브라우저를 재시작하던 것을
+오류 종류별로 가장 싼 복구부터 시도하도록 나눈다.
+
+    stale_dom        → 다시 읽기
+    alert            → alert 닫기
+    throttled        → backoff (재시작해도 제한은 풀리지 않으므로 더 올라가지 않음)
+    network          → backoff → 조회 페이지 다시 열기
+    timeout          → 다시 읽기 → 조회 페이지 다시 열기 → 다시 로그인
+    session_expired  → 다시 로그인
+    dead_driver      → 드라이버 교체 (예비 드라이버가 있으면 즉시)
+    unknown          → 조회 페이지 다시 열기 → 다시 로그인
+
+같은 종류가 escalate_after 번 연달아 나면 한 단계 비싼 복구로 올라가고, 마지막은 드라이버 교체다.
+복구마다 걸린 시간을 재서 (metrics 'recovery' 타이머) 다시 로그인보다 드라이버 교체가 실제로 더 빠르면
+(예비 드라이버 풀이 있을 때) 교체를 쓴다.
+"""
+import time
+
+from selenium.common.exceptions import (InvalidSessionIdException, NoAlertPresentException, NoSuchWindowException,
+                                       StaleElementReferenceException, TimeoutException,
+                                       UnexpectedAlertPresentException, WebDriverException)
+
+from exceptions import SessionExpiredError, RateLimitedError
+from util import LazyImport
+
+requests = LazyImport('requests')
+
+# 오류 종류
+STALE_DOM = 'stale_dom'
+ALERT = 'alert'
+THROTTLED = 'throttled'
+NETWORK = 'network'
+TIMEOUT = 'timeout'
+SESSION_EXPIRED = 'session_expired'
+DEAD_DRIVER = 'dead_driver'
+UNKNOWN = 'unknown'
+
+# 복구 동작 (싼 순서)
+REREAD = 'reread'
+DISMISS_ALERT = 'dismiss_alert'
+BACKOFF = 'backoff'
+RELOAD = 'reload'
+RELOGIN = 'relogin'
+REPLACE_DRIVER = 'replace_driver'
+
+LADDERS = {
+    STALE_DOM: (REREAD, RELOAD, REPLACE_DRIVER),
+    ALERT: (DISMISS_ALERT, RELOAD, REPLACE_DRIVER),
+    THROTTLED: (BACKOFF,),
+    NETWORK: (BACKOFF, RELOAD, REPLACE_DRIVER),
+    TIMEOUT: (REREAD, RELOAD, RELOGIN, REPLACE_DRIVER),
+    SESSION_EXPIRED: (RELOGIN, REPLACE_DRIVER),
+    DEAD_DRIVER: (REPLACE_DRIVER,),
+    UNKNOWN: (RELOAD, RELOGIN, REPLACE_DRIVER),
+}
+
+# 아직 재 본 적 없는 복구의 예상 시간(초)
+DEFAULT_COSTS = {
+    REREAD: 0.05,
+    DISMISS_ALERT: 0.1,
+    BACKOFF: 0.0,
+    RELOAD: 1.5,
+    RELOGIN: 5.0,
+    REPLACE_DRIVER: 15.0,
+}
+
+# 드라이버 프로세스/창이 사라졌을 때 WebDriverException 메시지에 들어가는 문구
+DEAD_DRIVER_MARKERS = ('invalid session id', 'chrome not reachable', 'session deleted', 'disconnected',
+                       'no such window', 'target window already closed', 'tab crashed')
+NETWORK_MARKERS = ('net::ERR_', 'ERR_CONNECTION', 'ERR_NAME_NOT_RESOLVED', 'ERR_TIMED_OUT')
+
+
+def classify(exc):
+    """예외를 오류 종류 문자열로 분류한다"""
+    if isinstance(exc, RateLimitedError):
+        return THROTTLED
+    if isinstance(exc, SessionExpiredError):
+        return SESSION_EXPIRED
+    if isinstance(exc, StaleElementReferenceException):
+        return STALE_DOM
+    if isinstance(exc, UnexpectedAlertPresentException):
+        return ALERT
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return DEAD_DRIVER
+    if isinstance(exc, TimeoutException):
+        return TIMEOUT
+    if isinstance(exc, WebDriverException):
+        message = exc.msg or ''
+        if any(marker in message for marker in DEAD_DRIVER_MARKERS):
+            return DEAD_DRIVER
+        if any(marker in message for marker in NETWORK_MARKERS):
+            return NETWORK
+        return UNKNOWN
+    if isinstance(exc, requests.RequestException):
+        return NETWORK
+    if isinstance(exc, ConnectionError):
+        # chromedriver 프로세스에 연결하지 못함
+        return DEAD_DRIVER
+    return UNKNOWN
+
+
+class Recovery:
+    def __init__(self, srt, escalate_after=3):
+        """
+        :param srt: 복구할 SRT 객체
+        :param escalate_after: 같은 종류의 오류가 이 횟수만큼 연달아 나면 한 단계 비싼 복구로 올라간다
+        """
+        self.srt = srt
+        self.escalate_after = escalate_after
+        self.failures = {}   # 오류 종류 -> 연속 횟수
+        self.costs = {}      # 복구 동작 -> [횟수, 합계(초)]
+
+    def succeeded(self):
+        """조회에 성공하면 연속 오류 횟수를 지운다"""
+        if self.failures:
+            self.failures.clear()
+
+    def cost(self, action):
+        """복구 동작의 평균 시간(초), 재 본 적 없으면 DEFAULT_COSTS"""
+        count, total = self.costs.get(action, (0, 0.0))
+        return total / count if count else DEFAULT_COSTS[action]
+
+    def plan(self, kind):
+        """오류 종류와 연속 횟수로 복구 동작을 고른다"""
+        count = self.failures.get(kind, 1)
+        ladder = LADDERS[kind]
+        action = ladder[min((count - 1) // self.escalate_after, len(ladder) - 1)]
+        if action == RELOGIN and self.cost(REPLACE_DRIVER) < self.cost(RELOGIN):
+            action = REPLACE_DRIVER
+        return action
+
+    def handle(self, exc, phase, reload=True):
+        """
+        예외를 분류하고 복구한다
+
+        :param phase: 오류가 난 단계 (metrics 라벨) ex) 'check', 'search', 'refresh', 'run'
+        :param reload: False 면 조회 페이지를 다시 여는 복구는 건너뛴다 (go_search 처럼 호출한 쪽이 다시 열 때)
+        :return: 실행한 복구 동작
+        """
+        kind = classify(exc)
+        self.failures[kind] = self.failures.get(kind, 0) + 1
+        action = self.plan(kind)
+        message = (getattr(exc, 'msg', None) or str(exc)).strip().split('\n')[0]
+        print(f"{phase} 오류 ({kind}, {self.failures[kind]}회) → {action}: {message[:200]}")
+        self.srt.metrics.incr('errors', phase=phase, kind=kind)
+
+        if action == RELOAD and not reload:
+            return action
+        started = time.perf_counter()
+        try:
+            getattr(self, '_' + action)(exc, reload)
+        except Exception as e:
+            if action == REPLACE_DRIVER:
+                raise
+            # 복구 자체가 실패하면 바로 드라이버를 교체한다
+            print(f"{action} 실패, 드라이버를 교체합니다: {str(e)}")
+            action = REPLACE_DRIVER
+            started = time.perf_counter()
+            self._replace_driver(e, reload)
+        self._record(action, time.perf_counter() - started)
+        if action == REPLACE_DRIVER:
+            self.failures.clear()
+        return action
+
+    def _record(self, action, seconds):
+        entry = self.costs.setdefault(action, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        self.srt.metrics.observe('recovery', seconds, action=action)
+
+    def _reread(self, exc, reload):
+        self.srt.fresh_rows = None
+
+    def _dismiss_alert(self, exc, reload):
+        try:
+            alert = self.srt.driver.switch_to.alert
+            print(f"Alert message: {alert.text}")
+            alert.accept()
+        except NoAlertPresentException:
+            pass
+        self.srt.fresh_rows = None
+
+    def _backoff(self, exc, reload):
+        scheduler = self.srt.scheduler
+        scheduler.record_error(rate_limited=isinstance(exc, RateLimitedError), retry_after=getattr(exc, 'retry_after', None))
+        scheduler.wait()
+
+    def _reload(self, exc, reload):
+        self.srt.go_search()
+
+    def _relogin(self, exc, reload):
+        srt = self.srt
+        srt.driver.get(srt.search_url)
+        srt.ensure_login()
+        if srt.http_engine:
+            srt.http_engine.load_cookies_from_driver(srt.driver)
+        if reload:
+            srt.go_search()
+
+    def _replace_driver(self, exc, reload):
+        srt = self.srt
+        srt.restart_browser()
+        if srt.driver is None:
+            raise WebDriverException("드라이버를 교체하지 못했습니다")
+        if srt.http_engine:
+            srt.http_engine.load_cookies_from_driver(srt.driver)
+
+    def summary(self):
+        """{복구 동작: (횟수, 평균 시간)}"""
+        return {action: (count, total / count) for action, (count, total) in self.costs.items()}
+
@@ -0,0 +1,430 @@
+# -*- coding: utf-8 -*-
+"""
+조회/예약 기록(record)과 재생(replay)
+
+실제 감시 중 SRT 가 본 응답을 압축 파일(gzip JSON lines)에 남겨 두었다가
+네트워크와 브라우저 없이 SRT 에 그대로 다시 먹여서, 느렸던 주기를 재현하거나
+파서/엔진 버전을 같은 입력으로 비교한다.
+
+기록 (--record capture.jsonl.gz)
+    query  조회 조건 (시작할 때, 조건을 바꿀 때)
+    page   go_search/refresh_result 후 브라우저의 #result-form HTML
+    http   HTTP 엔진 조회 응답 (상태 코드, #result-form 부분만)
+    book   book_ticket 결과 (booked / alert / error, alert 문구, 걸린 시간)
+
+재생
+    ReplaySession: HttpSearchEngine(session=...) 에 넣는 requests.Session 대역
+    ReplayDriver:  check_result/refresh_result/book_ticket 이 쓰는 만큼만 흉내낸 WebDriver 대역
+두 대역은 같은 ReplaySource 를 기록 순서대로 읽고, speed 배속(0 이면 기다리지 않음)으로 재생한다.
+
+python replay.py capture.jsonl.gz [--speed 0] [--engine http] [--prearm] [--verbose]
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from contextlib import redirect_stdout
+
+from selenium.common.exceptions import NoAlertPresentException, NoSuchElementException
+
+from change_detection import MARK_SCRIPT, READY_SCRIPT
+from prearm import ARMED_SCRIPT, is_rejection
+from result_parser import (RESULT_ROWS_SELECTOR, SNAPSHOT_SCRIPT, LINKS_SCRIPT, CELL_LOCATORS, LINK_LOCATORS,
+                           COL_TRAIN_NUM, BOOKABLE, parse_result_cells, result_form_slice)
+from stations import FILL_SCRIPT
+
+# 브라우저에서 결과 폼 HTML 만 꺼낸다 (page_source 전체보다 작다)
+RESULT_FORM_SCRIPT = """
+var form = document.getElementById('result-form');
+return form ? form.outerHTML : document.documentElement.outerHTML;
+"""
+
+PAGE_KINDS = ('page', 'http')
+
+# 예약 실패 기록에 거절 alert 가 없을 때 재생할 문구
+REJECTED_ALERT = '잔여석이 없습니다.'
+
+
+class ReplayFinished(Exception):
+    """기록을 모두 재생함"""
+
+
+class Recorder:
+    def __init__(self, path):
+        """
+        :param path: 기록 파일 경로 (gzip JSON lines)
+        """
+        self.path = path
+        self.file = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.cnt_records = 0
+
+    def record(self, kind, **data):
+        data['t'] = round(time.monotonic() - self.started, 4)
+        data['kind'] = kind
+        line = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=sorted)
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line + '\n')
+                self.cnt_records += 1
+
+    def record_html(self, kind, html, **data):
+        self.record(kind, html=result_form_slice(html or ''), **data)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def load_records(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class ReplayPage:
+    """기록된 결과 폼 하나. 셀 텍스트/링크는 처음 쓸 때 한 번만 파싱한다"""
+
+    def __init__(self, record):
+        self.html = record.get('html', '')
+        self.status = record.get('status', 200)
+        self.retry_after = record.get('retry_after')
+        self._cells = None
+        self._links = None
+
+    def _parse(self):
+        self._cells, self._links = parse_result_cells(self.html)
+
+    @property
+    def cells(self):
+        if self._cells is None:
+            self._parse()
+        return self._cells
+
+    @property
+    def links(self):
+        if self._links is None:
+            self._parse()
+        return self._links
+
+
+class ReplaySource:
+    def __init__(self, records, speed=0.0, loops=1):
+        """
+        :param records: load_records 결과
+        :param speed: 재생 배속 (1 이면 기록한 간격 그대로, 0 이면 기다리지 않음)
+        :param loops: 기록을 몇 번 반복해서 재생할지
+        """
+        self.query = next((record for record in records if record['kind'] == 'query'), {})
+        self.pages = [(record['t'], ReplayPage(record)) for record in records if record['kind'] in PAGE_KINDS]
+        self.books = [record for record in records if record['kind'] == 'book']
+        self.speed = speed
+        self.loops = loops
+
+        self.position = 0
+        self.cnt_pages = 0
+        self.book_position = 0
+        self.replay_started = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, speed=0.0, loops=1):
+        return cls(load_records(path), speed, loops)
+
+    def next_page(self):
+        """
+        다음 기록 응답을 반환. speed 가 있으면 기록 당시 간격에 맞춰 기다린다
+        :raises ReplayFinished: 기록을 loops 번 모두 재생함
+        """
+        with self.lock:
+            if not self.pages or self.position >= len(self.pages) * self.loops:
+                raise ReplayFinished(f"기록 {self.cnt_pages}건 재생 완료")
+            loop, index = divmod(self.position, len(self.pages))
+            offset, page = self.pages[index]
+            self.position += 1
+            self.cnt_pages += 1
+            if self.replay_started is None:
+                self.replay_started = time.monotonic() - offset / self.speed if self.speed else time.monotonic()
+        if self.speed:
+            span = self.pages[-1][0] - self.pages[0][0]
+            delay = self.replay_started + (offset + loop * span) / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return page
+
+    def next_book(self):
+        """다음 예약 결과 기록 (없으면 실패로 본다)"""
+        with self.lock:
+            if self.book_position < len(self.books):
+                self.book_position += 1
+                return self.books[self.book_position - 1]
+        return {'outcome': 'error'}
+
+
+class ReplayResponse:
+    def __init__(self, page):
+        self.status_code = page.status
+        self.text = page.html
+        self.headers = {'Retry-After': page.retry_after} if page.retry_after else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            from requests import HTTPError
+            raise HTTPError(f"{self.status_code} (replay)", response=self)
+
+
+class _Cookies:
+    def set(self, *args, **kwargs):
+        pass
+
+
+class ReplaySession:
+    """HttpSearchEngine 용 requests.Session 대역. post 마다 다음 기록 응답을 돌려준다"""
+
+    def __init__(self, source):
+        self.source = source
+        self.headers = {}
+        self.cookies = _Cookies()
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def post(self, url, data=None, timeout=None):
+        return ReplayResponse(self.source.next_page())
+
+    def close(self):
+        pass
+
+
+class ReplayElement:
+    def __init__(self, text='', on_click=None):
+        self.text = text
+        self.on_click = on_click
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        if self.on_click:
+            self.on_click()
+
+    def get_attribute(self, name):
+        return None
+
+
+class _Alert:
+    def __init__(self, driver):
+        self.driver = driver
+        self.text = driver.alert_text
+
+    def accept(self):
+        self.driver.alert_text = None
+
+    dismiss = accept
+
+
+class _SwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @property
+    def alert(self):
+        if self.driver.alert_text is None:
+            raise NoAlertPresentException()
+        return _Alert(self.driver)
+
+
+# find_element 인자 -> (행, 열)
+_CELLS = {locator: key for key, locator in CELL_LOCATORS.items()}
+_LINKS = {locator: key for key, locator in LINK_LOCATORS.items()}
+
+
+def _armed_click(cells, trains, columns):
+    """ARMED_SCRIPT 가 누를 [행 번호, 열 번호] (없으면 None)"""
+    for i, texts in enumerate(cells):
+        if len(texts) < COL_TRAIN_NUM:
+            continue
+        if trains is not None and ' '.join(texts[COL_TRAIN_NUM - 1].split()) not in trains:
+            continue
+        for col in columns:
+            if len(texts) >= col and BOOKABLE in texts[col - 1]:
+                return [i + 1, col]
+    return None
+
+
+class ReplayDriver:
+    """
+    조회 결과 화면과 예약 클릭만 흉내내는 WebDriver 대역
+    로그인/go_search 의 입력 폼은 흉내내지 않으므로 check_result 부터 재생한다
+    """
+
+    def __init__(self, source, search_url='replay://search'):
+        self.source = source
+        self.page = None
+        self.marked = False
+        self.alert_text = None
+        self.confirmed = False
+        self.current_url = search_url
+        self.switch_to = _SwitchTo(self)
+        self.cnt_clicks = 0
+
+    def _advance(self):
+        self.page = self.source.next_page()
+        self.confirmed = False
+
+    def _current(self):
+        if self.page is None:
+            self._advance()
+        return self.page
+
+    def execute_script(self, script, *args):
+        if script == READY_SCRIPT:
+            # 조회 버튼을 누른 뒤(MARK) 처음 확인할 때 다음 응답이 그려진 것으로 본다
+            if self.marked or self.page is None:
+                self.marked = False
+                self._advance()
+            return self.page.cells[:args[1]] if args[2] else True
+        if script == ARMED_SCRIPT:
+            cells = self.execute_script(READY_SCRIPT, args[0], args[1], True)
+            clicked = _armed_click(cells, args[2], args[3])
+            if clicked:
+                self._book()
+            return {'cells': cells, 'clicked': clicked}
+        if script == FILL_SCRIPT:
+            return len(args[0])  # 조회 폼 필드는 모두 있는 것으로 본다
+        if script == MARK_SCRIPT:
+            # 아직 그려진 결과가 없으면 (HTTP 엔진에서 처음 브라우저로 넘어옴) 다음 응답을 READY 에서 읽도록 남겨 둔다
+            self.marked = True
+            return len(self.page.cells) if self.page is not None else 0
+        if script == SNAPSHOT_SCRIPT:
+            return self._current().cells[:args[1]]
+        if script == LINKS_SCRIPT:
+            return [None] * len(args[1])  # 탭으로 열 수 없는 링크로 보고 한 행씩 예약
+        if script == RESULT_FORM_SCRIPT:
+            return self._current().html
+        return None
+
+    def _book(self):
+        self.cnt_clicks += 1
+        record = self.source.next_book()
+        self.alert_text = record.get('alert')
+        self.confirmed = record.get('outcome') == 'booked'
+        if not self.confirmed and not is_rejection(self.alert_text):
+            self.alert_text = REJECTED_ALERT  # 거절 alert 없이 기록된 실패도 실제처럼 매진 alert 로 끝낸다
+
+    def find_element(self, by, value):
+        locator = (by, value)
+        if locator in _CELLS:
+            i, col = _CELLS[locator]
+            cells = self._current().cells
+            if i > len(cells) or col > len(cells[i - 1]):
+                raise NoSuchElementException(value)
+            return ReplayElement(cells[i - 1][col - 1])
+        if locator in _LINKS:
+            return ReplayElement(on_click=self._book)
+        if value == RESULT_ROWS_SELECTOR:
+            if self.confirmed:
+                raise NoSuchElementException(value)
+            return ReplayElement()  # 예약이 거절되면 결과 화면에 남아 있다
+        if value == 'isFalseGotoMain':
+            if not self.confirmed:
+                raise NoSuchElementException(value)
+            return ReplayElement()
+        if by == 'xpath':
+            return ReplayElement()  # 조회하기 버튼
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        try:
+            return [self.find_element(by, value)]
+        except NoSuchElementException:
+            return []
+
+    @property
+    def page_source(self):
+        return self._current().html
+
+    def get_cookies(self):
+        return []
+
+    def get(self, url):
+        pass
+
+    def back(self):
+        pass
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def quit(self):
+        pass
+
+
+def replay_srt(srt, source):
+    """
+    srt 에 재생 드라이버(와 HTTP 엔진이면 재생 세션)를 넣고 check_result 를 기록이 끝날 때까지 돌린다
+    :return: 걸린 시간(초)
+    """
+    from http_engine import HttpSearchEngine
+
+    srt.driver = ReplayDriver(source, srt.search_url)
+    if srt.engine == 'http':
+        srt.http_engine = HttpSearchEngine(session=ReplaySession(source))
+    else:
+        srt.fresh_rows = srt.read_result_rows()
+    started = time.perf_counter()
+    try:
+        srt.check_result()
+    except ReplayFinished:
+        pass
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay a recorded watch without network or browser')
+    parser.add_argument("path", help="Recording made with --record")
+    parser.add_argument("--speed", help="Playback speed (1: recorded pace, 0: as fast as possible)", type=float, default=0.0)
+    parser.add_argument("--loops", help="Replay the recording this many times", type=int, default=1)
+    parser.add_argument("--engine", help="Refresh engine to replay with", type=str, choices=["selenium", "http"], default=None)
+    parser.add_argument("--want_train", help="Override the recorded train number(s)", type=str, default=None)
+    parser.add_argument("--prearm", help="Replay with pre-armed booking", action="store_true")
+    parser.add_argument("--verbose", help="Show SRT output while replaying", action="store_true")
+    args = parser.parse_args()
+
+    from main import SRT
+    from metrics import Metrics
+    from scheduler import PollScheduler
+
+    source = ReplaySource.from_file(args.path, speed=args.speed, loops=args.loops)
+    start = source.query
+    want_train = args.want_train or start.get('want_train', 'none')
+    if isinstance(want_train, list):
+        want_train = set(want_train)
+    srt = SRT(start.get('dpt_stn', '수서'), start.get('arr_stn', '부산'), start.get('dpt_dt', '20240101'),
+              start.get('dpt_tm', '08'), start.get('adult_num', 1), start.get('child_num', 0),
+              start.get('num_trains_to_check', 4), start.get('want_reserve', False), want_train,
+              engine=args.engine or start.get('engine', 'selenium'),
+              scheduler=PollScheduler(min_interval=0, max_interval=0), metrics=Metrics(), prearm=args.prearm)
+    srt.notifier = None
+    srt.phone_number = None
+
+    if args.verbose:
+        elapsed = replay_srt(srt, source)
+    else:
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            elapsed = replay_srt(srt, source)
+
+    print(f"재생: 응답 {source.cnt_pages}건, 새로고침 {srt.cnt_refresh}회, {elapsed:.3f}초 "
+          f"({source.cnt_pages / elapsed if elapsed > 0 else 0:.0f} cycles/s), 예약 {'성공' if srt.is_booked else '없음'}")
+    srt.print_metrics()
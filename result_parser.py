@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+SRT 조회 결과 테이블(#result-form) 파서
+
+check_result 가 행마다 find_element 를 여러 번 호출하는 대신,
+테이블 전체를 한 번에 가져와서 파이썬에서 행 단위 레코드(TrainRow)로 변환한다.
+HTTP 엔진과 Selenium 엔진 모두 여기서 만든 TrainRow 를 rules.BookingRules 로 판단한다.
+"""
+import re
+from enum import Enum
+from html.parser import HTMLParser
+
+RESULT_FORM_SELECTOR = "#result-form"
+RESULT_ROWS_SELECTOR = "#result-form > fieldset > div.tbl_wrap.th_thead > table > tbody > tr"
+
+# 결과 테이블의 열 번호 (1부터 시작, nth-child 기준)
+COL_TRAIN_NUM = 3
+COL_DEPARTURE = 4
+COL_ARRIVAL = 5
+COL_PREMIUM_SEAT = 6
+COL_STANDARD_SEAT = 7
+COL_RESERVATION = 8
+
+# 셀/예약 링크 locator 를 조회할 때마다 f-string 으로 만들지 않도록 미리 만들어 둔다
+# ('css selector' == By.CSS_SELECTOR, find_element(*CELL_LOCATORS[행, 열]) 로 사용)
+MAX_ROWS = 20
+CELL_LOCATORS = {(i, col): ('css selector', f"{RESULT_ROWS_SELECTOR}:nth-child({i}) > td:nth-child({col})")
+                 for i in range(1, MAX_ROWS + 1) for col in range(1, COL_RESERVATION + 1)}
+LINK_LOCATORS = {key: (by, selector + ' > a') for key, (by, selector) in CELL_LOCATORS.items()}
+
+
+def cell_locator(i, col):
+    return CELL_LOCATORS.get((i, col)) or ('css selector', f"{RESULT_ROWS_SELECTOR}:nth-child({i}) > td:nth-child({col})")
+
+
+def link_locator(i, col):
+    return LINK_LOCATORS.get((i, col)) or ('css selector', f"{RESULT_ROWS_SELECTOR}:nth-child({i}) > td:nth-child({col}) > a")
+
+# execute_script 한 번으로 상위 N개 행의 셀 텍스트를 모두 읽어온다
+# arguments[0]: 행 selector, arguments[1]: 읽을 행 수
+SNAPSHOT_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < rows.length && i < arguments[1]; i++) {
+    var cells = rows[i].querySelectorAll('td');
+    var texts = [];
+    for (var j = 0; j < cells.length; j++) {
+        texts.push((cells[j].innerText || cells[j].textContent || '').trim());
+    }
+    out.push(texts);
+}
+return out;
+"""
+
+# 지정한 (행 번호, 열 번호) 셀의 예약 링크(a href)를 한 번에 읽어온다
+# arguments[0]: 행 selector, arguments[1]: [[행 번호, 열 번호], ...] (1부터 시작)
+LINKS_SCRIPT = """
+var rows = document.querySelectorAll(arguments[0]);
+var out = [];
+for (var i = 0; i < arguments[1].length; i++) {
+    var row = rows[arguments[1][i][0] - 1];
+    var cell = row ? row.querySelectorAll('td')[arguments[1][i][1] - 1] : null;
+    var link = cell ? cell.querySelector('a') : null;
+    out.push(link ? link.href : null);
+}
+return out;
+"""
+
+SEAT_COLUMNS = {'premium_seat': COL_PREMIUM_SEAT, 'standard_seat': COL_STANDARD_SEAT, 'reservation': COL_RESERVATION}
+
+UNKNOWN_TRAIN = "알 수 없음"
+SOLD_OUT = "매진"
+BOOKABLE = "예약하기"
+WAITLIST = "신청하기"
+
+TIME_PATTERN = re.compile(r'\d{2}:\d{2}')
+
+
+class SeatState(Enum):
+    AVAILABLE = 'available'   # 예약하기
+    SOLD_OUT = 'sold_out'     # 매진
+    WAITLIST = 'waitlist'     # 예약 대기 신청하기
+    OTHER = 'other'           # 입석, '-' 등 누를 수 없는 칸
+
+
+_seat_states = {}
+
+
+def parse_seat(text):
+    """좌석/예약 대기 셀 텍스트를 SeatState 로 변환 (같은 텍스트는 한 번만 판단)"""
+    state = _seat_states.get(text)
+    if state is None:
+        if SOLD_OUT in text:
+            state = SeatState.SOLD_OUT
+        elif BOOKABLE in text:
+            state = SeatState.AVAILABLE
+        elif WAITLIST in text:
+            state = SeatState.WAITLIST
+        else:
+            state = SeatState.OTHER
+        if len(_seat_states) < 256:
+            _seat_states[text] = state
+    return state
+
+
+class TrainRow:
+    """결과 테이블 한 행"""
+    __slots__ = ('index', 'train_num', 'departure', 'arrival', 'premium_seat', 'standard_seat', 'reservation',
+                 'premium_state', 'standard_state', 'reservation_state', 'links')
+
+    def __init__(self, index, train_num, departure='', arrival='', premium_seat=SOLD_OUT, standard_seat=SOLD_OUT,
+                 reservation=SOLD_OUT, links=None):
+        """
+        :param index: 결과 테이블에서의 행 번호 (1부터 시작)
+        :param departure: 출발 시각 HH:MM (모르면 '')
+        :param arrival: 도착 시각 HH:MM (모르면 '')
+        :param premium_seat: 특실 셀 텍스트 (standard_seat, reservation 도 같음)
+        :param links: {'premium_seat' | 'standard_seat' | 'reservation': 첫 번째 a 태그의 href}
+        """
+        self.index = index
+        self.train_num = train_num
+        self.departure = departure
+        self.arrival = arrival
+        self.premium_seat = premium_seat
+        self.standard_seat = standard_seat
+        self.reservation = reservation
+        self.premium_state = parse_seat(premium_seat)
+        self.standard_state = parse_seat(standard_seat)
+        self.reservation_state = parse_seat(reservation)
+        self.links = links or {}
+
+    @property
+    def available(self):
+        """특실 또는 일반실을 바로 예약할 수 있는지"""
+        return self.premium_state is SeatState.AVAILABLE or self.standard_state is SeatState.AVAILABLE
+
+    def __repr__(self):
+        return (f"TrainRow({self.index}, {self.train_num}, {self.departure}-{self.arrival}, "
+                f"{self.premium_state.value}/{self.standard_state.value}/{self.reservation_state.value})")
+
+    def describe(self):
+        return f"기차번호: {self.train_num} / 프리미엄석: {self.premium_seat} / 일반석: {self.standard_seat} / 예약 대기: {self.reservation}"
+
+
+def _cell(cells, col):
+    if len(cells) >= col:
+        return " ".join(cells[col - 1].split())
+    return None
+
+
+def _time(cells, col):
+    found = TIME_PATTERN.search(cells[col - 1]) if len(cells) >= col else None
+    return found.group() if found else ''
+
+
+def row_from_cells(index, cells, links=None):
+    """
+    셀 텍스트 목록을 TrainRow 로 변환
+
+    :param index: 결과 테이블에서의 행 번호 (1부터 시작)
+    :param cells: 해당 행의 td 텍스트 목록
+    :param links: 해당 행의 td 마다 첫 번째 a 태그의 href (없으면 None)
+    """
+    train_num = _cell(cells, COL_TRAIN_NUM)
+    premium_seat = _cell(cells, COL_PREMIUM_SEAT)
+    standard_seat = _cell(cells, COL_STANDARD_SEAT)
+    reservation = _cell(cells, COL_RESERVATION)
+
+    # 기존 check_result 와 같이 읽지 못한 행은 매진으로 취급
+    if None in (train_num, premium_seat, standard_seat, reservation):
+        return TrainRow(index, UNKNOWN_TRAIN)
+
+    return TrainRow(index, train_num, _time(cells, COL_DEPARTURE), _time(cells, COL_ARRIVAL),
+                    premium_seat, standard_seat, reservation,
+                    {key: links[col - 1] for key, col in SEAT_COLUMNS.items() if links and len(links) >= col})
+
+
+def rows_from_snapshot(snapshot, num_rows, links=None):
+    """
+    SNAPSHOT_SCRIPT 결과를 num_rows 개의 TrainRow 로 변환
+    결과가 num_rows 보다 적으면 나머지는 매진 행으로 채운다
+    """
+    snapshot = snapshot or []
+    rows = []
+    for i in range(1, num_rows + 1):
+        cells = snapshot[i - 1] if i <= len(snapshot) else []
+        row_links = links[i - 1] if links and i <= len(links) else None
+        rows.append(row_from_cells(i, cells, row_links))
+    return rows
+
+
+class _ResultTableParser(HTMLParser):
+    """#result-form 안의 tbody > tr > td 텍스트와 첫 번째 링크만 모으는 파서"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.links = []
+        self._row_links = None
+        self._in_form = False
+        self._in_tbody = False
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'form' and dict(attrs).get('id') == 'result-form':
+            self._in_form = True
+            return
+        if not self._in_form:
+            return
+
+        if tag == 'tbody':
+            self._in_tbody = True
+        elif tag == 'tr' and self._in_tbody:
+            self._row = []
+            self._row_links = []
+        elif tag == 'td' and self._row is not None:
+            self._cell = []
+            self._row_links.append(None)
+        elif tag == 'a' and self._cell is not None and self._row_links[-1] is None:
+            self._row_links[-1] = dict(attrs).get('href')
+        elif tag == 'br' and self._cell is not None:
+            self._cell.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'br' and self._cell is not None:
+            self._cell.append(' ')
+
+    def handle_endtag(self, tag):
+        if not self._in_form:
+            return
+
+        if tag == 'form':
+            self._in_form = False
+        elif tag == 'td' and self._cell is not None:
+            self._row.append(''.join(self._cell).strip())
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.rows.append(self._row)
+            self.links.append(self._row_links)
+            self._row = None
+        elif tag == 'tbody':
+            self._in_tbody = False
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def result_form_slice(html):
+    """
+    페이지 HTML 에서 <form id="result-form"> ... </form> 부분만 잘라 반환 (없으면 전체)
+    머리말/메뉴/스크립트를 파서에 넣지 않으므로 파싱 시간이 결과 테이블 크기에만 비례한다
+    """
+    marker = html.find('result-form')
+    if marker < 0:
+        return html
+    start = html.rfind('<form', 0, marker)
+    end = html.find('</form>', marker)
+    if start < 0 or end < 0:
+        return html
+    return html[start:end + len('</form>')]
+
+
+def parse_result_cells(html):
+    """
+    HTML 에서 결과 테이블의 셀 텍스트와 링크를 읽는다
+    :return: (행마다 td 텍스트 목록, 행마다 td 의 첫 번째 링크 목록) - SNAPSHOT_SCRIPT 결과와 같은 모양
+    """
+    parser = _ResultTableParser()
+    parser.feed(result_form_slice(html))
+    parser.close()
+    return parser.rows, parser.links
+
+
+def parse_result_html(html, num_rows):
+    """
+    page_source 등 HTML 문자열에서 결과 테이블을 파싱
+
+    :param html: 조회 결과 페이지 HTML
+    :param num_rows: 읽을 행 수
+    :return: TrainRow 목록
+    """
+    cells, links = parse_result_cells(html)
+    return rows_from_snapshot(cells, num_rows, links)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+예약 조건 판단 (rule engine)
+
+지정 기차 번호, 예약 대기 사용 여부 같은 예약 조건을 한 번만 정리해 두고
+TrainRow 마다 어떤 좌석을 누를지(Action) 판단한다.
+Selenium 엔진(SRT.decide_and_book), HTTP 엔진(MultiWatcher, Sweeper), 동시 예약(race) 모두 이 판단을 쓴다.
+"""
+from result_parser import SEAT_COLUMNS, SeatState
+
+BOOK = 'book'
+RESERVE = 'reserve'
+
+# 좌석 선택 순서 (먼저 가능한 좌석을 누른다)
+DEFAULT_SEATS = ('premium_seat', 'standard_seat')
+
+# 좌석 텍스트 속성 -> SeatState 속성
+STATE_ATTRS = {'premium_seat': 'premium_state', 'standard_seat': 'standard_state', 'reservation': 'reservation_state'}
+
+
+class Action:
+    """행에서 누를 칸"""
+    __slots__ = ('kind', 'row', 'seat')
+
+    def __init__(self, kind, row, seat):
+        """
+        :param kind: BOOK (바로 예약) 또는 RESERVE (예약 대기)
+        :param seat: 'premium_seat' | 'standard_seat' | 'reservation'
+        """
+        self.kind = kind
+        self.row = row
+        self.seat = seat
+
+    @property
+    def column(self):
+        return SEAT_COLUMNS[self.seat]
+
+    @property
+    def text(self):
+        return getattr(self.row, self.seat)
+
+    def __repr__(self):
+        return f"Action({self.kind}, {self.row.train_num}, {self.seat})"
+
+
+def normalize_trains(want_train):
+    """
+    지정 기차 번호를 집합으로 정리 (None 이면 모든 기차)
+    :param want_train: 기차 번호 문자열, 쉼표로 구분한 문자열, 번호 집합/목록, None 또는 'none'
+    """
+    if not want_train or want_train == 'none':
+        return None
+    if isinstance(want_train, str):
+        want_train = want_train.split(',')
+    return frozenset(train.strip() for train in want_train if train.strip()) or None
+
+
+class BookingRules:
+    def __init__(self, want_train=None, want_reserve=False, seats=DEFAULT_SEATS):
+        """
+        :param want_train: 지정 기차 번호 또는 번호 집합 (None 또는 'none' 이면 모든 기차)
+        :param want_reserve: 좌석이 모두 매진이면 예약 대기를 신청할지 여부
+        :param seats: 바로 예약할 좌석 종류와 우선순위
+        """
+        self.trains = normalize_trains(want_train)
+        self.want_reserve = want_reserve
+        self.seats = tuple((seat, STATE_ATTRS[seat]) for seat in seats)
+
+    def decide(self, row):
+        """
+        :return: 이 행에서 누를 Action, 조건에 맞는 칸이 없으면 None
+        """
+        if self.trains is not None and row.train_num not in self.trains:
+            return None
+        for seat, state in self.seats:
+            if getattr(row, state) is SeatState.AVAILABLE:
+                return Action(BOOK, row, seat)
+        if self.want_reserve and row.reservation_state is SeatState.WAITLIST:
+            return Action(RESERVE, row, 'reservation')
+        return None
+
+    def first(self, rows):
+        """결과 테이블 순서로 처음 조건에 맞는 Action (없으면 None)"""
+        for row in rows:
+            action = self.decide(row)
+            if action:
+                return action
+        return None
+
+    def matches(self, rows):
+        return self.first(rows) is not None
+
+    def candidates(self, rows, width=None):
+        """
+        바로 예약할 수 있는 Action 목록 (결과 테이블 순서 = 우선순위), 예약 대기는 포함하지 않는다
+        :param width: 최대 개수 (None 이면 제한 없음)
+        """
+        actions = []
+        for row in rows:
+            action = self.decide(row)
+            if action and action.kind == BOOK:
+                actions.append(action)
+                if width and len(actions) >= width:
+                    break
+        return actions
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+새로고침 간격을 정하는 poll scheduler
+
+고정된 randint(2, 4) 대기 대신
+- 최소/최대 간격과 jitter
+- 취소표가 잘 풀리는 시간대(결제 기한 등)의 burst 모드
+- 오류/요청 제한(429, 503) 시 지수 backoff
+- 프로세스 전체에서 공유하는 token bucket 으로 초당 요청 수 상한
+을 한 곳에서 조절한다.
+"""
+import threading
+import time
+from datetime import datetime
+from random import uniform
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        :param rate: 초당 채워지는 토큰 수 (= 초당 최대 요청 수)
+        :param capacity: 한 번에 몰아 쓸 수 있는 최대 토큰 수 (기본: rate, 최소 1)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """
+        토큰이 있으면 하나 쓰고 0 을, 없으면 토큰이 생길 때까지 남은 시간(초)을 반환
+        """
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, stop_event=None):
+        """토큰을 얻을 때까지 대기. stop_event 가 설정되면 False 반환"""
+        while True:
+            delay = self.try_acquire()
+            if delay == 0:
+                return True
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+
+
+_shared_bucket = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_bucket(rate=None, capacity=None):
+    """
+    프로세스 전체에서 공유하는 TokenBucket 을 반환
+    처음 호출할 때 rate 를 주면 생성되고, rate 가 없으면 제한 없음(None)
+    """
+    global _shared_bucket
+    with _shared_lock:
+        if _shared_bucket is None and rate:
+            _shared_bucket = TokenBucket(rate, capacity)
+        return _shared_bucket
+
+
+def parse_window(text):
+    """'HH:MM-HH:MM' 형식의 시간대를 ((h, m), (h, m)) 로 변환"""
+    start, end = text.split('-')
+    start_h, start_m = (int(v) for v in start.strip().split(':'))
+    end_h, end_m = (int(v) for v in end.strip().split(':'))
+    return (start_h, start_m), (end_h, end_m)
+
+
+class PollScheduler:
+    def __init__(self, min_interval=2.0, max_interval=4.0, jitter=0.0, burst_windows=None, burst_interval=0.5,
+                 backoff_base=5.0, backoff_max=60.0, bucket=None):
+        """
+        :param min_interval: 새로고침 최소 간격(초)
+        :param max_interval: 새로고침 최대 간격(초), min~max 사이에서 무작위로 고른다
+        :param jitter: 계산된 간격에 더할 무작위 값의 최대치(초)
+        :param burst_windows: burst 모드로 조회할 시간대 목록 ex) ['23:50-00:10', '10:00-10:05']
+        :param burst_interval: burst 시간대의 새로고침 간격(초)
+        :param backoff_base: 첫 오류 후 대기 시간(초), 연속 오류마다 두 배
+        :param backoff_max: backoff 최대 대기 시간(초)
+        :param bucket: 요청 수를 제한할 TokenBucket (여러 조회 조건이 공유)
+        """
+        if min_interval > max_interval:
+            raise ValueError("min_interval 은 max_interval 보다 클 수 없습니다.")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.burst_windows = [parse_window(w) if isinstance(w, str) else w for w in (burst_windows or [])]
+        self.burst_interval = burst_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = bucket
+
+        # 외부(이력 인덱스 등)에서 지금이 burst 구간인지 알려주는 함수, bool 반환
+        self.burst_hint = None
+
+        self.errors = 0
+        self.retry_after = None
+
+    def copy(self):
+        """같은 설정과 TokenBucket 을 공유하고, 오류 상태만 따로 가지는 scheduler 를 반환"""
+        other = PollScheduler(self.min_interval, self.max_interval, self.jitter, self.burst_windows,
+                              self.burst_interval, self.backoff_base, self.backoff_max, self.bucket)
+        other.burst_hint = self.burst_hint
+        return other
+
+    def add_burst_window(self, window):
+        self.burst_windows.append(parse_window(window) if isinstance(window, str) else window)
+
+    def in_burst(self, now=None):
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        for (start_h, start_m), (end_h, end_m) in self.burst_windows:
+            start = start_h * 60 + start_m
+            end = end_h * 60 + end_m
+            if start <= end:
+                if start <= minute < end:
+                    return True
+            elif minute >= start or minute < end:  # 자정을 넘기는 구간
+                return True
+        if self.burst_hint is not None:
+            try:
+                return bool(self.burst_hint(now))
+            except Exception:
+                return False
+        return False
+
+    def record_success(self):
+        self.errors = 0
+        self.retry_after = None
+
+    def record_error(self, rate_limited=False, retry_after=None):
+        """
+        :param rate_limited: 서버가 요청 제한(429/503)으로 응답한 경우
+        :param retry_after: 서버가 알려준 재시도 대기 시간(초)
+        """
+        self.errors += 2 if rate_limited else 1
+        self.retry_after = retry_after
+
+    def next_delay(self, now=None):
+        """다음 새로고침까지 기다릴 시간(초)"""
+        if self.errors:
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (self.errors - 1))
+            if self.retry_after:
+                delay = max(delay, self.retry_after)
+        elif self.in_burst(now):
+            delay = self.burst_interval
+        else:
+            delay = uniform(self.min_interval, self.max_interval)
+
+        if self.jitter:
+            delay += uniform(0, self.jitter)
+        return delay
+
+    def wait(self, stop_event=None):
+        """
+        다음 새로고침 시점까지 대기 후 TokenBucket 에서 토큰을 얻는다
+        :return: stop_event 로 중단되면 False
+        """
+        delay = self.next_delay()
+        if stop_event is not None:
+            if stop_event.wait(delay):
+                return False
+        else:
+            time.sleep(delay)
+
+        if self.bucket is not None:
+            return self.bucket.acquire(stop_event)
+        return True
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+로그인 세션(쿠키, localStorage) 저장/복원
+
+로그인에 성공하면 쿠키와 localStorage 를 암호화해서 로컬 파일에 저장하고,
+다음 실행이나 브라우저 재시작 때 새 드라이버(및 HTTP 세션)에 다시 넣어
+전체 로그인 과정을 건너뛴다. 복원한 세션이 거부되면 파일을 지우고 일반 로그인으로 돌아간다.
+
+암호화 키는 SRT_SESSION_KEY 환경 변수, 없으면 로그인 비밀번호에서 PBKDF2 로 만든다.
+"""
+import base64
+import json
+import os
+import time
+
+SALT_SIZE = 16
+KDF_ITERATIONS = 200_000
+DEFAULT_MAX_AGE = 12 * 60 * 60  # 12시간이 지난 세션은 쓰지 않는다
+
+
+class SessionStore:
+    def __init__(self, path, secret=None, max_age=DEFAULT_MAX_AGE):
+        """
+        :param path: 세션 파일 경로
+        :param secret: 암호화 비밀 값 (기본: SRT_SESSION_KEY 환경 변수)
+        :param max_age: 저장된 세션의 최대 사용 시간(초)
+        """
+        self.path = os.path.expanduser(path)
+        self.secret = secret or os.getenv('SRT_SESSION_KEY')
+        self.max_age = max_age
+
+    def set_secret(self, secret):
+        """환경 변수가 없을 때 로그인 비밀번호 등으로 비밀 값을 지정"""
+        if not self.secret:
+            self.secret = secret
+
+    def _fernet(self, salt):
+        from cryptography.fernet import Fernet
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+
+        if not self.secret:
+            raise ValueError("세션 암호화 키가 없습니다. SRT_SESSION_KEY 를 설정하거나 로그인 정보를 먼저 지정하세요.")
+        kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=32, salt=salt, iterations=KDF_ITERATIONS)
+        return Fernet(base64.urlsafe_b64encode(kdf.derive(str(self.secret).encode('utf-8'))))
+
+    def save(self, cookies, local_storage=None):
+        """
+        :param cookies: driver.get_cookies() 형태의 쿠키 목록
+        :param local_storage: {key: value} localStorage 내용
+        """
+        payload = json.dumps({
+            'saved_at': time.time(),
+            'cookies': cookies,
+            'local_storage': local_storage or {},
+        }).encode('utf-8')
+        salt = os.urandom(SALT_SIZE)
+        token = self._fernet(salt).encrypt(payload)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(salt + token)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """
+        저장된 세션을 읽는다
+        :return: {'saved_at', 'cookies', 'local_storage'} 또는 파일이 없거나 만료/손상된 경우 None
+        """
+        if not os.path.isfile(self.path):
+            return None
+        from cryptography.fernet import InvalidToken
+
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        try:
+            payload = self._fernet(data[:SALT_SIZE]).decrypt(data[SALT_SIZE:])
+        except (InvalidToken, ValueError):
+            print("저장된 세션을 읽을 수 없습니다. 다시 로그인합니다.")
+            return None
+
+        session = json.loads(payload)
+        if time.time() - session.get('saved_at', 0) > self.max_age:
+            print("저장된 세션이 만료되었습니다. 다시 로그인합니다.")
+            return None
+        return session
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
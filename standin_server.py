@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+로컬 SRT 대역(stand-in) 서버
+
+실제 사이트 대신 로그인/조회/예약 페이지를 흉내내는 작은 HTTP 서버.
+pages_dir 에 저장해 둔 실제 SRT 페이지(HTML)가 있으면 그대로 돌려주고,
+없으면 rows 로 지정한 좌석 상태를 가진 조회 결과 페이지를 만들어 준다.
+
+벤치마크용으로
+- latency: 요청마다 응답 지연(초)
+- flip_after / flip_duration: N번째 조회부터 일정 시간 좌석이 풀렸다가 다시 매진
+- alert_text: 예약 클릭 시 띄울 alert
+- throttle(): 조회 요청에 요청 제한(429/503) 응답
+를 지정할 수 있고, 좌석이 풀린 시각과 예약 요청 시각을 stats 로 남긴다.
+
+사용 예)
+    server = StandinServer(rows=[{'train_num': '301', 'premium_seat': '매진', 'standard_seat': '예약하기', 'reservation': '매진'}])
+    base_url = server.start()
+    srt = SRT("수서", "부산", "20220117", "08", 1, 0, base_url=base_url, engine='http')
+    ...
+    server.stop()
+"""
+import os
+import html
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse, urlencode
+
+from http_engine import SEARCH_PATH, LOGIN_PATH
+
+RESERVE_PATH = '/hpg/hra/02/requestReservationInfo.do'
+SESSION_COOKIE = 'JSESSIONID_ETK'
+
+SOLD_OUT_ROW = {'train_num': '301', 'premium_seat': '매진', 'standard_seat': '매진', 'reservation': '매진'}
+AVAILABLE_ROW = {'train_num': '301', 'premium_seat': '매진', 'standard_seat': '예약하기', 'reservation': '매진'}
+
+SEAT_COLUMNS = (('premium_seat', 'premium'), ('standard_seat', 'standard'), ('reservation', 'waiting'))
+
+
+def _seat_cell(row, key, seat_kind):
+    text = html.escape(row[key])
+    if '매진' in text:
+        return f'<td><span>{text}</span></td>'
+    href = RESERVE_PATH + '?' + urlencode({'trnNo': row['train_num'], 'seat': seat_kind})
+    return f'<td><a href="{html.escape(href)}" class="btn_small btn_burgundy_dark val_m wx90"><span>{text}</span></a></td>'
+
+
+def render_result_rows(rows):
+    out = []
+    for row in rows:
+        seats = ''.join(_seat_cell(row, key, kind) for key, kind in SEAT_COLUMNS)
+        out.append(
+            '<tr>'
+            '<td>1</td><td>SRT</td>'
+            f'<td class="trnNo">{html.escape(row["train_num"])}</td>'
+            f'<td>{html.escape(row.get("dpt_stn", "수서"))}<br><em class="time">{html.escape(row.get("dpt_tm", "08:00"))}</em></td>'
+            f'<td>{html.escape(row.get("arr_stn", "부산"))}<br><em class="time">{html.escape(row.get("arr_tm", "10:30"))}</em></td>'
+            f'{seats}'
+            '</tr>'
+        )
+    return '\n'.join(out)
+
+
+def render_search_page(rows, logged_in=True):
+    header = '<div>환영합니다</div>' if logged_in else '<div>로그인</div>'
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>일반승차권 조회</title></head>
+<body><div id="wrap">
+<div class="header header-e"><div class="global clear">{header}</div></div>
+<form id="search-form" method="post" action="{SEARCH_PATH}">
+<input type="text" id="dptRsStnCdNm" name="dptRsStnCdNm">
+<input type="text" id="arvRsStnCdNm" name="arvRsStnCdNm">
+<input type="hidden" id="dptRsStnCd" name="dptRsStnCd">
+<input type="hidden" id="arvRsStnCd" name="arvRsStnCd">
+<select id="dptDt" name="dptDt" style="display: none;">{_date_options()}</select>
+<select id="dptTm" name="dptTm" style="display: none;">{_time_options()}</select>
+<select id="psgInfoPerPrnb1" name="psgInfoPerPrnb1">{_count_options()}</select>
+<select id="psgInfoPerPrnb5" name="psgInfoPerPrnb5">{_count_options()}</select>
+<input type="submit" class="inquery_btn" value="조회하기">
+</form>
+<form id="result-form"><fieldset><div class="tbl_wrap th_thead"><table>
+<thead><tr><th>구분</th><th>열차종류</th><th>열차번호</th><th>출발역</th><th>도착역</th><th>특실</th><th>일반실</th><th>예약대기</th></tr></thead>
+<tbody>
+{render_result_rows(rows)}
+</tbody></table></div></fieldset></form>
+</div></body></html>"""
+
+
+def render_login_page():
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>로그인</title></head>
+<body><div id="wrap">
+<div class="header header-e"><div class="global clear"><div>로그인</div></div></div>
+<form id="login-form" method="post" action="{LOGIN_PATH}">
+<input type="text" id="srchDvNm01" name="srchDvNm01">
+<input type="password" id="hmpgPwdCphd01" name="hmpgPwdCphd01">
+<input type="submit" class="loginSubmit" value="확인">
+</form></div></body></html>"""
+
+
+def render_reservation_page(train_num, alert_text=None):
+    script = f'<script>alert({_js_string(alert_text)});</script>' if alert_text else ''
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"><title>예약 확인</title></head>
+<body>{script}<div id="wrap">
+<p>{html.escape(train_num)} 열차 좌석을 확보했습니다.</p>
+<input type="hidden" id="isFalseGotoMain" value="Y">
+</div></body></html>"""
+
+
+def render_sold_out_page(message='잔여석이 없습니다.'):
+    return f"""<!DOCTYPE html>
+<html lang="ko"><head><meta charset="utf-8"></head>
+<body><script>alert({_js_string(message)}); history.back();</script></body></html>"""
+
+
+def _js_string(text):
+    return "'" + str(text).replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _date_options():
+    today = date.today()
+    return ''.join(f'<option value="{(today + timedelta(days=d)):%Y%m%d}">{(today + timedelta(days=d)):%Y%m%d}</option>'
+                   for d in range(-1, 60))
+
+
+def _time_options():
+    return ''.join(f'<option value="{h:02d}0000">{h:02d}</option>' for h in range(0, 24, 2))
+
+
+def _count_options():
+    return ''.join(f'<option value="{n}">{n}</option>' for n in range(0, 10))
+
+
+class StandinServer:
+    def __init__(self, rows=None, pages_dir=None, host='127.0.0.1', port=0, require_login=False,
+                 latency=0.0, available_rows=None, flip_after=None, flip_duration=None, alert_text=None, page_size=10):
+        """
+        :param rows: 조회 결과에 보여줄 행 목록 (dict: train_num, premium_seat, standard_seat, reservation)
+        :param pages_dir: 저장해 둔 SRT 페이지 디렉토리. '<경로 마지막 부분>.html' 파일이 있으면 그대로 응답
+        :param port: 0 이면 빈 포트를 자동으로 사용
+        :param require_login: True 면 로그인 쿠키가 없는 조회 요청을 로그인 페이지로 응답
+        :param latency: 모든 응답 전 지연 시간(초)
+        :param available_rows: 좌석이 풀렸을 때 보여줄 행 목록 (기본: AVAILABLE_ROW)
+        :param flip_after: 이 횟수만큼 조회한 뒤 available_rows 로 바꾼다 (None 이면 바꾸지 않음)
+        :param flip_duration: 좌석이 풀린 뒤 다시 매진으로 돌아가기까지의 시간(초)
+        :param alert_text: 예약 성공 페이지에서 띄울 alert 문구
+        :param page_size: 조회 결과 한 페이지의 열차 수 (dptTm 이 있는 조회에만 적용)
+        """
+        self.rows = list(rows) if rows else [dict(SOLD_OUT_ROW)]
+        self.sold_out_rows = list(self.rows)
+        self.available_rows = list(available_rows) if available_rows else [dict(AVAILABLE_ROW)]
+        self.pages_dir = pages_dir
+        self.host = host
+        self.port = port
+        self.require_login = require_login
+        self.latency = latency
+        self.flip_after = flip_after
+        self.flip_duration = flip_duration
+        self.alert_text = alert_text
+        self.page_size = page_size
+        self.throttled = None  # (상태 코드, Retry-After) 이면 조회 요청에 요청 제한 응답
+
+        self.lock = threading.Lock()
+        self.httpd = None
+        self.thread = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.cnt_search = 0
+        self.cnt_login = 0
+        self.available_since = None  # 좌석이 풀려 있는 동안의 시작 시각 (time.perf_counter)
+        self.released_at = None      # 마지막으로 좌석이 풀린 시각 (다시 매진되어도 유지)
+        self.reservations = []       # [(perf_counter 시각, 열차 번호, 좌석 종류, 성공 여부)]
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def set_rows(self, rows):
+        """조회 결과를 바꾼다 (매진 → 예약 가능 전환 등)"""
+        with self.lock:
+            self.rows = list(rows)
+            self.available_since = time.perf_counter() if self._has_seat(self.rows) else None
+            if self.available_since is not None:
+                self.released_at = self.available_since
+
+    def release_seats(self):
+        """available_rows 로 바꾸고 좌석이 풀린 시각을 기록"""
+        self.set_rows(self.available_rows)
+
+    def sell_out(self):
+        self.set_rows(self.sold_out_rows)
+
+    def throttle(self, status=429, retry_after=None):
+        """
+        이후 조회 요청에 요청 제한 응답을 보낸다 (status 가 None 이면 해제)
+        :param retry_after: Retry-After 헤더 값(초)
+        """
+        with self.lock:
+            self.throttled = (status, retry_after) if status else None
+
+    @staticmethod
+    def _has_seat(rows):
+        return any('매진' not in row[key] for row in rows for key, _ in SEAT_COLUMNS)
+
+    def _current_rows(self):
+        """조회 한 번마다 호출. flip 설정에 따라 좌석 상태를 바꾼 뒤 행 목록을 반환"""
+        with self.lock:
+            self.cnt_search += 1
+            if self.flip_after is not None and self.cnt_search == self.flip_after:
+                self.rows = list(self.available_rows)
+                self.available_since = self.released_at = time.perf_counter()
+            elif (self.flip_duration is not None and self.available_since is not None
+                  and time.perf_counter() - self.available_since > self.flip_duration):
+                self.rows = list(self.sold_out_rows)
+                self.available_since = None
+            return list(self.rows)
+
+    def _reserve(self, train_num, seat_kind):
+        key = {kind: key for key, kind in SEAT_COLUMNS}.get(seat_kind, 'standard_seat')
+        with self.lock:
+            ok = any(row['train_num'] == train_num and '매진' not in row[key] for row in self.rows)
+            self.reservations.append((time.perf_counter(), train_num, seat_kind, ok))
+            return ok
+
+    def seat_to_click_latency(self):
+        """좌석이 풀린 뒤 첫 예약 요청까지 걸린 시간(초), 측정값이 없으면 None"""
+        with self.lock:
+            if self.released_at is None:
+                return None
+            for clicked, _, _, _ in self.reservations:
+                if clicked >= self.released_at:
+                    return clicked - self.released_at
+        return None
+
+    def recorded_page(self, path):
+        if not self.pages_dir:
+            return None
+        name = os.path.basename(path.rstrip('/')) + '.html'
+        file_path = os.path.join(self.pages_dir, name)
+        if os.path.isfile(file_path):
+            with open(file_path, encoding='utf-8') as f:
+                return f.read()
+        return None
+
+    def start(self):
+        """백그라운드 스레드에서 서버를 시작하고 base_url 을 반환"""
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _make_handler(self))
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # keep-alive 에서 헤더/본문 분할 전송 지연 방지
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, body, status=200, headers=None):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _logged_in(self):
+            return SESSION_COOKIE in (self.headers.get('Cookie') or '')
+
+        def _read_form(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            return parse_qs(self.rfile.read(length).decode('utf-8'))
+
+        def _search_page(self, form=None):
+            if server.require_login and not self._logged_in():
+                return self._send(render_login_page())
+            throttled = server.throttled
+            if throttled is not None:
+                status, retry_after = throttled
+                return self._send('Too Many Requests', status=status,
+                                  headers={'Retry-After': str(retry_after)} if retry_after is not None else None)
+            rows = server._current_rows()
+            dpt_tm = (form or {}).get('dptTm', [''])[0]
+            if dpt_tm:
+                # 실제 조회처럼 dptTm 이후 출발 열차만 한 페이지
+                start = f"{dpt_tm[:2]}:00"
+                rows = [row for row in rows if row.get('dpt_tm', '08:00') >= start][:server.page_size]
+            recorded = server.recorded_page(SEARCH_PATH)
+            self._send(recorded if recorded is not None else render_search_page(rows, self._logged_in()))
+
+        def _reservation_page(self, query):
+            train_num = query.get('trnNo', [''])[0]
+            seat_kind = query.get('seat', ['standard'])[0]
+            if server._reserve(train_num, seat_kind):
+                return self._send(render_reservation_page(train_num, server.alert_text))
+            self._send(render_sold_out_page())
+
+        def do_GET(self):
+            if server.latency:
+                time.sleep(server.latency)
+            url = urlparse(self.path)
+            if url.path == LOGIN_PATH:
+                return self._send(server.recorded_page(LOGIN_PATH) or render_login_page())
+            if url.path == SEARCH_PATH:
+                return self._search_page()
+            if url.path == RESERVE_PATH:
+                return self._reservation_page(parse_qs(url.query))
+            recorded = server.recorded_page(url.path)
+            if recorded is not None:
+                return self._send(recorded)
+            self._send('Not Found', status=404)
+
+        def do_POST(self):
+            if server.latency:
+                time.sleep(server.latency)
+            url = urlparse(self.path)
+            form = self._read_form()
+            if url.path == LOGIN_PATH:
+                with server.lock:
+                    server.cnt_login += 1
+                return self._send(render_search_page([], logged_in=True),
+                                  headers={'Set-Cookie': f'{SESSION_COOKIE}=standin; Path=/'})
+            if url.path == SEARCH_PATH:
+                return self._search_page(form)
+            if url.path == RESERVE_PATH:
+                return self._reservation_page(form)
+            self._send('Not Found', status=404)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Local SRT stand-in server')
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pages", help="Directory of recorded SRT pages", type=str, default=None)
+    parser.add_argument("--latency", help="Delay before every response (seconds)", type=float, default=0.0)
+    parser.add_argument("--flip_after", help="Release seats after this many searches", type=int, default=None)
+    parser.add_argument("--flip_duration", help="Seconds until released seats sell out again", type=float, default=None)
+    parser.add_argument("--alert", help="Alert text shown on the reservation page", type=str, default=None)
+    args = parser.parse_args()
+
+    server = StandinServer(pages_dir=args.pages, port=args.port, latency=args.latency, flip_after=args.flip_after,
+                           flip_duration=args.flip_duration, alert_text=args.alert)
+    print(f"SRT 대역 서버 실행: {server.start()}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+SRT 역 이름, 역 코드, 운행 구간 정보 (route metadata)
+
+stations.json 에서 역 이름 -> 역 코드와 노선별 정차역 순서를 읽어
+- 역 이름 / 구간 확인을 dict, frozenset 조회 한 번으로 하고 (없는 역이면 비슷한 이름을 추천)
+- 조회 폼에 넣을 역 이름과 역 코드 필드를 만든다 (go_search 와 HTTP 엔진이 같은 필드를 쓴다)
+
+같은 노선에 함께 있는 두 역 사이만 운행 구간으로 본다 (ex. 부산 - 목포 는 조회하지 않는다).
+역이나 노선이 바뀌면 stations.json 만 고치면 된다. 파일이 바뀐 것을 보면 다음 조회 때 다시 읽는다 (네트워크 없이).
+"""
+import json
+import os
+import threading
+
+from exceptions import InvalidStationNameError, InvalidRouteError
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stations.json')
+
+# 조회 폼의 역 이름 / 역 코드 필드
+DPT_NAME_FIELD = 'dptRsStnCdNm'
+ARR_NAME_FIELD = 'arvRsStnCdNm'
+DPT_CODE_FIELD = 'dptRsStnCd'
+ARR_CODE_FIELD = 'arvRsStnCd'
+
+# 조회 폼의 필드 값을 한 번에 채운다 (글자마다 send_keys 하지 않음). arguments[0]: {필드 id: 값}
+# 페이지에 없는 필드는 건너뛰고 채운 필드 수를 반환
+FILL_SCRIPT = """
+var filled = 0;
+for (var id in arguments[0]) {
+    var el = document.getElementById(id);
+    if (el === null) continue;
+    el.value = arguments[0][id];
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    filled++;
+}
+return filled;
+"""
+
+
+def _aliases(name):
+    """추천용 다른 이름 ex) '김천(구미)' -> '김천', '구미', '김천구미'"""
+    parts = name.replace('(', ' ').replace(')', ' ').split()
+    return set(parts) | {''.join(parts)}
+
+
+class StationTable:
+    def __init__(self, stations, lines, path=None):
+        """
+        :param stations: 역 이름 -> 역 코드
+        :param lines: 노선 이름 -> 정차역 이름 목록
+        :param path: 읽어 온 파일 (다시 읽을지 판단할 때 사용)
+        """
+        unknown = sorted({name for names in lines.values() for name in names} - set(stations))
+        if unknown:
+            raise ValueError(f"역 코드가 없는 정차역: {', '.join(unknown)}")
+        self.codes = dict(stations)
+        self.names = tuple(stations)
+        self.lines = {line: tuple(names) for line, names in lines.items()}
+        self.routes = frozenset((dpt, arr) for names in self.lines.values()
+                                for dpt in names for arr in names if dpt != arr)
+        self.path = path
+
+        self.aliases = {}  # 다른 이름 -> 역 이름
+        for name in self.names:
+            for alias in _aliases(name):
+                self.aliases.setdefault(alias, name)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['stations'], data.get('lines', {}), path=path)
+
+    def __contains__(self, name):
+        return name in self.codes
+
+    def code(self, name):
+        """
+        :raises InvalidStationNameError: 목록에 없는 역
+        """
+        try:
+            return self.codes[name]
+        except KeyError:
+            raise InvalidStationNameError(f"'{name}' 은/는 목록에 없습니다.{self._hint(name)}") from None
+
+    def is_route(self, dpt_stn, arr_stn):
+        return (dpt_stn, arr_stn) in self.routes
+
+    def suggest(self, name, n=3):
+        """목록에 없는 역 이름과 비슷한 역 이름 목록"""
+        import difflib  # 잘못 입력했을 때만 필요하므로 시작 시간에 넣지 않는다
+
+        name = str(name).replace(' ', '')
+        if name in self.codes:
+            return [name]
+        matches = difflib.get_close_matches(name, list(self.aliases), n=n * 2, cutoff=0.5)
+        suggestions = []
+        for alias in matches:
+            station = self.aliases[alias]
+            if station not in suggestions:
+                suggestions.append(station)
+        return suggestions[:n]
+
+    def _hint(self, name):
+        suggestions = self.suggest(name)
+        if not suggestions:
+            return ''
+        return f" 혹시 {', '.join(repr(s) for s in suggestions)} 인가요?"
+
+    def validate(self, dpt_stn, arr_stn):
+        """
+        :raises InvalidStationNameError: 목록에 없는 출발역/도착역
+        :raises InvalidRouteError: 출발역과 도착역이 같거나, SRT 가 두 역 사이를 운행하지 않음
+        """
+        if dpt_stn not in self.codes:
+            raise InvalidStationNameError(f"출발역 오류. '{dpt_stn}' 은/는 목록에 없습니다.{self._hint(dpt_stn)}")
+        if arr_stn not in self.codes:
+            raise InvalidStationNameError(f"도착역 오류. '{arr_stn}' 은/는 목록에 없습니다.{self._hint(arr_stn)}")
+        if dpt_stn == arr_stn:
+            raise InvalidRouteError(f"출발역과 도착역이 같습니다. ('{dpt_stn}')")
+        if not self.is_route(dpt_stn, arr_stn):
+            reachable = [name for name in self.names if self.is_route(dpt_stn, name)]
+            raise InvalidRouteError(f"'{dpt_stn}' → '{arr_stn}' 구간을 운행하는 SRT 가 없습니다. "
+                                    f"'{dpt_stn}' 에서 갈 수 있는 역: {', '.join(reachable)}")
+
+    def search_fields(self, dpt_stn, arr_stn):
+        """조회 폼의 역 이름 / 역 코드 필드"""
+        return {
+            DPT_NAME_FIELD: dpt_stn,
+            ARR_NAME_FIELD: arr_stn,
+            DPT_CODE_FIELD: self.code(dpt_stn),
+            ARR_CODE_FIELD: self.code(arr_stn),
+        }
+
+
+_lock = threading.Lock()
+_cache = {}  # path -> (파일 수정 시각, StationTable)
+
+
+def get_stations(path=DEFAULT_PATH):
+    """
+    캐시해 둔 StationTable (파일이 바뀌었으면 다시 읽는다)
+    """
+    mtime = os.stat(path).st_mtime_ns
+    with _lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    table = StationTable.from_file(path)
+    with _lock:
+        _cache[path] = (mtime, table)
+    return table
+
+
+def refresh(path=DEFAULT_PATH):
+    """캐시를 버리고 파일을 다시 읽는다"""
+    with _lock:
+        _cache.pop(path, None)
+    return get_stations(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Show SRT stations and routes, or check one route')
+    parser.add_argument("dpt", help="Departure station", nargs='?')
+    parser.add_argument("arr", help="Arrival station", nargs='?')
+    parser.add_argument("--path", help="Station data file", type=str, default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    if args.dpt is not None and args.arr is None:
+        parser.error("arr is required when dpt is given")
+
+    stations = refresh(args.path)
+    if args.dpt is None:
+        for line, names in stations.lines.items():
+            print(f"{line}: {' - '.join(f'{name}({stations.codes[name]})' for name in names)}")
+    else:
+        try:
+            stations.validate(args.dpt, args.arr)
+        except (InvalidStationNameError, InvalidRouteError) as e:
+            raise SystemExit(e)
+        print(f"{args.dpt}({stations.code(args.dpt)}) → {args.arr}({stations.code(args.arr)}) 운행 구간입니다.")
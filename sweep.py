@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+날짜/시간 범위 sweep
+
+SRT 조회는 출발 날짜 하나와 짝수 시각 하나(dptTm)로 그 시각 이후 열차 한 페이지를 돌려준다.
+하루 전체나 주말 전체를 보려면 여러 인스턴스를 띄워야 했던 것을, 한 번의 로그인 세션으로
+날짜 범위 x 시간 범위의 모든 조회 창(window)을 매 주기마다 훑도록 한다.
+
+- 한 페이지에 이후 시각의 열차까지 함께 나오므로, 페이지의 마지막 출발 시각 전까지의 창은
+  다시 조회하지 않는다 (페이지가 덜 찼으면 그날의 나머지 창 전부)
+- 같은 주기 안에서 여러 창에 겹쳐 나온 열차는 한 번만 판단하고,
+  주기 사이에서는 좌석 상태가 바뀐 열차만 예약 후보로 본다
+- 좌석이 풀린 적이 많은 창부터 조회한다 (priority 함수로 외부 이력을 더할 수 있음)
+- 주기마다 초당 확인한 열차 수(trains/s)를 출력하고 metrics 에 기록한다
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+
+from change_detection import row_fingerprint
+from exceptions import SessionExpiredError, RateLimitedError
+from http_engine import HttpSearchEngine, build_search_form, SRT_BASE_URL
+from result_parser import UNKNOWN_TRAIN
+from rules import BookingRules
+from scheduler import PollScheduler
+from watcher import Query
+
+PAGE_SIZE = 10  # 조회 결과 한 페이지의 열차 수
+
+
+def date_range(start_dt, end_dt):
+    """YYYYMMDD 두 날짜 사이(양 끝 포함)의 날짜 목록"""
+    start = datetime.strptime(str(start_dt), '%Y%m%d')
+    end = datetime.strptime(str(end_dt), '%Y%m%d')
+    if end < start:
+        raise ValueError(f"끝 날짜가 시작 날짜보다 빠릅니다: {start_dt} ~ {end_dt}")
+    return [(start + timedelta(days=d)).strftime('%Y%m%d') for d in range((end - start).days + 1)]
+
+
+def hour_range(start_tm, end_tm):
+    """hh 두 시각 사이(양 끝 포함)의 조회 창 목록. 조회 시각은 짝수만 가능하므로 시작은 짝수로 내린다"""
+    start = int(start_tm) // 2 * 2
+    end = int(end_tm)
+    if end < start:
+        raise ValueError(f"끝 시각이 시작 시각보다 빠릅니다: {start_tm} ~ {end_tm}")
+    return [f"{hour:02d}" for hour in range(start, end + 1, 2)]
+
+
+def _minutes(departure):
+    return int(departure[:2]) * 60 + int(departure[3:5])
+
+
+def window_of(departure):
+    """출발 시각 HH:MM 이 속한 조회 창 hh"""
+    return f"{int(departure[:2]) // 2 * 2:02d}"
+
+
+def covered_windows(hours, dpt_tm, rows, page_size=PAGE_SIZE):
+    """
+    dpt_tm 창을 조회한 페이지로 빠짐없이 확인된 창 목록
+
+    페이지가 덜 찼으면 dpt_tm 이후 모든 창, 꽉 찼으면 마지막 열차 출발 시각 전에 끝나는 창까지
+    """
+    start = int(dpt_tm)
+    departures = [row.departure for row in rows if row.departure]
+    if len(rows) < page_size or not departures:
+        return [hour for hour in hours if int(hour) >= start]
+    last = max(_minutes(departure) for departure in departures)
+    return [hour for hour in hours if int(hour) == start or (int(hour) > start and (int(hour) + 2) * 60 <= last)]
+
+
+class Sweeper:
+    def __init__(self, srt, dates, hours, want_trains=None, page_size=PAGE_SIZE, workers=None, scheduler=None,
+                 priority=None):
+        """
+        :param srt: 로그인과 최종 예약에 사용할 SRT 객체 (출발/도착역, 인원, 예약 대기 여부를 그대로 사용)
+        :param dates: 조회할 출발 날짜 목록 (YYYYMMDD)
+        :param hours: 조회할 창 목록 (짝수 hh)
+        :param want_trains: 예약할 기차 번호 집합 (None 이면 모든 기차)
+        :param page_size: 조회 결과 한 페이지의 열차 수
+        :param workers: 동시에 조회할 날짜 수 (기본: 날짜 수)
+        :param scheduler: 주기 사이 간격을 정하는 PollScheduler
+        :param priority: (dpt_dt, dpt_tm) -> 점수. 좌석이 자주 풀리는 창일수록 큰 값 (없으면 이번 실행의 기록만 사용)
+        """
+        self.srt = srt
+        self.dates = list(dates)
+        self.hours = list(hours)
+        self.want_trains = set(want_trains) if want_trains else None
+        self.rules = BookingRules(self.want_trains, srt.want_reserve)
+        self.page_size = page_size
+        self.workers = workers or len(self.dates)
+        self.scheduler = scheduler or srt.scheduler or PollScheduler()
+        self.priority = priority
+
+        self.http_engine = None
+        self.lock = threading.Lock()
+        self.fingerprints = {}  # (날짜, 기차 번호) -> 직전 주기 fingerprint
+        self.available = set()  # 직전 주기에 예약 후보였던 (날짜, 기차 번호)
+        self.freed = {}         # (날짜, 창) -> 좌석이 풀린 횟수
+        self.cnt_cycle = 0
+        self.cnt_trains = 0
+        self.cnt_pages = 0
+        self.elapsed = 0.0
+
+    def start_session(self):
+        """브라우저로 로그인하고 쿠키를 HTTP 엔진에 옮긴다"""
+        if self.srt.driver is None:
+            self.srt.run_driver()
+        self.srt.ensure_login()
+        if self.http_engine is None:
+            self.http_engine = HttpSearchEngine(base_url=self.srt.base_url or SRT_BASE_URL, pool_size=self.workers,
+                                                recorder=self.srt.recorder)
+        self.http_engine.load_cookies_from_driver(self.srt.driver)
+
+    def score(self, dpt_dt, dpt_tm):
+        score = self.freed.get((dpt_dt, dpt_tm), 0)
+        if self.priority is not None:
+            score += self.priority(dpt_dt, dpt_tm)
+        return score
+
+    def ordered_windows(self, dpt_dt):
+        """점수가 높은 창부터, 같으면 이른 시각부터"""
+        return sorted(self.hours, key=lambda hour: (-self.score(dpt_dt, hour), hour))
+
+    def fetch_page(self, dpt_dt, dpt_tm):
+        srt = self.srt
+        form = build_search_form(srt.dpt_stn, srt.arr_stn, dpt_dt, dpt_tm, srt.adult_num, srt.child_num)
+        with srt.metrics.timer('http_refresh'):
+            rows = self.http_engine.fetch_rows(form, self.page_size)
+        srt.metrics.incr('refreshes', engine='sweep')
+        rows = [row for row in rows if row.train_num != UNKNOWN_TRAIN]
+        if srt.history is not None:
+            srt.history.record(srt.dpt_stn, srt.arr_stn, dpt_dt, rows)
+        return rows
+
+    def sweep_date(self, dpt_dt):
+        """
+        하루치 창을 우선순위 순서로 조회한다
+        :return: (확인한 열차 수, 조회한 페이지 수, [(창, 예약 후보 행)...])
+        """
+        remaining = set(self.hours)
+        seen = set()
+        candidates = []
+        pages = 0
+
+        for dpt_tm in self.ordered_windows(dpt_dt):
+            if dpt_tm not in remaining:
+                continue
+            rows = self.fetch_page(dpt_dt, dpt_tm)
+            pages += 1
+            remaining.difference_update(covered_windows(self.hours, dpt_tm, rows, self.page_size))
+
+            for row in rows:
+                key = (dpt_dt, row.train_num)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                fingerprint = row_fingerprint(row)
+                with self.lock:
+                    previous = self.fingerprints.get(key)
+                    self.fingerprints[key] = fingerprint
+                changed = previous != fingerprint
+                if not changed:
+                    continue
+
+                if self.rules.decide(row):
+                    candidates.append((dpt_tm, row))
+                    with self.lock:
+                        if previous is not None and key not in self.available and row.departure:
+                            # 매진이었다가 풀린 창을 기록해서 다음 주기부터 먼저 조회
+                            window = (dpt_dt, window_of(row.departure))
+                            self.freed[window] = self.freed.get(window, 0) + 1
+                        self.available.add(key)
+                else:
+                    with self.lock:
+                        self.available.discard(key)
+
+        return len(seen), pages, candidates
+
+    def sweep_once(self, executor):
+        """모든 날짜를 한 번 훑는다. :return: {날짜: [(창, 예약 후보 행)...]}"""
+        started = time.perf_counter()
+        results = dict(zip(self.dates, executor.map(self.sweep_date, self.dates)))
+        elapsed = time.perf_counter() - started
+
+        trains = sum(result[0] for result in results.values())
+        pages = sum(result[1] for result in results.values())
+        self.cnt_cycle += 1
+        self.cnt_trains += trains
+        self.cnt_pages += pages
+        self.elapsed += elapsed
+        self.srt.metrics.incr('trains_checked', trains)
+        self.srt.metrics.observe('sweep_cycle', elapsed)
+        rate = trains / elapsed if elapsed > 0 else 0.0
+        print(f"sweep {self.cnt_cycle}회: 열차 {trains}개, 조회 {pages}회, {elapsed:.2f}초 ({rate:.1f} trains/s)")
+
+        return {dpt_dt: result[2] for dpt_dt, result in results.items() if result[2]}
+
+    def book(self, dpt_dt, candidates):
+        """
+        후보가 나온 창을 브라우저에서 다시 조회해 예약한다
+        :return: 예약 성공 여부
+        """
+        srt = self.srt
+        for dpt_tm in sorted({dpt_tm for dpt_tm, _ in candidates}):
+            rows = [row for tm, row in candidates if tm == dpt_tm]
+            print(f"예약 가능 좌석 발견: {dpt_dt} {dpt_tm}시 {', '.join(row.train_num for row in rows)}")
+            srt.is_booked = False
+            srt.apply_query(Query(srt.dpt_stn, srt.arr_stn, dpt_dt, dpt_tm, srt.adult_num, srt.child_num,
+                                  num_trains_to_check=max(row.index for row in rows),
+                                  want_reserve=srt.want_reserve, want_train={row.train_num for row in rows}))
+            srt.go_search()
+            srt.decide_and_book(srt.read_result_rows())
+            if srt.is_booked:
+                return True
+            # 예약에 실패한 열차는 다음 주기에 다시 후보로 본다
+            with self.lock:
+                for row in rows:
+                    self.fingerprints.pop((dpt_dt, row.train_num), None)
+        return False
+
+    def run(self, login_id, login_psw, phone_number=None, max_errors=5):
+        """
+        예약될 때까지 날짜/시간 범위를 반복해서 훑는다
+        :return: 예약된 Query, 예약하지 못하고 멈추면 None
+        """
+        self.srt.set_log_info(login_id, login_psw)
+        if phone_number:
+            self.srt.set_phone_number(phone_number)
+        self.start_session()
+
+        print(f"sweep 시작: {self.dates[0]}~{self.dates[-1]} ({len(self.dates)}일), "
+              f"{self.hours[0]}~{self.hours[-1]}시 ({len(self.hours)}개 창)")
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        errors = 0
+        try:
+            while True:
+                try:
+                    found = self.sweep_once(executor)
+                    errors = 0
+                    self.scheduler.record_success()
+                    for dpt_dt in sorted(found):
+                        if self.book(dpt_dt, found[dpt_dt]):
+                            return Query(self.srt.dpt_stn, self.srt.arr_stn, self.srt.dpt_dt, self.srt.dpt_tm,
+                                         self.srt.adult_num, self.srt.child_num, want_train=self.srt.want_train)
+
+                except RateLimitedError as e:
+                    print(f"sweep 조회 제한: {str(e)}")
+                    self.scheduler.record_error(rate_limited=True, retry_after=e.retry_after)
+                    self.srt.metrics.incr('errors', phase='sweep', kind='rate_limited')
+
+                except (requests.RequestException, SessionExpiredError) as e:
+                    errors += 1
+                    self.scheduler.record_error()
+                    self.srt.metrics.incr('errors', phase='sweep', kind='http')
+                    print(f"sweep 조회 오류 ({errors}/{max_errors}): {str(e)}")
+                    if errors >= max_errors:
+                        self.start_session()
+                        errors = 0
+
+                self.scheduler.wait()
+        finally:
+            executor.shutdown(wait=True)
+            rate = self.cnt_trains / self.elapsed if self.elapsed > 0 else 0.0
+            print(f"sweep 종료: {self.cnt_cycle}회, 열차 {self.cnt_trains}개, 조회 {self.cnt_pages}회, 평균 {rate:.1f} trains/s")
+            if self.http_engine:
+                self.http_engine.close()
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""
+브라우저 하나의 여러 탭으로 감시 (multi-tab polling)
+
+여러 조건을 Selenium 으로 감시하려면 조건마다 SRT 객체(webdriver.Chrome 하나 = 브라우저 프로세스 하나)가 필요했다.
+TabWatcher 는 드라이버 하나에 조건마다 탭을 하나씩 열어 두고
+- 조회 버튼을 누르는 것(표시 남기기 + 클릭)을 탭마다 execute_script 한 번으로 보내고
+- 새 결과가 그려진 탭부터 READY_SCRIPT 한 번으로 셀 텍스트를 모두 읽는다
+탭은 같은 브라우저/렌더러 프로세스와 로그인 쿠키를 공유하므로 조건 하나에 드는 메모리는 탭 하나(렌더러) 분량이다.
+좌석이 보이면 그 탭으로 전환해 기존 SRT.decide_and_book → book_ticket 흐름으로 예약한다.
+사용자나 사이트가 탭을 닫으면 그 탭만 감시에서 뺀다 (드라이버 교체로 예약해 둔 결제 탭까지 닫지 않도록).
+
+    concurrent:  한 주기에 모든 탭의 조회를 한꺼번에 보낸 뒤 결과를 모은다 (조건 수만큼 요청이 몰림)
+    round_robin: 한 주기에 탭 하나씩 차례로 조회한다 (요청 간격은 브라우저 하나일 때와 같음)
+"""
+import time
+
+from selenium.common.exceptions import JavascriptException, NoSuchWindowException, WebDriverException
+
+from change_detection import MARK_SCRIPT, READY_SCRIPT, TableTracker
+from procstat import tree_usage, driver_pid
+from result_parser import RESULT_ROWS_SELECTOR, rows_from_snapshot
+from rules import BookingRules
+
+CONCURRENT = 'concurrent'
+ROUND_ROBIN = 'round_robin'
+
+# 현재 결과 행에 표시를 남기고 조회 버튼을 누른다. 버튼이 없으면 false
+# arguments[0]: 행 selector
+TRIGGER_SCRIPT = MARK_SCRIPT.replace('return rows.length;', """
+var button = document.querySelector("input[value='조회하기']");
+if (!button) {
+    return false;
+}
+button.click();
+return true;
+""")
+
+
+class Tab:
+    def __init__(self, query, handle):
+        """
+        :param query: 이 탭에서 감시할 watcher.Query
+        :param handle: 탭의 window handle
+        """
+        self.query = query
+        self.handle = handle
+        self.rules = BookingRules(query.want_train, query.want_reserve)
+        self.tracker = TableTracker()
+        self.triggered = None  # 조회 버튼을 누른 시각 (결과를 기다리는 중이 아니면 None)
+
+    def __repr__(self):
+        return f"Tab({self.query})"
+
+
+class TabWatcher:
+    def __init__(self, srt, queries, mode=CONCURRENT, timeout=10, poll_interval=0.05, scheduler=None):
+        """
+        :param srt: 로그인과 예약에 사용할 SRT 객체 (드라이버 하나를 모든 탭이 공유)
+        :param queries: watcher.Query 목록, 조건마다 탭을 하나씩 연다
+        :param mode: CONCURRENT (모든 탭을 한꺼번에 조회) 또는 ROUND_ROBIN (탭 하나씩 차례로 조회)
+        :param timeout: 조회 버튼을 누른 뒤 새 결과를 기다리는 최대 시간(초), 넘으면 그 탭의 조회 페이지를 다시 연다
+        :param poll_interval: 결과를 기다리는 탭들을 다시 확인하는 간격(초)
+        :param scheduler: 주기 사이 간격을 정할 PollScheduler (기본: srt.scheduler)
+        """
+        if mode not in (CONCURRENT, ROUND_ROBIN):
+            raise ValueError(f"지원하지 않는 탭 조회 방식입니다: {mode}")
+        self.srt = srt
+        self.queries = list(queries)
+        self.mode = mode
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.scheduler = scheduler or srt.scheduler
+
+        self.tabs = []
+        self.booked = {}      # group -> 예약된 Query
+        self.kept = set()     # 예약(결제 화면)이 남아 있는 탭의 window handle
+        self.cnt_refresh = 0
+        self.turn = 0         # round_robin 에서 다음에 조회할 탭 위치
+
+    @property
+    def driver(self):
+        return self.srt.driver
+
+    def open_tabs(self):
+        """로그인 후 조건마다 탭을 열고 조회 페이지를 띄운다. 드라이버가 교체되었을 때도 다시 부른다"""
+        srt = self.srt
+        if srt.driver is None:
+            srt.run_driver()
+        # 다시 열 때는 예약한 탭과 첫 탭만 남기고 닫는다
+        handles = [handle for handle in self.driver.window_handles if handle not in self.kept]
+        for handle in handles[1:]:
+            self.driver.switch_to.window(handle)
+            self.driver.close()
+        if handles:
+            self.driver.switch_to.window(handles[0])
+        else:
+            self.driver.switch_to.new_window('tab')
+        srt.ensure_login()
+
+        self.tabs = []
+        opened = 0
+        for query in self.queries:
+            if query.group in self.booked:
+                continue
+            if opened:
+                self.driver.switch_to.new_window('tab')
+            opened += 1
+            tab = Tab(query, self.driver.current_window_handle)
+            self.tabs.append(tab)
+            srt.apply_query(query)
+            srt.go_search()
+            # go_search 가 기다리면서 읽어 둔 결과로 바로 판단한다
+            self.check(tab, srt.read_result_rows())
+        self.turn = 0
+        self.report_memory()
+
+    def report_memory(self):
+        """브라우저 프로세스 트리의 메모리를 탭(조건) 수로 나눠 출력하고 metrics 에 남긴다"""
+        pid = driver_pid(self.driver)
+        if not pid or not self.tabs:
+            return
+        rss, _, processes = tree_usage(pid)
+        per_tab = rss / len(self.tabs)
+        print(f"브라우저 1개, 탭 {len(self.tabs)}개: 메모리 {rss / 1024 / 1024:.0f}MB "
+              f"(조건당 {per_tab / 1024 / 1024:.0f}MB, 프로세스 {processes}개)")
+        self.srt.metrics.set_gauge('tab_memory_mb', per_tab / 1024 / 1024)
+
+    def drop_tab(self, tab):
+        """닫힌 탭을 감시에서 뺀다. 같은 브라우저의 다른 탭은 그대로 둔다"""
+        if tab in self.tabs:
+            self.tabs.remove(tab)
+            print(f"{tab.query} 탭이 닫혀 감시에서 뺍니다")
+            self.srt.metrics.incr('errors', phase='tabs', kind='closed_tab')
+
+    def switch_to(self, tab):
+        """
+        탭으로 전환한다
+        :return: 탭이 닫혀 있으면 drop_tab 후 False
+        """
+        try:
+            self.driver.switch_to.window(tab.handle)
+            return True
+        except NoSuchWindowException:
+            self.drop_tab(tab)
+            return False
+
+    def trigger(self, tab):
+        """탭의 조회 버튼을 누른다 (결과는 collect 에서 읽는다)"""
+        if not self.switch_to(tab):
+            return
+        try:
+            if self.driver.execute_script(TRIGGER_SCRIPT, RESULT_ROWS_SELECTOR):
+                tab.triggered = time.perf_counter()
+            else:
+                # 조회 페이지가 아니면 (예약 실패 후 뒤로 가기 등) 조회부터 다시 한다
+                self.srt.apply_query(tab.query)
+                self.srt.go_search()
+                tab.triggered = None
+                self.refreshed(tab, self.srt.read_result_rows())
+        except NoSuchWindowException:
+            self.drop_tab(tab)
+
+    def collect(self, tabs):
+        """
+        조회 버튼을 누른 탭들을 돌면서 새 결과가 그려진 탭부터 읽는다
+        timeout 안에 결과가 그려지지 않은 탭은 조회 페이지를 다시 연다
+        """
+        waiting = [tab for tab in tabs if tab.triggered is not None]
+        deadline = time.perf_counter() + self.timeout
+        while waiting:
+            for tab in list(waiting):
+                if tab.query.group in self.booked or not self.switch_to(tab):
+                    waiting.remove(tab)
+                    continue
+                try:
+                    cells = self.driver.execute_script(READY_SCRIPT, RESULT_ROWS_SELECTOR,
+                                                       tab.query.num_trains_to_check, True)
+                except JavascriptException:
+                    cells = None  # 새 페이지를 그리는 중
+                except NoSuchWindowException:
+                    waiting.remove(tab)
+                    self.drop_tab(tab)
+                    continue
+                if cells is None:
+                    continue
+                waiting.remove(tab)
+                self.srt.metrics.observe('tab_refresh', time.perf_counter() - tab.triggered)
+                tab.triggered = None
+                self.refreshed(tab, rows_from_snapshot(cells, tab.query.num_trains_to_check))
+
+            if waiting and time.perf_counter() > deadline:
+                for tab in waiting:
+                    print(f"{tab.query} 결과가 그려지지 않아 조회 페이지를 다시 엽니다")
+                    self.srt.metrics.incr('errors', phase='tabs', kind='timeout')
+                    tab.triggered = None
+                    if not self.switch_to(tab):
+                        continue
+                    self.srt.apply_query(tab.query)
+                    self.srt.go_search()
+                break
+            if waiting:
+                time.sleep(self.poll_interval)
+
+    def refreshed(self, tab, rows):
+        self.cnt_refresh += 1
+        tab.query.cnt_refresh += 1
+        self.srt.metrics.incr('refreshes', engine='tabs')
+        self.check(tab, rows)
+
+    def check(self, tab, rows):
+        """상태가 바뀐 행 중 조건에 맞는 좌석이 있으면 그 탭에서 예약한다"""
+        query = tab.query
+        if self.srt.history is not None:
+            self.srt.history.record(query.dpt_stn, query.arr_stn, query.dpt_dt, rows)
+        rows = tab.tracker.changed_rows(rows, commit=False)
+        if rows and tab.rules.matches(rows):
+            self.book(tab, rows)
+        tab.tracker.commit()
+
+    def book(self, tab, rows):
+        """
+        탭으로 전환해 SRT.decide_and_book 으로 예약한다
+        :return: 예약 성공 여부
+        """
+        srt = self.srt
+        query = tab.query
+        print(f"예약 가능 좌석 발견: {query}")
+        if not self.switch_to(tab):
+            return False
+        srt.apply_query(query)
+        srt.is_booked = False
+        srt.decide_and_book(rows)
+
+        if not srt.is_booked:
+            # 다음 조회에서 다시 판단하고, 탭은 trigger 에서 조회 페이지로 되돌린다
+            tab.tracker.forget()
+            return False
+
+        self.booked[query.group] = query
+        print(f"예약 완료, '{query.group}' 그룹 감시를 종료합니다: {query}")
+        # race 모드면 예약은 새 탭에서 끝났을 수 있으므로 지금 탭을 남긴다
+        self.kept.add(self.driver.current_window_handle)
+        self.close_group(query.group)
+        return True
+
+    def close_group(self, group):
+        """예약된 그룹의 탭을 닫는다. 예약한 탭(kept)은 결제 화면으로 남겨 둔다"""
+        current = self.driver.current_window_handle
+        for tab in [tab for tab in self.tabs if tab.query.group == group]:
+            self.tabs.remove(tab)
+            if tab.handle in self.kept:
+                continue
+            try:
+                self.driver.switch_to.window(tab.handle)
+                self.driver.close()
+            except WebDriverException:
+                pass
+        # 지금 탭이 닫혔으면 예약한 탭, 없으면 남은 첫 탭으로
+        handles = self.driver.window_handles
+        if current not in handles:
+            current = next((handle for handle in handles if handle in self.kept), handles[0] if handles else None)
+        if current is not None:
+            self.driver.switch_to.window(current)
+
+    def poll_once(self):
+        """한 주기 조회 (mode 에 따라 모든 탭 또는 다음 탭 하나)"""
+        if not self.tabs:
+            return
+        if self.mode == CONCURRENT:
+            tabs = list(self.tabs)
+        else:
+            self.turn %= len(self.tabs)
+            tabs = [self.tabs[self.turn]]
+            self.turn += 1
+        for tab in tabs:
+            self.trigger(tab)
+        self.collect([tab for tab in tabs if tab in self.tabs])
+
+    def recover(self, exc):
+        """SRT.recovery 로 복구하고, 드라이버가 교체되었으면 탭을 다시 연다"""
+        driver = self.driver
+        self.srt.recovery.handle(exc, 'tabs', reload=False)
+        if self.driver is not driver or not self.tabs:
+            self.open_tabs()
+            return
+        # 닫히거나 멈춘 탭이 있을 수 있으므로 남은 탭의 조회 페이지를 다시 연다
+        handles = set(self.driver.window_handles)
+        if any(tab.handle not in handles for tab in self.tabs):
+            self.open_tabs()
+
+    def run(self, login_id, login_psw, phone_number=None):
+        """
+        모든 조건을 탭으로 감시한다. 모든 그룹이 예약되면 종료
+        :return: {group: 예약된 Query}
+        """
+        self.srt.set_log_info(login_id, login_psw)
+        if phone_number:
+            self.srt.set_phone_number(phone_number)
+
+        started = time.time()
+        self.open_tabs()
+        print(f"{len(self.tabs)}개 조건을 브라우저 1개의 탭으로 감시 시작 ({self.mode})")
+        try:
+            # 예약된 그룹의 탭과 닫힌 탭은 self.tabs 에서 빠진다
+            while self.tabs:
+                try:
+                    self.poll_once()
+                    self.scheduler.record_success()
+                    self.srt.recovery.succeeded()
+                    if self.mode == CONCURRENT or self.turn >= len(self.tabs):
+                        print(f"새로고침 {self.cnt_refresh}회 (탭 {len(self.tabs)}개)")
+                except WebDriverException as e:
+                    self.scheduler.record_error()
+                    self.recover(e)
+                if self.tabs:
+                    # 조회 사이에 예산을 넘은 드라이버를 교체하면 탭을 다시 연다
+                    if self.srt.recycle_if_due():
+                        self.open_tabs()
+                    self.scheduler.wait()
+        finally:
+            print(f"감시 종료: 새로고침 {self.cnt_refresh}회, {time.time() - started:.1f}초")
+            self.srt.print_metrics()
+            if self.srt.notifier:
+                self.srt.notifier.flush()
+
+        return self.booked
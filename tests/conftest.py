@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+# 모듈들이 저장소 루트 기준으로 서로를 import 한다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standin_server import StandinServer  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    """테스트마다 새로 띄우는 대역 서버"""
+    server = StandinServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from accounts import Account, AccountPool
+from metrics import Metrics
+from scheduler import PollScheduler
+from watcher import Query
+
+
+class FakeSRT:
+    """AccountPool/MultiWatcher 가 쓰는 만큼만 흉내낸 SRT"""
+
+    def __init__(self):
+        self.scheduler = PollScheduler()
+        self.metrics = Metrics()
+        self.is_booked = False
+        self.governor = None
+        self.driver = None
+
+    def fork(self, login_id, login_psw, session_file=None):
+        return FakeSRT()
+
+    def apply_query(self, query):
+        pass
+
+    def go_search(self):
+        pass
+
+    def read_result_rows(self):
+        return []
+
+    def decide_and_book(self, rows):
+        self.is_booked = True
+
+
+@pytest.fixture
+def pool():
+    return AccountPool(FakeSRT(), [Account('a', 'id-a', 'psw-a'), Account('b', 'id-b', 'psw-b')], replicas=2)
+
+
+def test_book_falls_back_to_finder_when_owner_dropped(pool):
+    query = Query('수서', '부산', '20240101', '08', account='b')
+    pool.assign(query)
+    pool.watchers.pop('b')  # 로그인 실패로 빠진 계정
+    assert pool.book(query, finder='a') is True
+    assert pool.booked_by[query.group] == 'a'
+
+
+def test_run_stops_every_account_when_one_watch_fails(pool, monkeypatch):
+    monkeypatch.setattr(pool, 'start', lambda: None)
+    queries = [Query('수서', '부산', '20240101', '08', group='x'), Query('수서', '대전', '20240101', '10', group='y')]
+    started = threading.Barrier(len(queries) * pool.replicas)
+
+    def watch(name, query, delay):
+        started.wait(5)
+        if name == 'a' and query.group == 'x':
+            raise RuntimeError('broken')
+        assert pool.watchers[name].stop_events[query.group].wait(5)
+
+    monkeypatch.setattr(pool, '_watch', watch)
+    with pytest.raises(RuntimeError, match='broken'):
+        pool.run(queries)
+    assert all(event.is_set() for watcher in pool.watchers.values() for event in watcher.stop_events.values())
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from main import SRT
+from metrics import Metrics
+from result_parser import TrainRow
+from rules import RESERVE
+
+SOLD_OUT = TrainRow(1, '301', '08:00', '10:30')
+AVAILABLE = TrainRow(1, '301', '08:00', '10:30', standard_seat='예약하기')
+WAITLIST = TrainRow(1, '301', '08:00', '10:30', reservation='신청하기')
+
+
+class BrokenDriver:
+    def find_element(self, by, value):
+        raise StaleElementReferenceException('stale')
+
+
+@pytest.fixture
+def srt():
+    srt = SRT('수서', '부산', '20240101', '08', 1, 0, 1, want_reserve=True, metrics=Metrics())
+    srt.notifier = None
+    srt.phone_number = None
+    return srt
+
+
+def test_failed_browser_step_forgets_http_candidates(srt):
+    srt.refresh_result = lambda: True
+    srt.read_result_rows = lambda: [SOLD_OUT]  # 브라우저로 다시 조회했을 때는 이미 매진
+    assert srt.table_tracker.changed_rows([AVAILABLE], commit=False) == [AVAILABLE]
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert srt.book_from_browser([AVAILABLE]) is False
+    srt.table_tracker.commit()
+    assert srt.table_tracker.changed_rows([AVAILABLE]) == [AVAILABLE]
+
+
+def test_failed_reserve_click_forgets_row(srt):
+    srt.driver = BrokenDriver()
+    srt.table_tracker.changed_rows([WAITLIST])
+    action = srt.rules.decide(WAITLIST)
+    assert action.kind == RESERVE
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert srt.reserve_ticket(action) is False
+    assert not srt.is_booked
+    assert srt.table_tracker.changed_rows([WAITLIST]) == [WAITLIST]
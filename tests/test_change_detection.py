@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from change_detection import TableTracker, ready, row_fingerprint
+from result_parser import TrainRow
+
+
+def _row(index=1, standard_seat='매진', train_num='301'):
+    return TrainRow(index, train_num, '08:00', '10:30', '매진', standard_seat, '매진')
+
+
+def test_fingerprint_follows_seat_state_only():
+    assert row_fingerprint(_row()) == row_fingerprint(_row(index=2))
+    assert row_fingerprint(_row()) != row_fingerprint(_row(standard_seat='예약하기'))
+    assert row_fingerprint(_row()) != row_fingerprint(_row(train_num='303'))
+
+
+def test_tracker_reports_only_changed_rows():
+    tracker = TableTracker()
+    rows = [_row(1), _row(2, train_num='303')]
+    assert tracker.changed_rows(rows) == rows
+    assert tracker.changed_rows(rows) == []
+
+    changed = _row(2, standard_seat='예약하기', train_num='303')
+    assert tracker.changed_rows([rows[0], changed]) == [changed]
+
+
+def test_forget_reports_row_again():
+    tracker = TableTracker()
+    rows = [_row(1), _row(2)]
+    tracker.changed_rows(rows)
+    tracker.forget(2)
+    assert tracker.changed_rows(rows) == [rows[1]]
+    tracker.forget()
+    assert tracker.changed_rows(rows) == rows
+
+
+def test_ready_counts_empty_result():
+    assert ready(None) is None
+    assert ready([]) == ([],)
+    assert ready(True) == (True,)
+
+
+def test_uncommitted_rows_are_reported_again():
+    tracker = TableTracker()
+    rows = [_row(1), _row(2, standard_seat='예약하기')]
+    assert tracker.changed_rows(rows, commit=False) == rows
+    # 예약 판단 중 예외로 commit 하지 못함
+    assert tracker.changed_rows(rows, commit=False) == rows
+    tracker.forget(2)  # 예약 실패한 행
+    tracker.commit()
+    assert tracker.changed_rows(rows) == [rows[1]]
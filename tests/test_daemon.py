@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+
+from daemon import STOPPED, SRTDaemon
+from metrics import Metrics
+
+JOB = {'dpt_stn': '수서', 'arr_stn': '부산', 'dpt_dt': '20240101', 'dpt_tm': '08'}
+
+
+class FakeSRT:
+    def __init__(self):
+        self.scheduler = None
+        self.metrics = Metrics()
+        self.driver = object()
+        self.driver_pool = None
+        self.healthy = True
+
+    def is_driver_healthy(self, driver):
+        return self.healthy
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    daemon = SRTDaemon(FakeSRT(), workers=2, keep_finished=2)
+    monkeypatch.setattr(daemon.watcher, 'watch_query', lambda query, stop_event=None: None)
+    yield daemon
+    daemon.executor.shutdown(wait=True)
+
+
+def test_finished_jobs_are_pruned(daemon):
+    jobs = [daemon.submit(JOB) for _ in range(5)]
+    for job in jobs:
+        job.future.result(5)
+    assert all(job.state == STOPPED for job in jobs)
+    # 끝난 조건은 watcher 에 쌓이지 않는다
+    assert daemon.watcher.queries == []
+    assert daemon.watcher.stop_events == {}
+
+    latest = daemon.submit(JOB)
+    latest.future.result(5)
+    assert sorted(daemon.jobs) == [jobs[3].id, jobs[4].id, latest.id]
+
+
+def test_check_login_uses_cached_value_while_booking(daemon):
+    assert daemon.check_login() is True
+    daemon.srt.healthy = False
+
+    holding = threading.Event()
+    release = threading.Event()
+
+    def book():
+        with daemon.watcher.book_lock:
+            holding.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=book)
+    thread.start()
+    holding.wait(5)
+    assert daemon.check_login(timeout=0.05) is True  # 예약 중이라 마지막 확인 값
+    release.set()
+    thread.join()
+    assert daemon.check_login() is False
+    assert daemon.status()['logged_in'] is False
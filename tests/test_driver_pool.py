@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from driver_pool import DriverPool
+
+
+class FakeService:
+    def __init__(self, alive=True):
+        self.alive = alive
+
+    def is_connectable(self):
+        return self.alive
+
+
+class FakeDriver:
+    def __init__(self, name, alive=True):
+        self.name = name
+        self.service = FakeService(alive)
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _pool(health_check, *drivers):
+    built = []
+
+    def factory():
+        driver = FakeDriver(f'new-{len(built)}')
+        built.append(driver)
+        return driver
+
+    pool = DriverPool(factory, size=len(drivers), health_check=health_check)
+    pool.standby.extend(drivers)
+    return pool, built
+
+
+def test_acquire_skips_server_check():
+    checked = []
+    standby = FakeDriver('standby')
+    pool, built = _pool(lambda driver: checked.append(driver) or True, standby)
+    assert pool.acquire() is standby
+    assert checked == []  # 세션 확인은 백그라운드 check_standby 의 몫
+    assert built == []
+
+
+def test_acquire_discards_dead_chromedriver():
+    dead = FakeDriver('dead', alive=False)
+    alive = FakeDriver('alive')
+    pool, built = _pool(None, dead, alive)
+    assert pool.acquire() is alive
+    assert pool.cnt_recycled == 1
+
+
+def test_check_standby_drops_expired_session():
+    expired = FakeDriver('expired')
+    fresh = FakeDriver('fresh')
+    pool, _ = _pool(lambda driver: driver is not expired, expired, fresh)
+    pool.check_standby()
+    assert list(pool.standby) == [fresh]
+    assert expired.quit_called
+
+
+def test_acquire_prefers_driver_not_being_checked():
+    slow = FakeDriver('slow')
+    ready = FakeDriver('ready')
+    started = threading.Event()
+    finish = threading.Event()
+
+    def health_check(driver):
+        if driver is slow:
+            started.set()
+            finish.wait(5)
+        return True
+
+    pool, _ = _pool(health_check, slow, ready)
+    checker = threading.Thread(target=pool.check_standby)
+    checker.start()
+    started.wait(5)
+    began = time.monotonic()
+    assert pool.acquire() is ready
+    assert time.monotonic() - began < 1
+    finish.set()
+    checker.join()
+    assert list(pool.standby) == [slow]
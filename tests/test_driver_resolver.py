@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+import os
+import types
+
+import pytest
+from selenium.common.exceptions import SessionNotCreatedException
+from selenium.webdriver import ChromeOptions
+
+import driver_resolver
+import main
+
+
+def _executable(path):
+    path.write_text('#!/bin/sh\n')
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """실제 ~/.cache/srt 대신 임시 캐시, PATH 에는 chromedriver 가 없는 것으로"""
+    monkeypatch.setattr(driver_resolver, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(driver_resolver, 'CACHE_FILE', os.path.join(str(tmp_path), 'chromedriver.json'))
+    monkeypatch.delenv('CHROMEDRIVER_PATH', raising=False)
+    monkeypatch.setattr(driver_resolver.shutil, 'which', lambda name: None)
+    return tmp_path
+
+
+def test_resolve_uses_cache_unless_excluded(cache):
+    stale = _executable(cache / 'old-chromedriver')
+    driver_resolver.write_cache(stale)
+    assert driver_resolver.resolve_chromedriver(allow_download=False) == stale
+    assert driver_resolver.resolve_chromedriver(allow_download=False, exclude=stale) is None
+
+
+def test_run_driver_retries_once_after_chrome_update(cache, monkeypatch):
+    stale = _executable(cache / 'old-chromedriver')
+    fresh = _executable(cache / 'new-chromedriver')
+    driver_resolver.write_cache(stale)
+    started = []
+
+    def chrome(service=None, options=None):
+        path = service.path if service else None
+        started.append(path)
+        if path == stale:
+            raise SessionNotCreatedException('This version of ChromeDriver only supports Chrome version 120')
+        return object()
+
+    def resolve(path=None, allow_download=True, exclude=None):
+        if exclude is None:
+            return driver_resolver.read_cache()
+        assert exclude == stale and driver_resolver.read_cache() is None  # 캐시를 지운 뒤 다시 찾는다
+        return fresh
+
+    monkeypatch.setattr(main, 'webdriver', types.SimpleNamespace(Chrome=chrome, ChromeOptions=ChromeOptions))
+    monkeypatch.setattr(main, 'resolve_chromedriver', resolve)
+    srt = main.SRT('수서', '부산', '20240101', '08', 1, 0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        srt.run_driver()
+    assert started == [stale, fresh]
+    assert srt.chromedriver_path == fresh
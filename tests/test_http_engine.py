@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from exceptions import RateLimitedError, SessionExpiredError
+from http_engine import HttpSearchEngine, build_search_form
+from recovery import SESSION_EXPIRED, THROTTLED, classify
+from result_parser import SeatState
+from standin_server import AVAILABLE_ROW, SESSION_COOKIE
+
+FORM = build_search_form('수서', '부산', '20240101', '08', 1, 0)
+
+
+@pytest.fixture
+def engine(standin):
+    engine = HttpSearchEngine(base_url=standin.base_url, pool_size=1)
+    yield engine
+    engine.close()
+
+
+def test_build_search_form_has_station_codes():
+    assert FORM['dptRsStnCd'] == '0551'
+    assert FORM['arvRsStnCd'] == '0020'
+    assert FORM['dptTm'] == '080000'
+
+
+def test_fetch_rows_parses_result_table(standin, engine):
+    rows = engine.fetch_rows(FORM, 2)
+    assert [row.train_num for row in rows] == ['301', '알 수 없음']
+    assert not rows[0].available
+
+    standin.release_seats()
+    row = engine.fetch_rows(FORM, 1)[0]
+    assert row.available
+    assert row.standard_state is SeatState.AVAILABLE
+    assert row.departure == '08:00'
+    assert 'trnNo=301' in row.links['standard_seat']
+    assert engine.cnt_search == 2
+
+
+def test_session_cookie_is_required(standin, engine):
+    standin.require_login = True
+    with pytest.raises(SessionExpiredError) as info:
+        engine.fetch_rows(FORM, 1)
+    assert classify(info.value) == SESSION_EXPIRED
+
+    engine.load_cookies([{'name': SESSION_COOKIE, 'value': 'standin'}])
+    assert engine.fetch_rows(FORM, 1)[0].train_num == AVAILABLE_ROW['train_num']
+
+
+@pytest.mark.parametrize('status, retry_after, expected', [(429, 7, 7.0), (503, None, None)])
+def test_rate_limit_response(standin, engine, status, retry_after, expected):
+    standin.throttle(status, retry_after)
+    with pytest.raises(RateLimitedError) as info:
+        engine.fetch_rows(FORM, 1)
+    assert info.value.retry_after == expected
+    assert classify(info.value) == THROTTLED
+    assert engine.cnt_search == 0
+
+    standin.throttle(None)
+    assert engine.fetch_rows(FORM, 1)
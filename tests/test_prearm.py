@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import pytest
+
+from change_detection import MARK_SCRIPT, READY_SCRIPT
+from main import SRT
+from metrics import Metrics
+from prearm import ARMED_SCRIPT, ArmedBooking
+from rules import BookingRules
+from stations import FILL_SCRIPT
+
+SCRIPT_NAMES = {FILL_SCRIPT: 'fill', MARK_SCRIPT: 'mark', ARMED_SCRIPT: 'armed', READY_SCRIPT: 'ready'}
+
+
+class FormDriver:
+    """조회 폼 필드 채우기와 조회 버튼 클릭 순서를 기록하는 드라이버"""
+
+    def __init__(self, form_fields):
+        self.form_fields = form_fields
+        self.calls = []
+        self.filled = {}
+
+    def execute_script(self, script, *args):
+        name = SCRIPT_NAMES.get(script, 'click')
+        self.calls.append(name)
+        if name == 'fill':
+            self.filled = {key: value for key, value in args[0].items() if key in self.form_fields}
+            return len(self.filled)
+        if name == 'armed':
+            return {'cells': [], 'clicked': None}
+        if name == 'ready':
+            return []
+        return None
+
+
+def test_fields_follow_passenger_count():
+    armed = ArmedBooking(BookingRules('none', False), 2, 1)
+    assert armed.fields() == {'psgInfoPerPrnb1': '2', 'psgInfoPerPrnb5': '1'}
+
+
+@pytest.fixture
+def srt():
+    return SRT('수서', '부산', '20240101', '08', 3, 1, 2, prearm=True, metrics=Metrics())
+
+
+def test_armed_search_fills_passengers_before_clicking(srt):
+    srt.driver = FormDriver({'psgInfoPerPrnb1', 'psgInfoPerPrnb5'})
+    assert srt.click_search(button=None) is None
+    assert srt.driver.calls == ['fill', 'mark', 'click', 'armed']
+    assert srt.driver.filled == {'psgInfoPerPrnb1': '3', 'psgInfoPerPrnb5': '1'}
+
+
+def test_missing_passenger_fields_disarm_the_click(srt):
+    srt.driver = FormDriver(set())
+    with contextlib.redirect_stdout(io.StringIO()):
+        srt.click_search(button=None)
+    assert srt.driver.calls == ['fill', 'mark', 'click', 'ready']
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import pytest
+
+import main
+from exceptions import PopupBlockedError
+from metrics import Metrics
+from race import race_tabs
+from result_parser import TrainRow
+
+ROWS = [TrainRow(1, '301', '08:00', '10:30', standard_seat='예약하기'),
+        TrainRow(2, '303', '08:30', '11:00', standard_seat='예약하기')]
+HREFS = ['http://127.0.0.1/reserve?trnNo=301', 'http://127.0.0.1/reserve?trnNo=303']
+
+
+class BlockedDriver:
+    """window.open 이 막혀 탭이 늘지 않는 드라이버"""
+    current_window_handle = 'main'
+    window_handles = ['main']
+
+    def execute_script(self, script, *args):
+        return None
+
+
+class FakeRecorder:
+    def __init__(self):
+        self.records = []
+
+    def record(self, kind, **data):
+        self.records.append((kind, data['train_num'], data['outcome']))
+
+
+@pytest.fixture
+def srt(monkeypatch):
+    srt = main.SRT('수서', '부산', '20240101', '08', 1, 0, 2, race=True, metrics=Metrics())
+    srt.notifier = None
+    srt.phone_number = None
+    srt.recorder = FakeRecorder()
+    monkeypatch.setattr(main, 'resolve_links', lambda driver, candidates: HREFS[:len(candidates)])
+    return srt
+
+
+def test_race_tabs_detects_blocked_popups():
+    with pytest.raises(PopupBlockedError):
+        race_tabs(BlockedDriver(), HREFS)
+
+
+def test_blocked_popups_fall_back_to_booking_in_order(srt, monkeypatch):
+    def blocked(driver, hrefs):
+        raise PopupBlockedError('blocked')
+
+    booked = []
+
+    def book_ticket(action):
+        booked.append(action.row.train_num)
+        srt.is_booked = action.row.train_num == '303'
+
+    monkeypatch.setattr(main, 'race_tabs', blocked)
+    monkeypatch.setattr(srt, 'book_ticket', book_ticket)
+    with contextlib.redirect_stdout(io.StringIO()):
+        srt.decide_and_book(ROWS)
+    assert booked == ['301', '303']
+    assert srt.metrics.summary()['counters']['booking_failures{reason="popup_blocked"}'] == 1
+
+
+def test_race_outcomes_are_recorded(srt, monkeypatch):
+    monkeypatch.setattr(main, 'race_tabs', lambda driver, hrefs: None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        srt.decide_and_book(ROWS)
+    assert srt.recorder.records == [('book', '301', 'race_lost'), ('book', '303', 'race_lost')]
+    assert not srt.is_booked
+
+    srt.recorder.records.clear()
+    monkeypatch.setattr(main, 'race_tabs', lambda driver, hrefs: 1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        srt.decide_and_book(ROWS)
+    assert srt.recorder.records == [('book', '303', 'booked')]
+    assert srt.is_booked
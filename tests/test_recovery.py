@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import pytest
+import requests
+from selenium.common.exceptions import (InvalidSessionIdException, NoSuchWindowException,
+                                       StaleElementReferenceException, TimeoutException,
+                                       UnexpectedAlertPresentException, WebDriverException)
+
+from exceptions import RateLimitedError, SessionExpiredError
+from recovery import (ALERT, BACKOFF, DEAD_DRIVER, NETWORK, RELOAD, RELOGIN, REREAD, REPLACE_DRIVER,
+                      SESSION_EXPIRED, STALE_DOM, THROTTLED, TIMEOUT, UNKNOWN, Recovery, classify)
+
+
+@pytest.mark.parametrize('exc, kind', [
+    (RateLimitedError('429', retry_after=3), THROTTLED),
+    (SessionExpiredError('login'), SESSION_EXPIRED),
+    (StaleElementReferenceException('stale'), STALE_DOM),
+    (UnexpectedAlertPresentException('alert'), ALERT),
+    (InvalidSessionIdException('gone'), DEAD_DRIVER),
+    (NoSuchWindowException('closed'), DEAD_DRIVER),
+    (TimeoutException('slow'), TIMEOUT),
+    (WebDriverException('chrome not reachable'), DEAD_DRIVER),
+    (WebDriverException('unknown error: net::ERR_CONNECTION_RESET'), NETWORK),
+    (WebDriverException('something else'), UNKNOWN),
+    (requests.ConnectionError('reset'), NETWORK),
+    (ConnectionRefusedError('chromedriver'), DEAD_DRIVER),
+    (ValueError('bug'), UNKNOWN),
+])
+def test_classify(exc, kind):
+    assert classify(exc) == kind
+
+
+def test_plan_escalates():
+    recovery = Recovery(srt=None, escalate_after=2)
+    plans = []
+    for count in range(1, 8):
+        recovery.failures[TIMEOUT] = count
+        plans.append(recovery.plan(TIMEOUT))
+    assert plans == [REREAD, REREAD, RELOAD, RELOAD, RELOGIN, RELOGIN, REPLACE_DRIVER]
+    assert Recovery(srt=None).plan(THROTTLED) == BACKOFF
+
+
+def test_plan_prefers_cheaper_replacement():
+    recovery = Recovery(srt=None)
+    assert recovery.plan(SESSION_EXPIRED) == RELOGIN
+    recovery.costs[RELOGIN] = [1, 20.0]
+    recovery.costs[REPLACE_DRIVER] = [1, 0.5]
+    assert recovery.plan(SESSION_EXPIRED) == REPLACE_DRIVER
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import pytest
+
+from main import SRT
+from metrics import Metrics
+from replay import Recorder, ReplayFinished, ReplaySource, replay_srt
+from scheduler import PollScheduler
+from standin_server import AVAILABLE_ROW, SOLD_OUT_ROW, render_search_page
+
+QUERY = {'dpt_stn': '수서', 'arr_stn': '부산', 'dpt_dt': '20240101', 'dpt_tm': '08', 'want_train': 'none'}
+
+
+def record_capture(path, engine='selenium'):
+    """
+    매진 두 번 뒤 좌석이 풀리고 예약에 성공한 기록
+    http 엔진은 조회 응답을 'http' 로 남기고, 예약 전에 브라우저가 다시 읽은 결과를 'page' 로 남긴다
+    """
+    kind = 'http' if engine == 'http' else 'page'
+    recorder = Recorder(path)
+    recorder.record('query', **QUERY)
+    for rows in ([SOLD_OUT_ROW], [SOLD_OUT_ROW], [AVAILABLE_ROW]):
+        recorder.record_html(kind, render_search_page(rows), status=200)
+    if engine == 'http':
+        recorder.record_html('page', render_search_page([AVAILABLE_ROW]))
+    recorder.record('book', outcome='booked', alert=None)
+    recorder.close()
+    return path
+
+
+def test_recording_round_trip(tmp_path):
+    capture = record_capture(str(tmp_path / 'capture.jsonl.gz'))
+    source = ReplaySource.from_file(capture, loops=2)
+    assert source.query['dpt_stn'] == '수서'
+    assert source.next_book()['outcome'] == 'booked'
+    assert source.next_book() == {'outcome': 'error'}
+
+    pages = []
+    with pytest.raises(ReplayFinished):
+        while True:
+            pages.append(source.next_page())
+    assert len(pages) == 6
+    assert pages[0].html.startswith('<form id="result-form"')
+    assert '예약하기' not in pages[1].cells[0][6]
+    assert '예약하기' in pages[2].cells[0][6]
+
+
+@pytest.mark.parametrize('engine, prearm', [('selenium', False), ('selenium', True), ('http', False)])
+def test_replay_books(tmp_path, engine, prearm):
+    source = ReplaySource.from_file(record_capture(str(tmp_path / 'capture.jsonl.gz'), engine))
+    srt = SRT('수서', '부산', '20240101', '08', 1, 0, 1, engine=engine, prearm=prearm,
+              scheduler=PollScheduler(min_interval=0, max_interval=0), metrics=Metrics())
+    srt.notifier = None
+    srt.phone_number = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        replay_srt(srt, source)
+    assert srt.is_booked
+    assert source.book_position == 1
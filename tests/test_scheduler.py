@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+import threading
+from datetime import datetime
+
+import pytest
+
+from scheduler import PollScheduler, TokenBucket, parse_window
+
+
+def test_token_bucket_capacity_and_refill():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    delay = bucket.try_acquire()
+    assert 0 < delay <= 0.1
+
+    bucket.updated -= 0.1  # 0.1초 지난 것으로
+    assert bucket.try_acquire() == 0
+
+
+def test_token_bucket_acquire_stops():
+    bucket = TokenBucket(rate=0.01, capacity=1)
+    bucket.try_acquire()
+    stop = threading.Event()
+    stop.set()
+    assert bucket.acquire(stop) is False
+
+
+def test_parse_window():
+    assert parse_window('23:50-00:10') == ((23, 50), (0, 10))
+
+
+def test_interval_bounds():
+    with pytest.raises(ValueError):
+        PollScheduler(min_interval=3, max_interval=2)
+    scheduler = PollScheduler(min_interval=2, max_interval=4)
+    noon = datetime(2024, 1, 1, 12, 0)
+    assert all(2 <= scheduler.next_delay(noon) <= 4 for _ in range(50))
+
+
+def test_burst_window_crosses_midnight():
+    scheduler = PollScheduler(burst_windows=['23:50-00:10'], burst_interval=0.5)
+    assert scheduler.in_burst(datetime(2024, 1, 1, 23, 55))
+    assert scheduler.in_burst(datetime(2024, 1, 2, 0, 5))
+    assert not scheduler.in_burst(datetime(2024, 1, 2, 0, 10))
+    assert scheduler.next_delay(datetime(2024, 1, 1, 23, 55)) == 0.5
+
+
+def test_backoff_doubles_and_honours_retry_after():
+    scheduler = PollScheduler(backoff_base=5, backoff_max=60)
+    scheduler.record_error()
+    assert scheduler.next_delay() == 5
+    scheduler.record_error()
+    assert scheduler.next_delay() == 10
+    scheduler.record_error(rate_limited=True, retry_after=90)
+    assert scheduler.next_delay() == 90  # backoff_max 보다 Retry-After 가 우선
+    scheduler.record_success()
+    assert 2 <= scheduler.next_delay(datetime(2024, 1, 1, 12, 0)) <= 4
+
+
+def test_copy_shares_bucket_not_errors():
+    bucket = TokenBucket(rate=1)
+    scheduler = PollScheduler(bucket=bucket)
+    other = scheduler.copy()
+    other.record_error()
+    assert other.bucket is bucket
+    assert scheduler.errors == 0
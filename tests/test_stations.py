@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import json
+
+import pytest
+
+from exceptions import InvalidDateError, InvalidDateFormatError, InvalidRouteError, InvalidStationNameError
+from stations import StationTable, get_stations
+from validation import check_input
+
+
+@pytest.fixture(scope='module')
+def stations():
+    return get_stations()
+
+
+def test_codes_and_fields(stations):
+    assert stations.code('수서') == '0551'
+    assert stations.search_fields('수서', '목포') == {
+        'dptRsStnCdNm': '수서', 'arvRsStnCdNm': '목포', 'dptRsStnCd': '0551', 'arvRsStnCd': '0041'}
+    with pytest.raises(InvalidStationNameError):
+        stations.code('서울')
+
+
+def test_routes(stations):
+    stations.validate('수서', '부산')
+    stations.validate('창원중앙', '동탄')
+    with pytest.raises(InvalidRouteError):
+        stations.validate('부산', '목포')
+    with pytest.raises(InvalidRouteError):
+        stations.validate('수서', '수서')
+
+
+def test_unknown_station_suggests(stations):
+    assert stations.suggest('김천') == ['김천(구미)']
+    assert '울산(통도사)' in stations.suggest('울산')
+    with pytest.raises(InvalidStationNameError, match='김천\\(구미\\)'):
+        stations.validate('수서', '김천')
+
+
+def test_check_input():
+    check_input('수서', '부산', '20240101')
+    with pytest.raises(InvalidStationNameError):
+        check_input('서울', '부산', '20240101')
+    with pytest.raises(InvalidDateFormatError):
+        check_input('수서', '부산', '2024-01-01')
+    with pytest.raises(InvalidDateError):
+        check_input('수서', '부산', '20240231')
+
+
+def test_table_rejects_stop_without_code(tmp_path):
+    path = tmp_path / 'stations.json'
+    path.write_text(json.dumps({'stations': {'수서': '0551'}, 'lines': {'경부선': ['수서', '부산']}}), encoding='utf-8')
+    with pytest.raises(ValueError):
+        StationTable.from_file(str(path))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import io
+
+import pytest
+from selenium.common.exceptions import NoSuchWindowException
+
+from change_detection import READY_SCRIPT
+from metrics import Metrics
+from tabs import TRIGGER_SCRIPT, ROUND_ROBIN, Tab, TabWatcher
+from watcher import Query
+
+SOLD_OUT_CELLS = [['1', 'SRT', '301', '수서 08:00', '부산 10:30', '매진', '매진', '매진']]
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        if handle not in self.driver.window_handles:
+            raise NoSuchWindowException(f"no such window: {handle}")
+        self.driver.current_window_handle = handle
+
+
+class FakeDriver:
+    """탭 전환/닫기와 조회 스크립트만 흉내낸 드라이버"""
+
+    def __init__(self, handles):
+        self.window_handles = list(handles)
+        self.current_window_handle = handles[0]
+        self.switch_to = FakeSwitchTo(self)
+        self.closed = []
+
+    def execute_script(self, script, *args):
+        if script == TRIGGER_SCRIPT:
+            return True
+        if script == READY_SCRIPT:
+            return SOLD_OUT_CELLS
+        return None
+
+    def close(self):
+        self.window_handles.remove(self.current_window_handle)
+        self.closed.append(self.current_window_handle)
+
+
+class FakeRecovery:
+    def handle(self, exc, phase, reload=True):
+        raise AssertionError(f"닫힌 탭 하나로 복구를 부르면 안 된다: {exc}")
+
+
+class FakeSRT:
+    def __init__(self, driver):
+        self.driver = driver
+        self.metrics = Metrics()
+        self.scheduler = None
+        self.recovery = FakeRecovery()
+        self.history = None
+
+
+def _watcher(handles, groups, mode=None):
+    srt = FakeSRT(FakeDriver(handles))
+    queries = [Query('수서', '부산', '20240101', '08', group=group) for group in groups]
+    watcher = TabWatcher(srt, queries, **({'mode': mode} if mode else {}))
+    watcher.tabs = [Tab(query, handle) for query, handle in zip(queries, handles)]
+    return watcher
+
+
+@pytest.mark.parametrize('mode', [None, ROUND_ROBIN])
+def test_closed_tab_is_dropped_without_recovery(mode):
+    watcher = _watcher(['a', 'b'], ['x', 'y'], mode)
+    watcher.driver.window_handles.remove('b')  # 사용자가 탭을 닫음
+    with contextlib.redirect_stdout(io.StringIO()):
+        watcher.poll_once()
+        watcher.poll_once()
+    assert [tab.handle for tab in watcher.tabs] == ['a']
+    assert watcher.cnt_refresh >= 1
+
+
+def test_close_group_switches_to_kept_tab_when_current_closed():
+    watcher = _watcher(['keep', 'a', 'b'], ['x', 'y', 'y'])
+    watcher.kept.add('keep')
+    watcher.driver.current_window_handle = 'b'
+    watcher.close_group('y')
+    assert watcher.driver.closed == ['a', 'b']
+    assert watcher.driver.current_window_handle == 'keep'
+    assert [tab.handle for tab in watcher.tabs] == ['keep']
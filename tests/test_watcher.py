@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+
+from metrics import Metrics
+from recovery import REREAD
+from watcher import MultiWatcher, Query
+
+
+class FakeRecovery:
+    def __init__(self):
+        self.handled = []
+
+    def handle(self, exc, phase, reload=True):
+        self.handled.append((type(exc), phase))
+        return REREAD
+
+
+class FakeSRT:
+    """MultiWatcher 가 쓰는 만큼만 흉내낸 SRT"""
+
+    def __init__(self, error=None):
+        self.scheduler = None
+        self.metrics = Metrics()
+        self.recovery = FakeRecovery()
+        self.error = error
+        self.is_booked = False
+        self.governor = None
+
+    def set_log_info(self, login_id, login_psw):
+        pass
+
+    def apply_query(self, query):
+        pass
+
+    def go_search(self):
+        if self.error:
+            raise self.error
+
+    def read_result_rows(self):
+        return []
+
+    def decide_and_book(self, rows):
+        self.is_booked = True
+
+
+def _queries():
+    return [Query('수서', '부산', '20240101', '08', group='a'), Query('수서', '대전', '20240101', '10', group='b')]
+
+
+def test_book_recovers_from_browser_error():
+    srt = FakeSRT(error=StaleElementReferenceException('stale'))
+    queries = _queries()
+    watcher = MultiWatcher(srt, queries)
+    assert watcher.book(queries[0]) is False
+    assert srt.recovery.handled == [(StaleElementReferenceException, 'book')]
+    assert not watcher.stop_events['a'].is_set()
+
+    srt.error = None
+    assert watcher.book(queries[0]) is True
+    assert watcher.stop_events['a'].is_set()
+    assert not watcher.stop_events['b'].is_set()
+
+
+def test_run_stops_every_group_when_one_watch_fails(monkeypatch):
+    watcher = MultiWatcher(FakeSRT(), _queries())
+    monkeypatch.setattr(watcher, 'start_session', lambda: None)
+    waiting = threading.Event()
+
+    def watch_query(query, stop_event=None):
+        if query.group == 'a':
+            waiting.wait(5)
+            raise RuntimeError('broken')
+        waiting.set()
+        # 멈추지 않으면 run 이 끝나지 않는다
+        assert watcher.stop_events['b'].wait(5)
+
+    monkeypatch.setattr(watcher, 'watch_query', watch_query)
+    with pytest.raises(RuntimeError, match='broken'):
+        watcher.run('id', 'psw')
+    assert all(event.is_set() for event in watcher.stop_events.values())
@@ -1,4 +1,5 @@
 import argparse
+import importlib
 
 def parse_cli_args():
 
@@ -15,8 +16,161 @@ def parse_cli_args():
 
     parser.add_argument("--num", help="no of trains to check", type=int, metavar="4", default=4)
     parser.add_argument("--reserve", help="Reserve or not", type=bool, metavar="2", default=False)
-    parser.add_argument("--want_train", help="Train number", type=str, metavar="KTX 1234", default=None)
+    parser.add_argument("--want_train", help="Train number, or comma separated train numbers", type=str, metavar="KTX 1234", default=None)
+    parser.add_argument("--engine", help="Refresh engine (selenium: browser, http: requests)", type=str, choices=["selenium", "http"], default="selenium")
+    parser.add_argument("--standby", help="Number of pre-logged-in standby browsers for instant failover", type=int, metavar="1", default=0)
+    parser.add_argument("--session_file", help="Encrypted file to save and reuse login cookies across runs", type=str, metavar="~/.srt/session", default=None)
+    parser.add_argument("--chromedriver", help="Path to chromedriver (default: CHROMEDRIVER_PATH, cache, PATH, download)", type=str, metavar="/usr/bin/chromedriver", default=None)
+    parser.add_argument("--lean", help="Block images/CSS/fonts/trackers and use eager page loads while polling", action="store_true")
+    parser.add_argument("--lean_keep", help="Resource kinds to keep loading in lean mode (repeatable)", type=str, action="append", choices=["images", "stylesheets", "fonts", "media", "trackers"], default=None)
+    parser.add_argument("--booking_assets", help="Re-enable blocked resources on booking/payment pages", action="store_true")
+    parser.add_argument("--metrics_jsonl", help="Append per-phase timings and counters to this JSON lines file", type=str, metavar="metrics.jsonl", default=None)
+    parser.add_argument("--metrics_prom", help="Write Prometheus text metrics to this file every 10 s", type=str, metavar="srt.prom", default=None)
+    parser.add_argument("--metrics_port", help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics", type=int, metavar="9108", default=None)
+    parser.add_argument("--race", help="Try several bookable rows at once in separate tabs and keep the first confirmed one", action="store_true")
+    parser.add_argument("--race_width", help="Max rows to try at once in race mode", type=int, metavar="3", default=3)
+    parser.add_argument("--prearm", help="Click the first matching seat in the same script call that sees the new results", action="store_true")
+    parser.add_argument("--record", help="Record search responses and booking outcomes to this gzip file for replay.py", type=str, metavar="capture.jsonl.gz", default=None)
+    parser.add_argument("--history", help="SQLite file to record seat states and learn when seats free up", type=str, metavar="srt_history.db", default=None)
+    parser.add_argument("--notify_webhook", help="POST notifications as JSON to this URL", type=str, metavar="http://127.0.0.1:9000/srt", default=None)
+    parser.add_argument("--notify_email", help="Email notifications to this address (repeatable)", type=str, action="append", metavar="me@example.com", default=None)
+    parser.add_argument("--smtp", help="SMTP server host:port for --notify_email", type=str, metavar="127.0.0.1:25", default="127.0.0.1:25")
+    parser.add_argument("--notify_file", help="Append notifications to this JSON lines file", type=str, metavar="notifications.jsonl", default=None)
+    parser.add_argument("--notify_desktop", help="Show desktop notifications", action="store_true")
+    parser.add_argument("--heartbeat", help="Send a progress notification every N seconds while watching", type=float, metavar="1800", default=None)
+    parser.add_argument("--port", help="daemon.py: serve the job API on http://127.0.0.1:PORT", type=int, metavar="8787", default=8787)
+    parser.add_argument("--socket", help="daemon.py: serve the job API on this Unix socket instead", type=str, metavar="/tmp/srt.sock", default=None)
+    parser.add_argument("--max_browsers", help="Max concurrent browsers on this host, shared by all watcher processes (others wait in line)", type=int, metavar="4", default=None)
+    parser.add_argument("--browser_rss_mb", help="Recycle a browser between polls before its process tree reaches this RSS (MB)", type=float, metavar="800", default=None)
+    parser.add_argument("--browser_cpu", help="Recycle a browser that stays above this CPU percent for 3 samples", type=float, metavar="80", default=None)
+    parser.add_argument("--browser_max_age", help="Recycle a browser after this many hours", type=float, metavar="6", default=None)
+    parser.add_argument("--base_url", help="SRT server url (for local stand-in server)", type=str, metavar="http://127.0.0.1:8000", default=None)
+
+
+    parser.add_argument("--min_interval", help="Minimum seconds between refreshes", type=float, metavar="2", default=2.0)
+    parser.add_argument("--max_interval", help="Maximum seconds between refreshes", type=float, metavar="4", default=4.0)
+    parser.add_argument("--jitter", help="Extra random seconds added to each interval", type=float, metavar="0.5", default=0.0)
+    parser.add_argument("--burst", help="Burst window 'HH:MM-HH:MM' polled at --burst_interval (repeatable)", type=str, action="append", metavar="23:50-00:10", default=None)
+    parser.add_argument("--burst_interval", help="Seconds between refreshes inside a burst window", type=float, metavar="0.5", default=0.5)
+    parser.add_argument("--rate", help="Max requests per second shared by all queries", type=float, metavar="2", default=None)
+
+    parser.add_argument("--dt_end", help="Sweep departure dates from --dt to this date (YYYYMMDD)", type=str, metavar="20220120", default=None)
+    parser.add_argument("--tm_end", help="Sweep departure windows from --tm to this hour", type=str, metavar="22", default=None)
+    parser.add_argument("--query", help="Additional watch query 'dpt,arr,dt,tm' (repeatable)", type=str, action="append", metavar="수서,부산,20220118,08", default=None)
+    parser.add_argument("--config", help="JSON file with a list of watch queries", type=str, metavar="queries.json", default=None)
+    parser.add_argument("--workers", help="Number of concurrent watch threads", type=int, metavar="4", default=None)
+    parser.add_argument("--tabs", help="Watch each query in its own tab of a single browser (concurrent: refresh all tabs at once, round_robin: one tab per interval)", type=str, nargs="?", const="concurrent", choices=["concurrent", "round_robin"], default=None)
+    parser.add_argument("--accounts", help="JSON file with several accounts to spread the watch queries across", type=str, metavar="accounts.json", default=None)
+    parser.add_argument("--replicas", help="Number of accounts polling each query in turn (with --accounts)", type=int, metavar="1", default=1)
 
     args = parser.parse_args()
+    if args.accounts and not (args.query or args.config or (args.dpt and args.arr and args.dt and args.tm)):
+        parser.error("--accounts needs a watch query (--dpt/--arr/--dt/--tm, --query or --config)")
 
     return args
+
+
+def build_scheduler(args):
+    """parse_cli_args 결과로 PollScheduler 를 만든다"""
+    from scheduler import PollScheduler, get_shared_bucket
+
+    return PollScheduler(min_interval=args.min_interval, max_interval=args.max_interval, jitter=args.jitter,
+                         burst_windows=args.burst, burst_interval=args.burst_interval,
+                         bucket=get_shared_bucket(args.rate))
+
+
+def build_browser_profile(args):
+    """parse_cli_args 결과로 BrowserProfile 을 만든다 (--lean 이 없으면 None)"""
+    if not args.lean:
+        return None
+    from browser_profile import BrowserProfile, BLOCK_PATTERNS
+
+    keep = set(args.lean_keep or [])
+    return BrowserProfile(block=[kind for kind in BLOCK_PATTERNS if kind not in keep], booking_assets=args.booking_assets)
+
+
+def build_metrics(args):
+    """parse_cli_args 결과로 Metrics 를 만들고 파일/HTTP 내보내기를 시작한다"""
+    from metrics import Metrics
+
+    metrics = Metrics(jsonl_path=args.metrics_jsonl)
+    if args.metrics_prom:
+        metrics.start_file_export(args.metrics_prom)
+    if args.metrics_port:
+        metrics.serve(args.metrics_port)
+    return metrics
+
+
+def build_history(args):
+    """parse_cli_args 결과로 HistoryStore 를 만든다 (--history 가 없으면 None)"""
+    if not args.history:
+        return None
+    from history import HistoryStore
+
+    return HistoryStore(args.history)
+
+
+def build_recorder(args):
+    """parse_cli_args 결과로 replay.Recorder 를 만든다 (--record 가 없으면 None)"""
+    if not args.record:
+        return None
+    from replay import Recorder
+
+    return Recorder(args.record)
+
+
+def build_governor(args, metrics=None):
+    """parse_cli_args 결과로 ResourceGovernor 를 만든다 (예산과 브라우저 수 제한이 모두 없으면 None)"""
+    if not (args.max_browsers or args.browser_rss_mb or args.browser_cpu or args.browser_max_age):
+        return None
+    from governor import ResourceGovernor
+
+    return ResourceGovernor(max_rss_mb=args.browser_rss_mb, max_cpu_percent=args.browser_cpu,
+                            max_age=args.browser_max_age * 3600 if args.browser_max_age else None,
+                            max_browsers=args.max_browsers, metrics=metrics)
+
+
+def build_notifier(args, phone_number=None, metrics=None):
+    """parse_cli_args 결과로 Notifier 를 만든다. 전화번호가 있으면 iMessage 도 보낸다"""
+    from notifier import (Notifier, ConsoleBackend, FileBackend, WebhookBackend, SmtpBackend, DesktopBackend,
+                          IMessageBackend)
+
+    backends = [ConsoleBackend()]
+    if phone_number:
+        backends.append(IMessageBackend(phone_number))
+    if args.notify_webhook:
+        backends.append(WebhookBackend(args.notify_webhook))
+    if args.notify_email:
+        host, _, port = args.smtp.partition(':')
+        backends.append(SmtpBackend(args.notify_email, host=host, port=int(port or 25)))
+    if args.notify_file:
+        backends.append(FileBackend(args.notify_file))
+    if args.notify_desktop:
+        backends.append(DesktopBackend())
+    return Notifier(backends, metrics=metrics)
+
+
+class LazyImport:
+    """
+    모듈(또는 모듈의 속성)을 처음 사용할 때 import 한다
+    ex) By = LazyImport('selenium.webdriver.common.by', 'By')
+    """
+
+    def __init__(self, module, attr=None):
+        self._module = module
+        self._attr = attr
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            target = importlib.import_module(self._module)
+            if self._attr:
+                target = getattr(target, self._attr)
+            self._target = target
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
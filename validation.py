@@ -1 +1,15 @@
-station_list = ["수서", "동탄", "평택지제", "천안아산", "오송", "대전", "김천(구미)", "동대구", "신경주", "울산(통도사)", "부산", "공주", "익산", "정읍", "광주송정", "나주", "목포", "창원중앙"]
+from datetime import datetime
+
+from exceptions import InvalidDateError, InvalidDateFormatError
+from stations import get_stations
+
+
+def check_input(dpt_stn, arr_stn, dpt_dt):
+    # 역 이름과 운행 구간 (stations.json)
+    get_stations().validate(dpt_stn, arr_stn)
+    if not str(dpt_dt).isnumeric():
+        raise InvalidDateFormatError("날짜는 숫자로만 이루어져야 합니다.")
+    try:
+        datetime.strptime(str(dpt_dt), '%Y%m%d')
+    except ValueError:
+        raise InvalidDateError("날짜가 잘못 되었습니다. YYYYMMDD 형식으로 입력해주세요.")
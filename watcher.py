@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+여러 조회 조건(노선/날짜/시간)을 한 프로세스에서 동시에 감시하는 watcher
+
+하나의 SRT 객체(브라우저 1개)로 로그인한 쿠키를 HttpSearchEngine 하나에 옮기고,
+조건마다 스레드 풀에서 HTTP 조회를 반복한다. 예약 가능한 좌석이 보이면
+브라우저를 잠깐 빌려서 기존 book_ticket 흐름으로 예약하고,
+같은 승객 그룹(group)의 나머지 조건은 모두 멈춘다.
+"""
+import json
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+import requests
+from selenium.common.exceptions import WebDriverException
+
+from exceptions import SessionExpiredError, RateLimitedError
+from http_engine import HttpSearchEngine, build_search_form, SRT_BASE_URL
+from recovery import RELOGIN, REPLACE_DRIVER
+from rules import BookingRules
+from scheduler import PollScheduler
+from validation import check_input
+
+DEFAULT_GROUP = 'default'
+
+
+class Query:
+    def __init__(self, dpt_stn, arr_stn, dpt_dt, dpt_tm, adult_num=1, child_num=0, num_trains_to_check=4,
+                 want_reserve=False, want_train=None, group=DEFAULT_GROUP, account=None):
+        """
+        SRT 생성자와 같은 조회 조건 + 승객 그룹
+
+        :param group: 승객 그룹 이름. 같은 그룹에서 하나가 예약되면 나머지 조건은 감시를 멈춘다
+        :param account: 예약할 계정 이름 (여러 계정으로 감시할 때, None 이면 조회한 계정으로 예약)
+        """
+        self.dpt_stn = dpt_stn
+        self.arr_stn = arr_stn
+        self.dpt_dt = str(dpt_dt)
+        self.dpt_tm = str(dpt_tm)
+        self.adult_num = adult_num
+        self.child_num = child_num
+        self.num_trains_to_check = num_trains_to_check
+        self.want_reserve = want_reserve
+        self.want_train = want_train
+        self.group = group
+        self.account = account
+        self.cnt_refresh = 0
+
+        check_input(self.dpt_stn, self.arr_stn, self.dpt_dt)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @classmethod
+    def from_string(cls, text, **defaults):
+        """
+        'dpt,arr,dt,tm' 형식의 CLI 문자열에서 생성 ex) 수서,부산,20220117,08
+        """
+        parts = [part.strip() for part in text.split(',')]
+        if len(parts) != 4:
+            raise ValueError(f"조회 조건은 '출발역,도착역,날짜,시간' 형식이어야 합니다: {text}")
+        return cls(*parts, **defaults)
+
+    def search_form(self):
+        return build_search_form(self.dpt_stn, self.arr_stn, self.dpt_dt, self.dpt_tm, self.adult_num, self.child_num)
+
+    def __repr__(self):
+        return f"Query({self.dpt_stn}->{self.arr_stn} {self.dpt_dt} {self.dpt_tm}시, group={self.group})"
+
+
+def load_queries(path):
+    """
+    JSON 설정 파일에서 조회 조건 목록을 읽는다
+
+    파일 형식은 Query 인자 dict 의 리스트, 또는 {"queries": [...]}
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('queries', [])
+    return [Query.from_dict(item) for item in data]
+
+
+def wait_watchers(futures, stop_all):
+    """
+    감시 future 가 모두 끝날 때까지 기다린다
+    하나가 예외로 끝나면 stop_all() 로 나머지 감시를 모두 멈추고 그 예외를 다시 던진다
+    (앞의 future 가 끝나기를 기다리느라 예외를 놓치거나, 남은 감시 때문에 종료하지 못하는 일이 없게)
+    """
+    done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+    for future in done:
+        if future.exception() is not None:
+            stop_all()
+            future.result()
+
+
+class MultiWatcher:
+    def __init__(self, srt, queries, max_workers=None, max_errors=5, scheduler=None, booker=None):
+        """
+        :param srt: 로그인과 최종 예약에 사용할 SRT 객체 (브라우저 1개를 모든 조건이 공유)
+        :param queries: Query 목록
+        :param max_workers: 동시에 조회할 스레드 수 (기본: 조건 수)
+        :param max_errors: 연속 오류가 이 횟수를 넘으면 세션을 새로 받는다
+        :param scheduler: 조건마다 복사해서 쓸 PollScheduler (TokenBucket 은 모든 조건이 공유)
+        :param booker: 좌석이 보였을 때 부를 함수 booker(query) -> 예약 여부 (기본: self.book)
+        """
+        self.srt = srt
+        self.queries = list(queries)
+        self.max_workers = max_workers or len(self.queries)
+        self.max_errors = max_errors
+        self.scheduler = scheduler or srt.scheduler or PollScheduler()
+        self.booker = booker or self.book
+
+        self.http_engine = None
+        self.book_lock = threading.RLock()     # 브라우저는 한 번에 한 조건만 사용 (다시 로그인할 때도 잡는다)
+        self.session_lock = threading.Lock()
+        self.count_lock = threading.Lock()
+        self.stop_events = {}                  # group -> threading.Event
+        self.members = {}                      # group -> 조건별 stop_event 목록 (watch_query 에 따로 넘긴 것)
+        self.booked = {}                       # group -> 예약된 Query
+        self.cnt_refresh = 0
+
+        for query in self.queries:
+            self.stop_events.setdefault(query.group, threading.Event())
+
+    def add_query(self, query):
+        """
+        감시 중에 조건을 추가한다. 이미 예약이 끝나 멈춘 그룹이면 새로 시작한다
+        """
+        with self.session_lock:
+            event = self.stop_events.get(query.group)
+            if event is None or event.is_set():
+                self.stop_events[query.group] = threading.Event()
+                self.members.pop(query.group, None)
+                self.booked.pop(query.group, None)
+            self.queries.append(query)
+
+    def remove_query(self, query):
+        """
+        감시가 끝난 조건을 지운다. 그룹에 남은 조건이 없으면 그룹 상태(Event, 예약 결과)도 지운다
+        (daemon 처럼 조건이 계속 추가되는 경우 끝난 조건이 쌓이지 않게 한다)
+        """
+        with self.session_lock:
+            if query in self.queries:
+                self.queries.remove(query)
+            if any(other.group == query.group for other in self.queries):
+                return
+            self.stop_events.pop(query.group, None)
+            self.members.pop(query.group, None)
+            self.booked.pop(query.group, None)
+
+    def start_session(self):
+        """
+        브라우저로 로그인하고 쿠키를 HTTP 엔진에 옮긴다
+        다른 스레드의 예약(book)과 브라우저를 같이 쓰지 않도록 book_lock 안에서 로그인한다
+        """
+        with self.book_lock, self.session_lock:
+            if self.srt.driver is None:
+                self.srt.run_driver()
+            self.srt.ensure_login()
+            if self.http_engine is None:
+                self.http_engine = HttpSearchEngine(base_url=self.srt.base_url or SRT_BASE_URL,
+                                                    pool_size=self.max_workers, recorder=self.srt.recorder)
+            self.http_engine.load_cookies_from_driver(self.srt.driver)
+
+    def stop_group(self, group):
+        self.stop_events[group].set()
+        for event in self.members.get(group, ()):
+            event.set()
+
+    def stop_all(self):
+        for group in list(self.stop_events):
+            self.stop_group(group)
+
+    def book(self, query):
+        """
+        브라우저에서 query 조건으로 다시 조회해 예약한다
+        :return: 예약 성공 여부
+        """
+        with self.book_lock:
+            stop_event = self.stop_events[query.group]
+            if stop_event.is_set():
+                return False
+
+            print(f"예약 가능 좌석 발견: {query}")
+            self.srt.is_booked = False
+            self.srt.apply_query(query)
+            try:
+                self.srt.go_search()
+                rows = self.srt.read_result_rows()
+                self.srt.decide_and_book(rows)
+            except WebDriverException as e:
+                # 브라우저 오류로 감시 스레드가 죽지 않게 복구하고, 다음 조회에서 다시 판단한다
+                if self.srt.recovery.handle(e, 'book') in (RELOGIN, REPLACE_DRIVER):
+                    self.http_engine.load_cookies_from_driver(self.srt.driver)
+
+            if self.srt.is_booked:
+                self.booked[query.group] = query
+                self.stop_group(query.group)
+                print(f"예약 완료, '{query.group}' 그룹 감시를 종료합니다: {query}")
+                return True
+            return False
+
+    def recycle_if_due(self):
+        """예약 중이 아닐 때만 예산을 넘은 브라우저를 교체하고 쿠키를 다시 옮긴다"""
+        if self.srt.governor is None or not self.book_lock.acquire(blocking=False):
+            return
+        try:
+            if self.srt.recycle_if_due():
+                self.start_session()
+        finally:
+            self.book_lock.release()
+
+    def watch_query(self, query, stop_event=None):
+        """
+        :param stop_event: 이 조건만 멈출 때 쓸 Event (없으면 그룹 Event). 그룹이 멈추면 함께 set 된다
+        :return: 예약되면 query, 멈추면 None
+        """
+        group_event = self.stop_events[query.group]
+        if stop_event is None:
+            stop_event = group_event
+        else:
+            # 이미 멈춘 조건의 Event 는 정리하고 새 Event 를 등록
+            members = [event for event in self.members.get(query.group, ()) if not event.is_set()]
+            self.members[query.group] = members + [stop_event]
+            if group_event.is_set():
+                stop_event.set()
+        form = query.search_form()
+        rules = BookingRules(query.want_train, query.want_reserve)
+        scheduler = self.scheduler.copy()
+        errors = 0
+
+        while not stop_event.is_set():
+            try:
+                with self.srt.metrics.timer('http_refresh'):
+                    rows = self.http_engine.fetch_rows(form, query.num_trains_to_check)
+                self.srt.metrics.incr('refreshes', engine='http')
+                if self.srt.history is not None:
+                    self.srt.history.record(query.dpt_stn, query.arr_stn, query.dpt_dt, rows)
+                with self.count_lock:
+                    self.cnt_refresh += 1
+                query.cnt_refresh += 1
+                errors = 0
+                scheduler.record_success()
+
+                if rules.matches(rows):
+                    if self.booker(query):
+                        return query
+
+            except RateLimitedError as e:
+                print(f"{query} 조회 제한: {str(e)}")
+                scheduler.record_error(rate_limited=True, retry_after=e.retry_after)
+                self.srt.metrics.incr('errors', phase='watch', kind='rate_limited')
+
+            except (requests.RequestException, SessionExpiredError) as e:
+                errors += 1
+                scheduler.record_error()
+                self.srt.metrics.incr('errors', phase='watch', kind='http')
+                print(f"{query} 조회 오류 ({errors}/{self.max_errors}): {str(e)}")
+                # 세션 만료는 재시도해도 소용없으므로 바로 쿠키를 다시 받는다
+                if isinstance(e, SessionExpiredError) or errors >= self.max_errors:
+                    self.start_session()
+                    errors = 0
+
+            self.recycle_if_due()
+            # 그룹이 멈추면 바로 깨어나도록 Event 로 대기
+            scheduler.wait(stop_event)
+
+        return None
+
+    def run(self, login_id, login_psw, phone_number=None):
+        """
+        모든 조건을 동시에 감시한다. 모든 그룹이 예약되면 종료
+        :return: {group: 예약된 Query}
+        """
+        self.srt.set_log_info(login_id, login_psw)
+        if phone_number:
+            self.srt.set_phone_number(phone_number)
+        self.start_session()
+
+        print(f"{len(self.queries)}개 조건 감시 시작 (스레드 {self.max_workers}개)")
+        started = time.time()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = [executor.submit(self.watch_query, query) for query in self.queries]
+            wait_watchers(futures, self.stop_all)
+        except KeyboardInterrupt:
+            self.stop_all()
+            raise
+        finally:
+            executor.shutdown(wait=True)
+            print(f"감시 종료: 새로고침 {self.cnt_refresh}회, {time.time() - started:.1f}초")
+            if self.http_engine:
+                self.http_engine.close()
+
+        return self.booked